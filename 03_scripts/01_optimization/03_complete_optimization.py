@@ -8,22 +8,233 @@ Performs 10 iterations of kernel optimization with automated:
 - Boot performance testing
 - Log collection
 - Progress reporting
+
+By default the loop is pipelined: iteration N+1 builds while iteration N is
+deployed and boot-tested. Each build is snapshotted to its own artifact
+directory, so a running build never overwrites the kernel under test.
+
+Candidates never touch the layer: fragments are written to the build
+directory and each candidate is built as its own throwaway bitbake
+multiconfig (own TMPDIR, shared sstate cache) that adds them through the
+SRK_OPT_FRAGMENTS hook of linux-yocto-srk-tiny_6.6.bb. Several candidates can
+therefore be built by one bitbake run in parallel (--parallel-builds).
+
+Images and measured KPIs are cached by the hash of the merged .config,
+kernel source revision, recipe files and bundled initramfs
+(kernel_artifact_cache.py): a candidate whose configuration was already built
+or measured is neither rebuilt nor booted again.
+
+--search replaces the fixed iteration list by ConfigSearch, a greedy search
+with bisection over a pool of CONFIG_* options.
+
+Progress is checkpointed per iteration (built, deployed, tested, measured)
+in build/srk-optimization/checkpoint.json: a restarted run picks every
+iteration up at the stage where it stopped (--restart starts over).
+
+Every build is measured with kernel_size.py (text/data/bss per built-in.a
+subsystem); the report shows which subsystems each iteration shrank.
+
+--backend make skips the bitbake task graph for the iterations: candidates
+are merged with merge_config.sh and compiled with an incremental
+`make zImage` in a persistent build tree seeded once from the recipe work
+directory (kernel_incremental_build.py). Only the final configuration is
+built by bitbake and boot-tested again to confirm the result.
+
+--boards spreads the boot tests over a pool of boards (board_pool.py), one
+candidate per free board. --boots-per-candidate N boots every candidate on
+N different boards, rotating the starting board from candidate to candidate
+so board-to-board variance averages out instead of favouring some candidates.
+
+The report is written as Markdown and as an interactive HTML page
+(optimization_report.py) built from the iteration metrics.
 """
 
+import argparse
+import glob
+import hashlib
+import importlib
+import itertools
+import json
 import os
+import re
+import queue
+import signal
 import sys
 import subprocess
+import threading
 import time
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Shared helpers live at the top of the meta-srk layer
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from board_pool import BoardPool, DEFAULT_BOARD, load_boards
+from boot_kpi import scan_boot_log_file
+from boot_readiness import build_probes
+from kernel_artifact_cache import ArtifactCache, config_key, initramfs_digest, source_revision, tree_digest
+from kernel_incremental_build import (IncrementalKernelTree, KernelTreeError, find_workdir,
+                                      start_process_group, stop_process_group)
+from kernel_size import measure_sizes, size_deltas, size_total
+from optimization_report import write_report
+
+# The boot monitor runs in-process; its file name is not a valid module identifier
+boot_monitor = importlib.import_module("14_reset_bbb_and_log_monitor")
+
+# bitbake lets running tasks finish on the first SIGINT and aborts them on the second
+BITBAKE_STOP_SIGNALS = (signal.SIGINT, signal.SIGINT)
+
+class OptimizationCheckpoint:
+    """
+    Per-iteration progress, saved after every stage so an interrupted run
+    (timeout, Ctrl-C, board hang) resumes exactly where it stopped.
+    
+    Entries are keyed by iteration and backend and carry a fingerprint of
+    the options the candidate applies; an entry whose fingerprint no longer
+    matches is ignored. Each boot of a candidate (boots per candidate > 1
+    repeat it on other boards) is tracked separately, and every board by the
+    config key of the kernel last deployed to it.
+    """
+    
+    STAGES = ("built", "deployed", "tested", "measured")
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {"iterations": {}, "deployed": {}}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.state = json.load(f)
+            # Single-board checkpoints recorded one key for the whole bench
+            if not isinstance(self.state.get("deployed"), dict):
+                self.state["deployed"] = {}
+                
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+        
+    def reset(self):
+        with self.lock:
+            self.state = {"iterations": {}, "deployed": {}}
+            self.save()
+            
+    def entry(self, name, fingerprint):
+        """Checkpoint entry of an iteration, None if absent or for other options"""
+        entry = self.state["iterations"].get(name)
+        if entry and entry.get("fingerprint") == fingerprint:
+            return entry
+        return None
+        
+    def stage(self, name, fingerprint):
+        entry = self.entry(name, fingerprint)
+        return entry.get("stage") if entry else None
+        
+    def mark(self, name, fingerprint, stage, **data):
+        """Record that an iteration completed a stage"""
+        with self.lock:
+            entry = self.entry(name, fingerprint) or {"fingerprint": fingerprint}
+            entry.update(data, stage=stage, error=None, updated=datetime.now().isoformat(timespec='seconds'))
+            self.state["iterations"][name] = entry
+            self.save()
+            
+    def fail(self, name, fingerprint, error, stage=None):
+        """Record a failure; stage is the last stage that is still valid"""
+        with self.lock:
+            entry = self.entry(name, fingerprint) or {"fingerprint": fingerprint}
+            entry.update(stage=stage, error=error, updated=datetime.now().isoformat(timespec='seconds'))
+            self.state["iterations"][name] = entry
+            self.save()
+            
+    def boot(self, name, fingerprint, repeat):
+        """Progress of one boot of an iteration: {"stage": ..., "board": ...} or None"""
+        entry = self.entry(name, fingerprint)
+        return entry.get("boots", {}).get(str(repeat)) if entry else None
+        
+    def mark_boot(self, name, fingerprint, repeat, stage, board, config_key=None):
+        """
+        Record that one boot completed a stage ("deployed" or "tested") on
+        a board; stage None forgets the boot.
+        """
+        with self.lock:
+            entry = self.entry(name, fingerprint) or {"fingerprint": fingerprint}
+            boots = entry.setdefault("boots", {})
+            if stage:
+                boots[str(repeat)] = {"stage": stage, "board": board}
+            else:
+                boots.pop(str(repeat), None)
+            entry["updated"] = datetime.now().isoformat(timespec='seconds')
+            self.state["iterations"][name] = entry
+            if stage == "deployed":
+                self.state["deployed"][board] = config_key
+            self.save()
+            
+    def deployed(self, board):
+        """Config key of the kernel on a board, None if unknown"""
+        return self.state["deployed"].get(board)
+        
+    def undeploy(self, board):
+        """The board content is unknown while a kernel is being copied"""
+        with self.lock:
+            self.state["deployed"][board] = None
+            self.save()
+            
+    def summary(self):
+        counts = {}
+        for entry in self.state["iterations"].values():
+            counts[entry.get("stage")] = counts.get(entry.get("stage"), 0) + 1
+        return ", ".join(f"{counts[stage]} {stage}" for stage in self.STAGES if stage in counts)
+
 class KernelOptimizer:
     def __init__(self):
         self.base_dir = "/home/srk2cob/project/poky/meta-srk"
         self.kernel_recipe = f"{self.base_dir}/recipes-kernel/linux/linux-yocto-srk-tiny_6.6.bb"
-        self.kernel_dir = f"{self.base_dir}/recipes-kernel/linux/linux-yocto-srk-tiny"
         self.results_dir = f"{self.base_dir}/03_scripts/01_optimization/01_logs"
         self.build_dir = "/home/srk2cob/project/poky/build"
+        self.kernel_name = "linux-yocto-srk-tiny"
+        self.machine = "beaglebone-yocto-srk-tiny"
+        # Generated fragments and configs live in the build directory, not in the layer
+        self.work_dir = f"{self.build_dir}/srk-optimization"
+        self.fragments_dir = f"{self.work_dir}/fragments"
+        self.multiconfig_dir = f"{self.build_dir}/conf/multiconfig"
+        self.postread_conf = f"{self.work_dir}/multiconfig.conf"
+        # Candidates built by one bitbake invocation
+        self.parallel_builds = 1
+        # Patches, fragments and DTS of the recipe (FILESEXTRAPATHS ${THISDIR}/${PN})
+        self.kernel_files_dir = f"{self.base_dir}/recipes-kernel/linux/linux-yocto-srk-tiny"
+        # INITRAMFS_IMAGE and INITRAMFS_IMAGE_NAME of the recipe, bundled into zImage
+        self.initramfs_image = "core-image-tiny-initramfs-srk-9-nobusybox"
+        self.initramfs_name = f"{self.initramfs_image}-{self.machine}.rootfs"
+        # Cache key of each candidate as looked up after do_kernel_configme
+        self.lookup_keys = {}
+        # Running bitbake, and set while builds are being stopped (see stop_build)
+        self.build_process = None
+        self.build_stop = threading.Event()
+        self.use_cache = True
+        # "bitbake" builds every candidate as a multiconfig, "make" in the persistent tree
+        self.set_backend("bitbake")
+        self.make_tree = IncrementalKernelTree(f"{self.work_dir}/kernel-tree")
+        # make targets and where their products are deployed as
+        self.make_targets = ["zImage", "ti/omap/am335x-yocto-srk-tiny.dtb"]
+        self.make_outputs = {
+            "zImage-initramfs-beaglebone-yocto-srk-tiny.bin": "arch/arm/boot/zImage",
+            "am335x-yocto-srk-tiny.dtb": "arch/arm/boot/dts/ti/omap/am335x-yocto-srk-tiny.dtb",
+        }
+        # Readiness probes of the boot monitor (default: its hello banner)
+        self.ready_specs = []
+        self.boot_timeout = 30
+        # Boards boot tests run on, and how often each candidate is booted
+        self.boards = BoardPool([DEFAULT_BOARD])
+        self.boots_per_candidate = 1
+        self.rotation = itertools.count()
+        self.checkpoint = OptimizationCheckpoint(f"{self.work_dir}/checkpoint.json")
+        # Files 04_copy_zImage.sh -i -tiny deploys
+        self.artifact_files = [
+            "zImage-initramfs-beaglebone-yocto-srk-tiny.bin",
+            "am335x-yocto-srk-tiny.dtb",
+        ]
         
         # Create results directory
         os.makedirs(self.results_dir, exist_ok=True)
@@ -180,89 +391,340 @@ class KernelOptimizer:
         timestamp = datetime.now().strftime("%H:%M:%S")
         print(f"[{timestamp}] {message}")
         
+    def set_backend(self, backend):
+        """
+        Select the build backend. make-built images get their own cache, so a
+        bitbake build of the same .config is never replaced by one of them.
+        """
+        self.backend = backend
+        suffix = "-make" if backend == "make" else ""
+        self.cache = ArtifactCache(f"{self.work_dir}/cache{suffix}")
+        
     def create_optimization_fragment(self, optimization):
-        """Create optimization fragment file"""
+        """Create optimization fragment file (in the build directory, rewritten only on change)"""
         fragment_name = f"optimization_{optimization['id']}_{optimization['name']}.cfg"
-        fragment_path = os.path.join(self.kernel_dir, fragment_name)
+        fragment_path = os.path.join(self.fragments_dir, fragment_name)
+        
+        content = f"# {optimization['description']}\n"
+        content += f"# Iteration {optimization['id']}: {optimization['id']}_{optimization['name']}\n\n"
+        content += "".join(f"{config}\n" for config in optimization['configs']) + "\n"
         
-        # Skip if already exists
         if os.path.exists(fragment_path):
-            self.log(f"✅ Fragment {fragment_name} already exists")
-            return fragment_name
-            
+            with open(fragment_path, 'r') as f:
+                if f.read() == content:
+                    return fragment_name
+                    
         self.log(f"📝 Creating {fragment_name}")
-        
+        os.makedirs(self.fragments_dir, exist_ok=True)
         with open(fragment_path, 'w') as f:
-            f.write(f"# {optimization['description']}\n")
-            f.write(f"# Iteration {optimization['id']}: {optimization['id']}_{optimization['name']}\n\n")
-            for config in optimization['configs']:
-                f.write(f"{config}\n")
-            f.write("\n")
+            f.write(content)
             
         return fragment_name
         
-    def update_kernel_recipe(self, fragment_name):
-        """Add fragment to kernel recipe if not already present"""
+    def multiconfig_name(self, iteration_id):
+        return f"srkopt{iteration_id}"
+        
+    def candidate_deploy_dir(self, iteration_id):
+        return f"{self.build_dir}/tmp-{self.multiconfig_name(iteration_id)}/deploy/images/{self.machine}"
+        
+    def included_optimizations(self, optimization):
+        """
+        Iterations are cumulative, so candidate N applies the fragments of
+        iterations 1..N. Candidates with "cumulative": False (config search)
+        apply only their own.
+        """
+        if optimization.get("cumulative", True):
+            index = self.optimizations.index(optimization)
+            return self.optimizations[:index + 1]
+        return [optimization]
+        
+    def candidate_fragments(self, optimization):
+        """Fragment names a candidate applies on top of the recipe (minus those it already lists)"""
         with open(self.kernel_recipe, 'r') as f:
-            content = f.read()
-            
-        if f"file://{fragment_name}" in content:
-            self.log(f"✅ {fragment_name} already in recipe")
-            return
+            recipe = f.read()
+        fragments = [self.create_optimization_fragment(o) for o in self.included_optimizations(optimization)]
+        return [name for name in fragments if f"file://{name}" not in recipe]
+        
+    def checkpoint_name(self, optimization):
+        return f"{optimization['id']}@{self.backend}"
+        
+    def describe(self, optimization):
+        """Report fields of a candidate: its description and the options it disables itself"""
+        return {"description": optimization["description"],
+                "options": re.findall(r'CONFIG_\w+', " ".join(optimization["configs"]))}
+        
+    def fingerprint(self, optimization):
+        """Identity of a candidate for the checkpoint: the option lines it applies"""
+        configs = [o["configs"] for o in self.included_optimizations(optimization)]
+        return hashlib.sha256(json.dumps(configs).encode('utf-8')).hexdigest()[:16]
+        
+    def create_candidate_config(self, optimization):
+        """Write the throwaway multiconfig of one candidate"""
+        iteration_id = optimization["id"]
+        fragments = self.candidate_fragments(optimization)
+        
+        mc = self.multiconfig_name(iteration_id)
+        os.makedirs(self.multiconfig_dir, exist_ok=True)
+        with open(os.path.join(self.multiconfig_dir, f"{mc}.conf"), 'w') as f:
+            f.write(f"# Generated by 03_complete_optimization.py for iteration {iteration_id} - safe to delete\n")
+            f.write(f'TMPDIR = "${{TOPDIR}}/tmp-{mc}"\n')
+            f.write(f'SRK_OPT_FRAGMENTS_DIR = "{self.fragments_dir}"\n')
+            f.write(f'SRK_OPT_FRAGMENTS = "{" ".join("file://" + name for name in fragments)}"\n')
             
-        # Find SRC_URI section and add fragment
-        lines = content.split('\n')
-        src_uri_end = -1
-        
-        for i, line in enumerate(lines):
-            if 'SRC_URI += "file://defconfig' in line:
-                # Find the end of SRC_URI
-                for j in range(i, len(lines)):
-                    if lines[j].strip().endswith('"'):
-                        src_uri_end = j
-                        break
-                break
-                
-        if src_uri_end > -1:
-            # Insert before the last line of SRC_URI
-            lines.insert(src_uri_end, f'            file://{fragment_name} \\')
+        self.log(f"🧩 Candidate {mc}: {len(fragments)} fragment(s) on top of the recipe")
+        return mc
+        
+    def remove_candidate(self, iteration_id):
+        """Drop the multiconfig and TMPDIR of a built candidate (sstate keeps the results)"""
+        mc = self.multiconfig_name(iteration_id)
+        conf = os.path.join(self.multiconfig_dir, f"{mc}.conf")
+        if os.path.exists(conf):
+            os.remove(conf)
+        shutil.rmtree(f"{self.build_dir}/tmp-{mc}", ignore_errors=True)
+        
+    def candidate_config(self, iteration_id):
+        """Merged .config of a configured candidate (None if not configured yet)"""
+        mc = self.multiconfig_name(iteration_id)
+        pattern = f"{self.build_dir}/tmp-{mc}/work/*/{self.kernel_name}/*/linux-*-build/.config"
+        matches = glob.glob(pattern)
+        return max(matches, key=os.path.getmtime) if matches else None
+        
+    def configure_candidates(self, multiconfigs):
+        """
+        Merge the configurations of candidates (do_kernel_configme) and deploy
+        their initramfs, the inputs of the cache key, in one bitbake run
+        """
+        self.log(f"🔨 Configuring candidates ({', '.join(multiconfigs)})...")
+        
+        os.makedirs(self.work_dir, exist_ok=True)
+        with open(self.postread_conf, 'w') as f:
+            f.write(f'BBMULTICONFIG += "{" ".join(multiconfigs)}"\n')
             
-            with open(self.kernel_recipe, 'w') as f:
-                f.write('\n'.join(lines))
-                
-            self.log(f"✅ Added {fragment_name} to recipe")
-        else:
-            self.log(f"❌ Could not find SRC_URI section")
+        targets = " ".join(f"mc:{mc}:{self.kernel_name}:do_kernel_configme mc:{mc}:{self.initramfs_image}:do_image_complete"
+                           for mc in multiconfigs)
+        # 10 min per configuration (the initramfs usually comes from sstate)
+        return self.run_bitbake(f"-R {self.postread_conf} {targets}", 600 * len(multiconfigs))
+        
+    def build_kernel(self, multiconfigs):
+        """Build one or more candidate multiconfigs in one bitbake run"""
+        self.log(f"🔨 Building kernel ({', '.join(multiconfigs)})...")
+        
+        os.makedirs(self.work_dir, exist_ok=True)
+        with open(self.postread_conf, 'w') as f:
+            f.write(f'BBMULTICONFIG += "{" ".join(multiconfigs)}"\n')
             
-    def build_kernel(self):
-        """Build the kernel"""
-        self.log("🔨 Building kernel...")
+        targets = " ".join(f"mc:{mc}:{self.kernel_name}" for mc in multiconfigs)
+        # 30 min per candidate build
+        return self.run_bitbake(f"-R {self.postread_conf} {targets}", 1800 * len(multiconfigs))
         
+    def run_bitbake(self, args, timeout):
+        """Run bitbake in the build environment"""
         cmd = [
             "bash", "-c", 
-            "cd /home/srk2cob/project/poky && source oe-init-build-env build && bitbake linux-yocto-srk-tiny"
+            f"cd /home/srk2cob/project/poky && source oe-init-build-env build && bitbake {args}"
         ]
         
+        if self.build_stop.is_set():
+            self.log("🛑 Kernel build skipped - builds are being stopped")
+            return False
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=1800)  # 30 min timeout
-            if result.returncode == 0:
+            # Own process group, so stop_build() reaches bitbake and not only bash
+            self.build_process = process = start_process_group(cmd)
+            _, stderr = process.communicate(timeout=timeout)
+            if process.returncode == 0:
                 self.log("✅ Kernel build successful")
                 return True
+            elif self.build_stop.is_set():
+                self.log("🛑 Kernel build stopped")
+                return False
             else:
-                self.log(f"❌ Kernel build failed: {result.stderr}")
+                self.log(f"❌ Kernel build failed: {stderr}")
                 return False
         except subprocess.TimeoutExpired:
+            stop_process_group(process, BITBAKE_STOP_SIGNALS)
             self.log("❌ Kernel build timed out")
             return False
+        except KeyboardInterrupt:
+            # Ctrl-C no longer reaches bitbake in its own process group
+            stop_process_group(process, BITBAKE_STOP_SIGNALS)
+            raise
         except Exception as e:
             self.log(f"❌ Build error: {e}")
             return False
+        finally:
+            self.build_process = None
+            
+    def stop_build(self):
+        """
+        Stop the running bitbake or make build (from another thread) and
+        refuse new ones until build_stop is cleared.
+        """
+        self.build_stop.set()
+        process = self.build_process
+        if process is not None:
+            self.log("🛑 Stopping the running bitbake...")
+            stop_process_group(process, BITBAKE_STOP_SIGNALS)
+        self.make_tree.stop()
+            
+    def build_inputs(self, config_path, initramfs, source_dir=None):
+        """
+        Inputs besides the .config that change the image, for config_key():
+        the kernel source revision, the recipe with its patches, fragments and
+        DTS, and the bundled initramfs.
+        
+        Args:
+            config_path: Merged .config in the kernel build directory
+            initramfs: Paths the initramfs cpio may be found at; the same at
+                       lookup and store time, so both compute the same key
+            source_dir: Kernel source (default: the git directory of the
+                        work directory the build directory is in)
+        """
+        if source_dir is None:
+            source_dir = os.path.join(os.path.dirname(os.path.dirname(config_path)), "git")
+        return {
+            "source": source_revision(source_dir) or "unknown",
+            "recipe": tree_digest([self.kernel_recipe, self.kernel_files_dir]),
+            "initramfs": initramfs_digest(initramfs) or "none",
+        }
+        
+    def candidate_key(self, iteration_id, config):
+        """Cache key of a configured bitbake candidate, with the initramfs its multiconfig deployed"""
+        deploy_dir = self.candidate_deploy_dir(iteration_id)
+        initramfs = [f"{deploy_dir}/{self.initramfs_name}.cpio", f"{deploy_dir}/{self.initramfs_name}.cpio.gz"]
+        return config_key(config, inputs=self.build_inputs(config, initramfs))
+        
+    def stash_artifacts(self, iteration_id):
+        """
+        Move the freshly built kernel into the artifact cache, so the next
+        build cannot overwrite it.
+        """
+        config = self.candidate_config(iteration_id)
+        if config is None:
+            raise OSError(f"merged .config of iteration {iteration_id} not found")
+        key, normalized = self.candidate_key(iteration_id, config)
+        lookup_key = self.lookup_keys.pop(iteration_id, None)
+        if lookup_key and lookup_key != key:
+            self.log(f"⚠️  Iteration {iteration_id}: cache key changed during the build "
+                     f"({lookup_key[:12]} -> {key[:12]}) - its inputs changed after configuration")
+        artifact_dir = self.cache.store_images(key, self.candidate_deploy_dir(iteration_id),
+                                               self.artifact_files, normalized, iteration_id)
+        self.log(f"📦 Artifacts of iteration {iteration_id} saved to {artifact_dir}")
+        return artifact_dir
+        
+    def record_sizes(self, artifact_dir, build_dir):
+        """Measure text/data/bss per subsystem of a fresh build into its cache entry"""
+        start = time.time()
+        try:
+            sizes = measure_sizes(build_dir)
+        except (OSError, subprocess.SubprocessError) as e:
+            self.log(f"⚠️  Size measurement failed: {e}")
+            return
+        if not sizes:
+            self.log(f"⚠️  No built-in.a archives in {build_dir} - size measurement skipped")
+            return
+        self.cache.store_sizes(self.cache.key_of(artifact_dir), sizes)
+        self.log(f"📏 Sizes of {len(sizes)} subsystems measured in {time.time() - start:.1f}s")
+        
+    def cached_artifacts(self, iteration_id):
+        """Artifact directory of an already built identical configuration, if any"""
+        config = self.candidate_config(iteration_id)
+        if not self.use_cache or config is None:
+            return None
+        key, _ = self.candidate_key(iteration_id, config)
+        self.lookup_keys[iteration_id] = key
+        if not self.cache.has_images(key, self.artifact_files):
+            return None
+        self.cache.record_use(key, iteration_id)
+        self.log(f"♻️  Iteration {iteration_id}: .config {key[:12]} already built - reusing images")
+        return self.cache.entry_dir(key)
+        
+    def seed_make_tree(self):
+        """Seed the persistent make tree from the recipe work directory (once)"""
+        if self.make_tree.is_seeded():
+            return True
+        tmp_dir = f"{self.build_dir}/tmp"
+        workdir = find_workdir(tmp_dir, self.kernel_name)
+        if workdir is None:
+            self.log("🔨 No kernel work directory to seed from - building the recipe with bitbake once")
+            if not self.run_bitbake(self.kernel_name, timeout=1800):
+                return False
+            workdir = find_workdir(tmp_dir, self.kernel_name)
+        self.log(f"🌱 Seeding incremental build tree from {workdir} (one-time copy)...")
+        try:
+            seed = self.make_tree.seed(workdir)
+        except (KernelTreeError, OSError) as e:
+            self.log(f"❌ Cannot seed incremental build tree: {e}")
+            return False
+        self.log(f"✅ Build tree ready in {self.make_tree.root} ({seed['relocated_cmd_files']} kbuild command files relocated)")
+        return True
+        
+    def make_build(self, optimization):
+        """
+        Build stage of the make backend: merge the candidate fragments onto
+        the recipe .config and run an incremental make in the persistent tree.
+        
+        Returns:
+            str: artifact directory, None on failure
+        """
+        iteration_id = optimization["id"]
+        self.log(f"\n{'='*60}")
+        self.log(f"🔧 ITERATION {iteration_id}: {optimization['description']}")
+        self.log(f"{'='*60}")
+        
+        if not self.seed_make_tree():
+            return None
             
-    def copy_kernel(self):
-        """Copy kernel to target"""
-        self.log("📦 Copying kernel to target...")
+        fragments = self.candidate_fragments(optimization)
+        self.log(f"🧩 Merging {len(fragments)} fragment(s) onto the recipe .config")
+        try:
+            result = self.make_tree.configure([os.path.join(self.fragments_dir, name) for name in fragments])
+            if result.returncode != 0:
+                self.log(f"❌ Configuration failed: {result.stderr or result.stdout}")
+                return None
+                
+            config = self.make_tree.config_path
+            initramfs = sorted(glob.glob(self.make_tree.output("usr/*.cpio")))
+            key, normalized = config_key(config, inputs=self.build_inputs(config, initramfs, self.make_tree.source_dir))
+            if self.use_cache and self.cache.has_images(key, self.artifact_files):
+                self.cache.record_use(key, iteration_id)
+                self.log(f"♻️  Iteration {iteration_id}: .config {key[:12]} already built - reusing images")
+                return self.cache.entry_dir(key)
+                
+            if self.build_stop.is_set():
+                self.log("🛑 Kernel build skipped - builds are being stopped")
+                return None
+            self.log(f"🔨 make {' '.join(self.make_targets)} -j{self.make_tree.jobs} (incremental)...")
+            start = time.time()
+            result = self.make_tree.compile(self.make_targets)
+            if result.returncode != 0:
+                self.log(f"❌ Kernel build failed: {result.stderr[-2000:]}")
+                return None
+            self.log(f"✅ Kernel build successful in {time.time() - start:.0f}s")
+            
+            staging_dir = f"{self.work_dir}/make-staging"
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            os.makedirs(staging_dir)
+            for name, product in self.make_outputs.items():
+                shutil.copy2(self.make_tree.output(product), os.path.join(staging_dir, name))
+            artifact_dir = self.cache.store_images(key, staging_dir, self.artifact_files, normalized, iteration_id)
+            self.record_sizes(artifact_dir, self.make_tree.build_dir)
+        except subprocess.TimeoutExpired:
+            self.log("❌ Kernel build timed out")
+            return None
+        except OSError as e:
+            self.log(f"❌ Iteration {iteration_id} failed to save artifacts: {e}")
+            return None
+            
+        self.log(f"📦 Artifacts of iteration {iteration_id} saved to {artifact_dir}")
+        return artifact_dir
         
-        cmd = ["./04_copy_zImage.sh", "-i", "-tiny"]
+    def copy_kernel(self, artifact_dir=None, board=DEFAULT_BOARD):
+        """Copy kernel to a board (from an iteration artifact directory if given)"""
+        self.log(f"📦 Copying kernel to {board.name}...")
+        
+        cmd = ["./04_copy_zImage.sh", "-i", "-tiny"] + board.copy_args()
+        if artifact_dir:
+            cmd += ["-d", artifact_dir]
         
         try:
             result = subprocess.run(cmd, cwd=self.base_dir, capture_output=True, text=True, timeout=120)
@@ -276,126 +738,461 @@ class KernelOptimizer:
             self.log(f"❌ Copy error: {e}")
             return False
             
-    def run_boot_test(self, iteration_id):
-        """Run boot performance test"""
-        self.log("🚀 Running boot performance test...")
+    def boot_log_file(self, iteration_id, repeat=0):
+        suffix = f".{repeat}" if repeat else ""
+        return f"{self.results_dir}/{iteration_id}_boot_test{suffix}.log"
+        
+    def kpi_file(self, iteration_id, repeat=0):
+        suffix = f".{repeat}" if repeat else ""
+        return f"{self.results_dir}/{iteration_id}_boot_test{suffix}.json"
+        
+    def run_boot_test(self, iteration_id, board=DEFAULT_BOARD, repeat=0):
+        """
+        Run boot performance test with the boot monitor as a library.
         
-        log_file = f"{self.results_dir}/{iteration_id}_boot_test.log"
+        Console output goes to the iteration boot log, the KPIs to a JSON
+        sidecar next to it (XX_boot_test.<repeat>.* for repeated boots).
+        """
+        self.log(f"🚀 Running boot performance test on {board.name}...")
+        
+        log_file = self.boot_log_file(iteration_id, repeat)
         
         try:
-            # Run the Python boot monitor
-            cmd = ["python3", "01_reset_bbb_and_log_monitor.py"]
-            
+            monitor = boot_monitor.BBBBootMonitor(probes=build_probes(self.ready_specs, board.target_host))
+            monitor.kpi_json = self.kpi_file(iteration_id, repeat)
+            monitor.serial_command = board.serial_command()
+            monitor.reset_command = board.reset_commandline()
+            monitor.reset_cwd = None
+            if len(self.boards) > 1:
+                monitor.board_name = board.name
             with open(log_file, 'w') as f:
-                result = subprocess.run(
-                    cmd, 
-                    cwd=self.base_dir,
-                    stdout=f,
-                    stderr=subprocess.STDOUT,
-                    timeout=60
-                )
+                monitor.output = f
+                kpis = monitor.run(timeout=self.boot_timeout)
                 
-            if result.returncode == 0:
+            if kpis.get('boot_detected'):
                 self.log(f"✅ Boot test completed - log saved to {log_file}")
                 return True
             else:
-                self.log(f"❌ Boot test failed")
+                self.log("❌ Boot test failed - no boot detected")
                 return False
                 
-        except subprocess.TimeoutExpired:
-            self.log("⏰ Boot test timed out")
+        except ValueError as e:
+            self.log(f"❌ Invalid readiness probe: {e}")
             return False
         except Exception as e:
             self.log(f"❌ Boot test error: {e}")
             return False
             
-    def extract_metrics(self, iteration_id):
-        """Extract metrics from boot test log"""
-        log_file = f"{self.results_dir}/{iteration_id}_boot_test.log"
-        
+    def extract_metrics(self, iteration_id, repeat=0):
+        """
+        Metrics of a boot test from the monitor's KPI sidecar (boot logs
+        without one, e.g. from older runs, are scanned instead)
+        """
         metrics = {
             "iteration": iteration_id,
             "boot_time": None,
             "kernel_size": None,
             "rwdata": None,
             "rodata": None,
+            "init": None,
+            "bss": None,
+            "reserved": None,
             "available_memory": None,
             "total_memory": None
         }
         
         try:
-            with open(log_file, 'r') as f:
-                content = f.read()
-                
-            # Extract boot time
-            import re
-            boot_match = re.search(r'Total Boot Time: (\d+\.\d+) seconds', content)
-            if boot_match:
-                metrics["boot_time"] = float(boot_match.group(1))
+            kpi_file = self.kpi_file(iteration_id, repeat)
+            if os.path.exists(kpi_file):
+                with open(kpi_file, 'r') as f:
+                    kpis = json.load(f)
+                boot_time = kpis.get("total_boot_time")
+                memory = kpis.get("memory") or {}
+            else:
+                kpis = scan_boot_log_file(self.boot_log_file(iteration_id, repeat))
+                boot_time = kpis.total_boot_time
+                memory = kpis.memory.as_dict() if kpis.memory else {}
                 
-            # Extract memory info
-            memory_match = re.search(r'(\d+)K/(\d+)K available \((\d+)K kernel code, (\d+)K rwdata, (\d+)K rodata', content)
-            if memory_match:
-                metrics["available_memory"] = int(memory_match.group(1))
-                metrics["total_memory"] = int(memory_match.group(2))
-                metrics["kernel_size"] = int(memory_match.group(3))
-                metrics["rwdata"] = int(memory_match.group(4))
-                metrics["rodata"] = int(memory_match.group(5))
+            metrics["boot_time"] = boot_time
+            metrics["available_memory"] = memory.get("available_memory")
+            metrics["total_memory"] = memory.get("total_memory")
+            metrics["kernel_size"] = memory.get("kernel_code")
+            for key in ("rwdata", "rodata", "init", "bss", "reserved"):
+                metrics[key] = memory.get(key)
                 
         except Exception as e:
             self.log(f"❌ Error extracting metrics: {e}")
             
         return metrics
         
-    def run_iteration(self, optimization):
-        """Run a single optimization iteration"""
-        iteration_id = optimization["id"]
-        
-        self.log(f"\n{'='*60}")
-        self.log(f"🔧 ITERATION {iteration_id}: {optimization['description']}")
-        self.log(f"{'='*60}")
+    def build_iterations(self, optimizations):
+        """
+        Build stage with checkpointing: candidates whose images an earlier
+        run already built are not built again.
         
-        # Step 1: Create optimization fragment
-        fragment_name = self.create_optimization_fragment(optimization)
+        Returns:
+            list: artifact directory (or None) per optimization
+        """
+        artifact_dirs = {}
+        pending = []
+        for optimization in optimizations:
+            name = self.checkpoint_name(optimization)
+            entry = self.checkpoint.entry(name, self.fingerprint(optimization))
+            artifact_dir = entry.get("artifact_dir") if entry else None
+            if artifact_dir and self.cache.has_images(self.cache.key_of(artifact_dir), self.artifact_files):
+                self.log(f"⏩ Iteration {optimization['id']}: built by an earlier run (checkpoint: {entry['stage']})")
+                artifact_dirs[name] = artifact_dir
+            else:
+                pending.append(optimization)
+                
+        built = self.build_candidates(pending) if pending else []
+        for optimization, artifact_dir in zip(pending, built):
+            name = self.checkpoint_name(optimization)
+            artifact_dirs[name] = artifact_dir
+            if artifact_dir:
+                self.checkpoint.mark(name, self.fingerprint(optimization), "built",
+                                     artifact_dir=artifact_dir, config_key=self.cache.key_of(artifact_dir))
+            else:
+                self.checkpoint.fail(name, self.fingerprint(optimization), "build failed")
+        return [artifact_dirs.get(self.checkpoint_name(o)) for o in optimizations]
         
-        # Step 2: Update kernel recipe
-        self.update_kernel_recipe(fragment_name)
+    def build_candidates(self, optimizations):
+        """
+        Build stage for one or more candidates: fragments, multiconfigs,
+        .config resolution, one bitbake run for the configurations not in
+        the artifact cache and an artifact snapshot per candidate.
         
-        # Step 3: Build kernel
-        if not self.build_kernel():
-            self.log(f"❌ Iteration {iteration_id} failed at build step")
-            return None
+        Returns:
+            list: artifact directory (or None) per optimization
+        """
+        if self.backend == "make":
+            return [self.make_build(optimization) for optimization in optimizations]
             
-        # Step 4: Copy kernel
-        if not self.copy_kernel():
-            self.log(f"❌ Iteration {iteration_id} failed at copy step") 
-            return None
+        multiconfigs = []
+        for optimization in optimizations:
+            self.log(f"\n{'='*60}")
+            self.log(f"🔧 ITERATION {optimization['id']}: {optimization['description']}")
+            self.log(f"{'='*60}")
             
-        # Step 5: Run boot test
-        if not self.run_boot_test(iteration_id):
-            self.log(f"❌ Iteration {iteration_id} failed at test step")
-            return None
+            # Steps 1-2: Create fragments and the candidate multiconfig
+            multiconfigs.append(self.create_candidate_config(optimization))
+            
+        # Step 3: Merge the configurations (cheap) and look them up in the cache
+        artifact_dirs = {}
+        duplicates = {}
+        if self.use_cache and self.configure_candidates(multiconfigs):
+            first_of_key = {}
+            for optimization in optimizations:
+                iteration_id = optimization["id"]
+                artifact_dirs[iteration_id] = self.cached_artifacts(iteration_id)
+                key = self.lookup_keys.get(iteration_id)
+                if artifact_dirs[iteration_id] or key is None:
+                    continue
+                # Candidates of this batch that resolve to the same .config are built once
+                if key in first_of_key:
+                    duplicates[iteration_id] = first_of_key[key]
+                else:
+                    first_of_key[key] = iteration_id
+                    
+        # Step 4: Build kernel(s) not in the cache
+        to_build = [o for o in optimizations
+                    if not artifact_dirs.get(o["id"]) and o["id"] not in duplicates]
+        built = self.build_kernel([self.multiconfig_name(o["id"]) for o in to_build]) if to_build else True
+        
+        for optimization in to_build:
+            iteration_id = optimization["id"]
+            if not built:
+                self.log(f"❌ Iteration {iteration_id} failed at build step")
+                continue
+            try:
+                artifact_dirs[iteration_id] = self.stash_artifacts(iteration_id)
+            except OSError as e:
+                self.log(f"❌ Iteration {iteration_id} failed to save artifacts: {e}")
+                continue
+            self.record_sizes(artifact_dirs[iteration_id], os.path.dirname(self.candidate_config(iteration_id)))
+                
+        for iteration_id, original_id in duplicates.items():
+            artifact_dir = artifact_dirs.get(original_id)
+            if artifact_dir:
+                self.cache.record_use(self.cache.key_of(artifact_dir), iteration_id)
+                self.log(f"♻️  Iteration {iteration_id}: same .config as iteration {original_id}")
+            artifact_dirs[iteration_id] = artifact_dir
+                
+        for optimization in optimizations:
+            self.remove_candidate(optimization["id"])
+        return [artifact_dirs.get(o["id"]) for o in optimizations]
             
-        # Step 6: Extract metrics
-        metrics = self.extract_metrics(iteration_id)
+    def test_iteration(self, optimization, artifact_dir):
+        """
+        Test stage: deploy the iteration artifact, boot test and metrics.
+        
+        The candidate is booted boots_per_candidate times on boards of the
+        pool. Candidates start on successive boards and every further boot
+        moves on by one board, so each board sees every kind of candidate.
         
-        self.log(f"✅ Iteration {iteration_id} completed successfully")
+        Resumes after the last stage the checkpoint recorded: a kernel that
+        is still on a board is not deployed again, a finished boot test is
+        only evaluated.
         
-        if metrics["boot_time"]:
-            self.log(f"📊 Boot time: {metrics['boot_time']:.3f}s")
+        Returns:
+            dict: metrics, with boot_time None if readiness was never reached
+                  (the build KPIs are still reported); None if no boot ran
+        """
+        iteration_id = optimization["id"]
+        key = self.cache.key_of(artifact_dir)
+        name = self.checkpoint_name(optimization)
+        fingerprint = self.fingerprint(optimization)
+        entry = self.checkpoint.entry(name, fingerprint) or {}
+        stage = entry.get("stage")
+        
+        if stage == "measured":
+            self.log(f"⏩ Iteration {iteration_id}: measured by an earlier run")
+            return entry["metrics"]
+        
+        # An identical configuration was already measured: reuse its KPIs and boot log
+        cached = self.cache.load_metrics(key) if self.use_cache else None
+        if cached:
+            self.log(f"♻️  Iteration {iteration_id}: .config {key[:12]} already measured - skipping boot test")
+            boot_log = self.cache.boot_log(key)
+            if boot_log:
+                shutil.copy2(boot_log, self.boot_log_file(iteration_id))
+            # A sidecar of an earlier run would not match the copied log
+            if os.path.exists(self.kpi_file(iteration_id)):
+                os.remove(self.kpi_file(iteration_id))
+            metrics = dict(cached, iteration=iteration_id, sizes=self.cache.load_sizes(key),
+                           **self.describe(optimization))
+            self.checkpoint.mark(name, fingerprint, "measured", metrics=metrics)
+            self.log(f"✅ Iteration {iteration_id} completed (cached)")
+            return metrics
+            
+        # Steps 5-6: Copy kernel and run boot test, once per boot
+        index = next(self.rotation)
+        boards = []
+        for repeat in range(self.boots_per_candidate):
+            board = self.boot_candidate(optimization, artifact_dir, index, repeat, boards)
+            if board is None:
+                return None
+            boards.append(board)
+        self.checkpoint.mark(name, fingerprint, "tested")
+            
+        # Step 7: Extract metrics (memory layout is per build, boot time per boot)
+        runs = [self.extract_metrics(iteration_id, repeat) for repeat in range(self.boots_per_candidate)]
+        metrics = runs[0]
+        metrics["boot_times"] = [run["boot_time"] for run in runs]
+        metrics["boards"] = boards
+        metrics["boot_time"] = None if None in metrics["boot_times"] else \
+            sum(metrics["boot_times"]) / len(runs)
+        metrics["config_key"] = key
+        metrics["sizes"] = self.cache.load_sizes(key)
+        metrics.update(self.describe(optimization))
+        if metrics["boot_time"] is not None:
+            self.cache.store_metrics(key, metrics, self.boot_log_file(iteration_id))
+            self.checkpoint.mark(name, fingerprint, "measured", metrics=metrics)
+        else:
+            # A hung board and a kernel that cannot boot look alike: retry those boots on resume
+            for repeat, boot_time in enumerate(metrics["boot_times"]):
+                if boot_time is None:
+                    self.checkpoint.mark_boot(name, fingerprint, repeat, "deployed", boards[repeat], key)
+            self.checkpoint.fail(name, fingerprint, "readiness not reached", stage="deployed")
+            self.log(f"❌ Iteration {iteration_id}: readiness not reached - boot failed")
+        
+        if metrics["boot_time"] is not None:
+            self.log(f"✅ Iteration {iteration_id} completed successfully")
+            spread = ""
+            if len(runs) > 1:
+                spread = f" (mean of {len(runs)} boots, {min(metrics['boot_times']):.3f}-{max(metrics['boot_times']):.3f}s)"
+            self.log(f"📊 Boot time: {metrics['boot_time']:.3f}s{spread}")
         if metrics["rwdata"] and metrics["rodata"]:
             self.log(f"💾 Memory: rwdata={metrics['rwdata']}K, rodata={metrics['rodata']}K")
             
         return metrics
         
-    def generate_report(self, all_metrics):
-        """Generate final optimization report"""
+    def boot_candidate(self, optimization, artifact_dir, index, repeat, used):
+        """
+        One boot of a candidate on a free board of the pool.
+        
+        Args:
+            index: Rotation index of the candidate
+            repeat: Number of the boot (0 for the first)
+            used: Names of the boards that already booted this candidate
+            
+        Returns:
+            str: name of the board that booted the candidate, None on failure
+        """
+        iteration_id = optimization["id"]
+        key = self.cache.key_of(artifact_dir)
+        name = self.checkpoint_name(optimization)
+        fingerprint = self.fingerprint(optimization)
+        progress = self.checkpoint.boot(name, fingerprint, repeat) or {}
+        
+        if progress.get("stage") == "tested" and os.path.exists(self.kpi_file(iteration_id, repeat)):
+            self.log(f"⏩ Iteration {iteration_id}: boot test finished by an earlier run on {progress['board']}")
+            return progress["board"]
+            
+        # Boot a kernel an interrupted run left on a board there again
+        preferred = None
+        if progress.get("stage") == "deployed" and self.checkpoint.deployed(progress["board"]) == key:
+            preferred = self.boards.get(progress["board"])
+        board = self.boards.acquire(preferred or self.boards.rotation(index, repeat), avoid=used)
+        try:
+            if board is preferred:
+                self.log(f"⏩ Iteration {iteration_id}: kernel {key[:12]} is still deployed on {board.name}")
+            else:
+                self.checkpoint.undeploy(board.name)
+                if not self.copy_kernel(artifact_dir, board):
+                    self.log(f"❌ Iteration {iteration_id} failed at copy step")
+                    self.checkpoint.mark_boot(name, fingerprint, repeat, None, board.name)
+                    self.checkpoint.fail(name, fingerprint, "copy failed", stage="built")
+                    return None
+                self.checkpoint.mark_boot(name, fingerprint, repeat, "deployed", board.name, key)
+                self.checkpoint.mark(name, fingerprint, "deployed", config_key=key)
+                
+            if not self.run_boot_test(iteration_id, board, repeat):
+                self.log(f"❌ Iteration {iteration_id} failed at test step")
+                self.checkpoint.fail(name, fingerprint, "boot test failed", stage="deployed")
+                return None
+            self.checkpoint.mark_boot(name, fingerprint, repeat, "tested", board.name)
+            return board.name
+        finally:
+            self.boards.release(board)
+            
+    def run_iteration(self, optimization):
+        """Run a single optimization iteration (build, then test)"""
+        artifact_dir = self.build_iterations([optimization])[0]
+        if artifact_dir is None:
+            return None
+        return self.test_iteration(optimization, artifact_dir)
+        
+    def confirm_with_bitbake(self, optimization):
+        """Build and boot-test a candidate with bitbake to confirm a make backend result"""
+        self.log(f"\n🏗️  Confirming iteration {optimization['id']} with a bitbake build")
+        backend = self.backend
+        self.set_backend("bitbake")
+        try:
+            return self.run_iteration(optimization)
+        finally:
+            self.set_backend(backend)
+            
+    def run_pipelined(self):
+        """
+        Overlap building and testing: a builder thread runs bitbake for the
+        next iteration while the boards deploy and boot-test earlier ones,
+        one candidate per board at a time.
+        
+        Returns:
+            list: metrics (or None) per iteration, in order
+        """
+        # At most one finished build waits for a board
+        handoff = queue.Queue(maxsize=1)
+        boards_free = threading.Semaphore(len(self.boards))
+        
+        def hand_off(item):
+            # Nobody takes builds any more once the run stops
+            while not self.build_stop.is_set():
+                try:
+                    handoff.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    pass
+                    
+        def builder():
+            batch_size = max(1, self.parallel_builds)
+            for start in range(0, len(self.optimizations), batch_size):
+                if self.build_stop.is_set():
+                    break
+                batch = self.optimizations[start:start + batch_size]
+                try:
+                    artifact_dirs = self.build_iterations(batch)
+                except Exception as e:
+                    self.log(f"❌ Build of iterations {', '.join(o['id'] for o in batch)} failed: {e}")
+                    artifact_dirs = [None] * len(batch)
+                for optimization, artifact_dir in zip(batch, artifact_dirs):
+                    hand_off((optimization, artifact_dir))
+            hand_off(None)
+            
+        build_thread = threading.Thread(target=builder, daemon=True)
+        build_thread.start()
+        
+        # Test jobs in iteration order; KPIs are collected as the boards finish
+        jobs = []
+        executor = ThreadPoolExecutor(max_workers=len(self.boards))
+        try:
+            while True:
+                # Timed, so Ctrl-C is seen while the builder thread holds the signal
+                try:
+                    item = handoff.get(timeout=1)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    break
+                optimization, artifact_dir = item
+                if artifact_dir is None:
+                    jobs.append((optimization, None))
+                    continue
+                boards_free.acquire()
+                future = executor.submit(self.test_iteration, optimization, artifact_dir)
+                future.add_done_callback(lambda _: boards_free.release())
+                jobs.append((optimization, future))
+        except KeyboardInterrupt:
+            self.log("🛑 Optimization interrupted by user - stopping after the running boot tests")
+            executor.shutdown(wait=False, cancel_futures=True)
+        finally:
+            # Whatever ended the loop, no build may go on into tmp-<mc> behind it
+            self.stop_build()
+            build_thread.join()
+            self.build_stop.clear()
+            executor.shutdown(wait=True)
+        
+        all_metrics = []
+        for optimization, future in jobs:
+            if future is None or future.cancelled():
+                all_metrics.append(None)
+            elif future.exception():
+                self.log(f"❌ Iteration {optimization['id']} failed: {future.exception()}")
+                all_metrics.append(None)
+            else:
+                all_metrics.append(future.result())
+        return all_metrics
+        
+    def record_size_deltas(self, all_metrics):
+        """
+        Per-subsystem size change of each iteration against the previous
+        measured one, stored in the metrics and as XX_sizes.json next to the
+        boot KPIs
+        """
+        previous = None
+        for metrics in all_metrics:
+            if not metrics or not metrics.get("sizes"):
+                continue
+            metrics["size_deltas"] = size_deltas(previous["sizes"], metrics["sizes"]) if previous else {}
+            with open(f"{self.results_dir}/{metrics['iteration']}_sizes.json", 'w') as f:
+                json.dump({"iteration": metrics["iteration"],
+                           "previous": previous["iteration"] if previous else None,
+                           "sizes": metrics["sizes"],
+                           "deltas": metrics["size_deltas"]}, f, indent=2)
+            previous = metrics
+            
+    def generate_report(self, all_metrics, confirmed=None):
+        """
+        Generate final optimization report: Markdown summary and the
+        interactive HTML report (optimization_report.py)
+        """
         self.log("\n" + "="*60)
         self.log("📊 GENERATING OPTIMIZATION REPORT")
         self.log("="*60)
         
-        report_file = f"{self.results_dir}/optimization_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        report_file = f"{self.results_dir}/optimization_report_{stamp}.md"
         
+        def fmt(value, spec="{}"):
+            return "N/A" if value is None else spec.format(value)
+            
+        # Metrics from earlier runs may lack the report fields
+        steps = []
+        for optimization, metrics in zip(self.optimizations, all_metrics):
+            if metrics:
+                steps.append(dict(self.describe(optimization), **metrics))
+                
         with open(report_file, 'w') as f:
             f.write("# Kernel Optimization Report\n\n")
             f.write(f"Generated: {datetime.now()}\n\n")
@@ -404,65 +1201,447 @@ class KernelOptimizer:
             f.write("| Iteration | Description | Boot Time (s) | rwdata (K) | rodata (K) | Available Memory (K) |\n")
             f.write("|-----------|-------------|---------------|------------|------------|---------------------|\n")
             
-            for metrics in all_metrics:
-                if metrics:
-                    f.write(f"| {metrics['iteration']} | {self.optimizations[int(metrics['iteration'])-1]['description']} |")
-                    f.write(f" {metrics['boot_time']:.3f} |" if metrics['boot_time'] else " N/A |")
-                    f.write(f" {metrics['rwdata']} |" if metrics['rwdata'] else " N/A |")
-                    f.write(f" {metrics['rodata']} |" if metrics['rodata'] else " N/A |")
-                    f.write(f" {metrics['available_memory']} |\n" if metrics['available_memory'] else " N/A |\n")
+            for metrics in steps:
+                f.write(f"| {metrics['iteration']} | {metrics['description']} |"
+                        f" {fmt(metrics.get('boot_time'), '{:.3f}')} | {fmt(metrics.get('rwdata'))} |"
+                        f" {fmt(metrics.get('rodata'))} | {fmt(metrics.get('available_memory'))} |\n")
                     
             f.write("\n## Performance Trends\n\n")
             
             # Calculate improvements
-            if len([m for m in all_metrics if m and m['boot_time']]) > 1:
-                first_boot = next(m['boot_time'] for m in all_metrics if m and m['boot_time'])
-                last_boot = next(m['boot_time'] for m in reversed(all_metrics) if m and m['boot_time'])
-                improvement = first_boot - last_boot
-                f.write(f"**Boot Time Improvement**: {improvement:.3f}s ({improvement/first_boot*100:.1f}%)\n\n")
+            booted = [m["boot_time"] for m in steps if m.get("boot_time")]
+            if len(booted) > 1:
+                improvement = booted[0] - booted[-1]
+                f.write(f"**Boot Time Improvement**: {improvement:.3f}s ({improvement/booted[0]*100:.1f}%)\n\n")
+                
+            rwdata = [m["rwdata"] for m in steps if m.get("rwdata")]
+            if len(rwdata) > 1:
+                improvement = rwdata[0] - rwdata[-1]
+                f.write(f"**rwdata Reduction**: {improvement}K ({improvement/rwdata[0]*100:.1f}%)\n\n")
                 
-            if len([m for m in all_metrics if m and m['rwdata']]) > 1:
-                first_rwdata = next(m['rwdata'] for m in all_metrics if m and m['rwdata'])
-                last_rwdata = next(m['rwdata'] for m in reversed(all_metrics) if m and m['rwdata'])
-                improvement = first_rwdata - last_rwdata
-                f.write(f"**rwdata Reduction**: {improvement}K ({improvement/first_rwdata*100:.1f}%)\n\n")
+            sized = [m for m in all_metrics if m and m.get("size_deltas")]
+            if sized:
+                f.write("## Kernel Size by Subsystem\n\n")
+                f.write("Build-time change against the previous iteration (kernel_size.py).\n\n")
+                f.write("| Iteration | vmlinux text (K) | vmlinux data (K) | vmlinux bss (K) | Largest Reductions |\n")
+                f.write("|-----------|------------------|------------------|-----------------|--------------------|\n")
+                for metrics in sized:
+                    deltas = metrics["size_deltas"]
+                    image = deltas.get("vmlinux", {})
+                    shrunk = sorted((size_total(d), name) for name, d in deltas.items()
+                                    if name != "vmlinux" and size_total(d) < 0)
+                    reductions = ", ".join(f"{name} {change / 1024:+.1f}K" for change, name in shrunk[:3])
+                    f.write(f"| {metrics['iteration']} |")
+                    for field in ("text", "data", "bss"):
+                        f.write(f" {image.get(field, 0) / 1024:+.1f} |")
+                    f.write(f" {reductions or 'none'} |\n")
+                f.write("\n")
+                
+            if confirmed:
+                f.write("## Confirmed Build (bitbake)\n\n")
+                f.write(f"Iteration {confirmed['iteration']} rebuilt with bitbake:"
+                        f" boot time {fmt(confirmed.get('boot_time'), '{:.3f}s')},"
+                        f" rwdata {fmt(confirmed.get('rwdata'), '{}K')}\n")
                 
         self.log(f"📄 Report saved to: {report_file}")
         
-    def run_all_iterations(self):
+        html_file = write_report(f"{self.results_dir}/optimization_report_{stamp}.html", steps,
+                                 confirmed=confirmed, generated=datetime.now())
+        self.log(f"📄 Interactive report saved to: {html_file}")
+        
+    def run_all_iterations(self, pipelined=True, confirm=True):
         """Run all optimization iterations"""
         all_metrics = []
+        confirmed = None
+        start = time.time()
         
         self.log("🚀 Starting iterative kernel optimization")
         self.log(f"📁 Results will be saved to: {self.results_dir}")
+        if self.backend == "make":
+            self.log("⚡ make backend: incremental builds in the persistent kernel tree")
+        if len(self.boards) > 1 or self.boots_per_candidate > 1:
+            self.log(f"🎛️  {len(self.boards)} board(s): {', '.join(b.name for b in self.boards.boards)}, "
+                     f"{self.boots_per_candidate} boot(s) per candidate")
+        if self.checkpoint.state["iterations"]:
+            self.log(f"⏩ Resuming from {self.checkpoint.path}: {self.checkpoint.summary()}")
         
-        for optimization in self.optimizations:
-            try:
-                metrics = self.run_iteration(optimization)
-                all_metrics.append(metrics)
-                
-                # Brief pause between iterations
-                time.sleep(2)
-                
-            except KeyboardInterrupt:
-                self.log("🛑 Optimization interrupted by user")
-                break
-            except Exception as e:
-                self.log(f"❌ Iteration {optimization['id']} failed: {e}")
-                all_metrics.append(None)
+        if pipelined:
+            self.log("⚡ Pipelined mode: building the next iteration while testing the current one")
+            all_metrics = self.run_pipelined()
+        else:
+            for optimization in self.optimizations:
+                try:
+                    metrics = self.run_iteration(optimization)
+                    all_metrics.append(metrics)
+                    
+                    # Brief pause between iterations
+                    time.sleep(2)
+                    
+                except KeyboardInterrupt:
+                    self.log("🛑 Optimization interrupted by user")
+                    break
+                except Exception as e:
+                    self.log(f"❌ Iteration {optimization['id']} failed: {e}")
+                    all_metrics.append(None)
+                    
+        self.record_size_deltas(all_metrics)
+        
+        # The last successful (cumulative) configuration is the confirmed result
+        if self.backend == "make" and confirm:
+            final = None
+            for optimization, metrics in zip(self.optimizations, all_metrics):
+                if metrics and metrics.get("boot_time") is not None:
+                    final = optimization
+            if final:
+                confirmed = self.confirm_with_bitbake(final)
                 
+        self.log(f"⏱️  Total wall time: {(time.time() - start) / 60:.1f} minutes")
+        
         # Generate final report
-        self.generate_report(all_metrics)
+        self.generate_report(all_metrics, confirmed)
         
         self.log("\n🎉 Optimization process completed!")
         
         # Summary
-        successful = len([m for m in all_metrics if m])
+        successful = len([m for m in all_metrics if m and m.get("boot_time") is not None])
         self.log(f"✅ Successful iterations: {successful}/{len(self.optimizations)}")
 
+class ConfigSearch:
+    """
+    Greedy search for the minimal kernel config over a pool of CONFIG_* options.
+    
+    Each option is a variable that is either left to the recipe or disabled.
+    Options are tried a group at a time on top of everything accepted so far:
+    a group that still passes the readiness suite (boot test with all probes
+    satisfied) is accepted as a whole, a group that breaks boot is bisected
+    until the offending options are isolated and kept enabled. Options the
+    merged .config still enables (selected by another symbol, or turned back
+    on by olddefconfig) are set aside as forced on by Kconfig without a boot.
+    
+    Every accepted step records its marginal boot time and rwdata saving
+    against the previous accepted state. Options accepted together share one
+    measurement (only bisected groups resolve single options) unless
+    per_option is set: each option of an accepted group is then also
+    measured on its own against the state before the group. Options that do
+    not change the merged .config cost no boot at all thanks to the artifact
+    cache.
+    """
+    
+    def __init__(self, optimizer, groups):
+        self.optimizer = optimizer
+        self.groups = groups
+        self.accepted = []
+        self.rejected = []
+        self.forced = []
+        self.steps = []
+        self.baseline = None
+        self.current = None
+        self.evaluations = 0
+        # Rebuild the result with bitbake when searching with the make backend
+        self.confirm = True
+        self.confirmed = None
+        # Measure each option of an accepted group on its own
+        self.per_option = False
+        
+    def log(self, message):
+        self.optimizer.log(message)
+        
+    @staticmethod
+    def default_groups(optimizations):
+        """The hand-written iteration groups as the candidate pool"""
+        return [(o["name"], re.findall(r'CONFIG_\w+', " ".join(o["configs"]))) for o in optimizations]
+        
+    @staticmethod
+    def load_pool(path):
+        """
+        Read a candidate pool: one CONFIG_* (or "# CONFIG_* is not set") per
+        line, groups separated by blank lines or "[name]" headers.
+        """
+        groups = []
+        name, options = None, []
+        
+        def flush():
+            if options:
+                groups.append((name or f"group_{len(groups) + 1:02d}", list(options)))
+            options.clear()
+            
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                header = re.match(r'^\[(.+)\]$', line)
+                if header or not line:
+                    flush()
+                    name = header.group(1) if header else None
+                    continue
+                match = re.search(r'CONFIG_\w+', line)
+                if match and (not line.startswith('#') or line.endswith('is not set')):
+                    options.append(match.group(0))
+        flush()
+        return groups
+        
+    def evaluate(self, options, description):
+        """
+        Build and boot-test the recipe with options disabled.
+        
+        A build that still enables any of the options is not booted.
+        
+        Returns:
+            tuple: (metrics or None, failure reason or None, options forced on)
+        """
+        self.evaluations += 1
+        candidate = {
+            "id": f"s{self.evaluations:02d}",
+            "name": "config_search",
+            "description": description,
+            "configs": [f"# {option} is not set" for option in options],
+            "cumulative": False,
+        }
+        artifact_dir = self.optimizer.build_iterations([candidate])[0]
+        if artifact_dir is None:
+            return None, "build failed", []
+        config = self.optimizer.cache.load_config(self.optimizer.cache.key_of(artifact_dir))
+        forced = [option for option in options if config.get(option) in ("y", "m")]
+        if forced:
+            return None, "forced on by Kconfig", forced
+        metrics = self.optimizer.test_iteration(candidate, artifact_dir)
+        if not metrics or metrics.get("boot_time") is None:
+            return None, "readiness not reached", []
+        return metrics, None, []
+        
+    @staticmethod
+    def saving(before, after, key):
+        if before.get(key) is None or after.get(key) is None:
+            return None
+        return before[key] - after[key]
+        
+    def accept(self, group, options, metrics):
+        step = {
+            "group": group,
+            "options": list(options),
+            "boot_time": metrics.get("boot_time"),
+            "rwdata": metrics.get("rwdata"),
+            "boot_time_saving": self.saving(self.current, metrics, "boot_time"),
+            "rwdata_saving": self.saving(self.current, metrics, "rwdata"),
+            "config_key": metrics.get("config_key"),
+        }
+        if self.per_option and len(options) > 1:
+            step["per_option"] = self.measure_options(group, options)
+        self.steps.append(step)
+        self.accepted.extend(options)
+        self.current = metrics
+        
+        summary = f"✅ Accepted {len(options)} option(s) of {group}"
+        if step["boot_time_saving"] is not None:
+            summary += f", boot time saving {step['boot_time_saving'] * 1000:+.0f}ms"
+        if step["rwdata_saving"] is not None:
+            summary += f", rwdata saving {step['rwdata_saving']:+d}K"
+        self.log(summary)
+            
+    def measure_options(self, group, options):
+        """
+        Saving of each option of an accepted group on its own, against the
+        accepted state before the group
+        
+        Returns:
+            dict: {option: {"boot_time_saving", "rwdata_saving"}} of the
+                  options whose measurement passed
+        """
+        savings = {}
+        for option in options:
+            metrics, error, _ = self.evaluate(self.accepted + [option], f"{group}: {option} alone")
+            if metrics is None:
+                self.log(f"⚠️  {option} alone: {error} - keeping the group measurement")
+                continue
+            savings[option] = {
+                "boot_time_saving": self.saving(self.current, metrics, "boot_time"),
+                "rwdata_saving": self.saving(self.current, metrics, "rwdata"),
+            }
+        return savings
+        
+    def try_options(self, group, options):
+        """Disable options on top of the accepted set, bisecting on failure"""
+        if not options:
+            return
+        metrics, error, forced = self.evaluate(self.accepted + options,
+                                               f"{group}: disable {len(options)} option(s)")
+        if metrics:
+            self.accept(group, options, metrics)
+            return
+        remaining = [option for option in options if option not in forced]
+        if len(remaining) < len(options):
+            for option in options:
+                if option in forced:
+                    self.log(f"🔒 {option} is forced on by Kconfig - keeping it")
+                    self.forced.append({"group": group, "option": option})
+            self.try_options(group, remaining)
+            return
+        if len(options) == 1:
+            self.log(f"🚫 {options[0]} is required ({error}) - keeping it")
+            self.rejected.append({"group": group, "option": options[0], "reason": error})
+            return
+        half = len(options) // 2
+        self.log(f"🔀 {group}: {len(options)} options break boot ({error}) - bisecting")
+        self.try_options(group, options[:half])
+        self.try_options(group, options[half:])
+        
+    def run(self):
+        """Search the whole pool, returns False if the baseline does not pass"""
+        start = time.time()
+        pool = sum(len(options) for _, options in self.groups)
+        self.log(f"🔎 Config search over {pool} options in {len(self.groups)} groups")
+        
+        self.baseline, error, _ = self.evaluate([], "baseline")
+        if not self.baseline:
+            self.log(f"❌ Baseline kernel does not pass the readiness suite ({error}) - aborting search")
+            return False
+        self.current = self.baseline
+        
+        for group, options in self.groups:
+            seen = set(self.accepted) | {r["option"] for r in self.rejected + self.forced}
+            self.try_options(group, [o for o in options if o not in seen])
+            
+        self.log(f"🏁 Search converged after {self.evaluations} evaluations "
+                 f"in {(time.time() - start) / 60:.1f} minutes: "
+                 f"{len(self.accepted)} disabled, {len(self.rejected)} required, "
+                 f"{len(self.forced)} forced on by Kconfig")
+        if self.optimizer.backend == "make" and self.confirm:
+            self.confirmed = self.optimizer.confirm_with_bitbake({
+                "id": "sfinal",
+                "name": "config_search",
+                "description": "Minimal config found by the search",
+                "configs": [f"# {option} is not set" for option in self.accepted],
+                "cumulative": False,
+            })
+        self.write_report()
+        return True
+        
+    def write_report(self):
+        """Markdown report, JSON steps and the minimal config fragment"""
+        results_dir = self.optimizer.results_dir
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        fragment_file = f"{results_dir}/config_search_minimal.cfg"
+        with open(fragment_file, 'w') as f:
+            f.write(f"# Minimal config found by 03_complete_optimization.py --search ({stamp})\n\n")
+            for option in self.accepted:
+                f.write(f"# {option} is not set\n")
+                
+        with open(f"{results_dir}/config_search_{stamp}.json", 'w') as f:
+            json.dump({"baseline": self.baseline, "final": self.current, "confirmed": self.confirmed,
+                       "steps": self.steps,
+                       "rejected": self.rejected, "forced": self.forced,
+                       "evaluations": self.evaluations}, f, indent=2)
+            
+        def fmt(value, scale=1, unit=""):
+            return "N/A" if value is None else f"{value * scale:+.0f}{unit}"
+            
+        report_file = f"{results_dir}/config_search_report_{stamp}.md"
+        with open(report_file, 'w') as f:
+            f.write("# Kernel Config Search Report\n\n")
+            f.write(f"Generated: {datetime.now()}\n\n")
+            f.write(f"- Evaluations: {self.evaluations}\n")
+            f.write(f"- Options disabled: {len(self.accepted)}\n")
+            f.write(f"- Options required for boot: {len(self.rejected)}\n")
+            f.write(f"- Options forced on by Kconfig: {len(self.forced)}\n")
+            f.write(f"- Boot time: {self.baseline['boot_time']:.3f}s → {self.current['boot_time']:.3f}s\n")
+            if self.baseline.get("rwdata") is not None and self.current.get("rwdata") is not None:
+                f.write(f"- rwdata: {self.baseline['rwdata']}K → {self.current['rwdata']}K\n")
+            if self.confirmed and self.confirmed.get("boot_time") is not None:
+                f.write(f"- Confirmed with bitbake: {self.confirmed['boot_time']:.3f}s\n")
+            f.write(f"- Minimal fragment: `{os.path.basename(fragment_file)}`\n\n")
+            
+            f.write("## Marginal Savings per Option\n\n")
+            if self.per_option:
+                f.write("Options accepted in the same step were also measured one at a time against the "
+                        "state before the step; Shared With counts the options of a group measurement "
+                        "an option still shares.\n\n")
+            else:
+                f.write("Options accepted in the same step share one measurement; only options isolated "
+                        "by bisection have their own. Run with --per-option-savings to measure each "
+                        "option of an accepted group on its own.\n\n")
+            f.write("| Option | Group | Boot Time Saving (ms) | rwdata Saving (K) | Shared With |\n")
+            f.write("|--------|-------|-----------------------|-------------------|-------------|\n")
+            for step in self.steps:
+                for option in step["options"]:
+                    own = step.get("per_option", {}).get(option)
+                    saving, shared = (own, 0) if own else (step, len(step["options"]) - 1)
+                    f.write(f"| {option} | {step['group']} | {fmt(saving['boot_time_saving'], 1000)} |"
+                            f" {fmt(saving['rwdata_saving'])} | {shared} |\n")
+                    
+            if self.rejected:
+                f.write("\n## Required Options (disabling breaks boot)\n\n")
+                f.write("| Option | Group | Failure |\n")
+                f.write("|--------|-------|---------|\n")
+                for rejected in self.rejected:
+                    f.write(f"| {rejected['option']} | {rejected['group']} | {rejected['reason']} |\n")
+                    
+            if self.forced:
+                f.write("\n## Forced On by Kconfig (still enabled in the merged .config)\n\n")
+                f.write("| Option | Group |\n")
+                f.write("|--------|-------|\n")
+                for forced in self.forced:
+                    f.write(f"| {forced['option']} | {forced['group']} |\n")
+                    
+        self.log(f"📄 Search report saved to: {report_file}")
+        self.log(f"🧩 Minimal fragment saved to: {fragment_file}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Iterative kernel optimization")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Build, deploy and test strictly one iteration after another")
+    parser.add_argument("--parallel-builds", type=int, default=1, metavar="N",
+                        help="Build N candidates per bitbake run (pipelined mode, default: 1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rebuild and re-test every candidate (results still refresh the cache)")
+    parser.add_argument("--ready", action="append", default=[], metavar="PROBE",
+                        help="Boot monitor readiness probe, repeatable (default: hello)")
+    parser.add_argument("--backend", choices=["bitbake", "make"], default="bitbake",
+                        help="Build candidates with bitbake multiconfigs or incremental make (default: bitbake)")
+    parser.add_argument("--no-confirm", action="store_true",
+                        help="make backend: skip the bitbake build of the final configuration")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard the checkpoint and start all iterations from scratch")
+    parser.add_argument("--boot-timeout", type=int, default=30, metavar="SECONDS",
+                        help="Boot monitor timeout per boot test (default: 30)")
+    parser.add_argument("--search", action="store_true",
+                        help="Greedy/bisection search for the minimal config instead of the fixed iterations")
+    parser.add_argument("--boards", metavar="FILE",
+                        help="JSON list of test boards to boot candidates on in parallel (see board_pool.py)")
+    parser.add_argument("--boots-per-candidate", type=int, default=1, metavar="N",
+                        help="Boot every candidate on N boards and average the boot time (default: 1)")
+    parser.add_argument("--pool", metavar="FILE",
+                        help="Candidate option pool for --search (default: the iteration groups)")
+    parser.add_argument("--per-option-savings", action="store_true",
+                        help="--search: also measure each option of an accepted group on its own")
+    args = parser.parse_args()
+    
     optimizer = KernelOptimizer()
-    optimizer.run_all_iterations()
+    optimizer.parallel_builds = args.parallel_builds
+    optimizer.use_cache = not args.no_cache
+    optimizer.ready_specs = args.ready
+    optimizer.boot_timeout = args.boot_timeout
+    optimizer.boots_per_candidate = max(1, args.boots_per_candidate)
+    if args.boards:
+        try:
+            optimizer.boards = BoardPool(load_boards(args.boards))
+        except (OSError, ValueError) as e:
+            print(f"❌ Invalid board list {args.boards}: {e}")
+            sys.exit(2)
+    optimizer.set_backend(args.backend)
+    if args.restart:
+        optimizer.checkpoint.reset()
+    
+    if args.search:
+        groups = ConfigSearch.load_pool(args.pool) if args.pool else \
+            ConfigSearch.default_groups(optimizer.optimizations)
+        search = ConfigSearch(optimizer, groups)
+        search.confirm = not args.no_confirm
+        search.per_option = args.per_option_savings
+        if not search.run():
+            sys.exit(1)
+        return
+        
+    optimizer.run_all_iterations(pipelined=not args.sequential, confirm=not args.no_confirm)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
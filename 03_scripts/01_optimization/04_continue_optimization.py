@@ -2,6 +2,9 @@
 """
 Continue Iterative Optimization - Streamlined Version
 Complete remaining iterations 3-10 quickly
+
+Superseded: 03_complete_optimization.py checkpoints every iteration and
+resumes an interrupted run by itself.
 """
 
 import os
@@ -4,68 +4,92 @@ Final Corrected Boot Analysis with Complete Memory Data
 """
 
 import os
-import re
+import sys
 from datetime import datetime
 
+# Shared helpers live at the top of the meta-srk layer
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from boot_readiness import build_probes
+from boot_log_archive import ARCHIVE_SUFFIX, is_archive, read_kpis
+from boot_kpi import scan_boot_log_file
+
 class FinalBootAnalyzer:
-    def __init__(self):
+    def __init__(self, ready_specs=None):
         self.base_dir = "/home/srk2cob/project/poky/meta-srk"
         self.results_dir = f"{self.base_dir}/03_scripts/01_optimization/01_logs"
+        # Same readiness probes as the boot monitor (only serial probes apply offline)
+        self.probes = build_probes(ready_specs or ['application'])
+        # Archive headers record readiness with the probes of the capture
+        self.custom_probes = bool(ready_specs)
+        self._kpi_cache = {}
+        
+    def resolve_log(self, name):
+        """Prefer the boot log archive over the legacy text log of the same run"""
+        stem, _ = os.path.splitext(os.path.join(self.results_dir, name))
+        if os.path.exists(stem + ARCHIVE_SUFFIX):
+            return stem + ARCHIVE_SUFFIX
+        return os.path.join(self.results_dir, name)
+        
+    def scan(self, log_file):
+        """Extract all boot KPIs from a log in one pass (cached per file)"""
+        if log_file not in self._kpi_cache:
+            try:
+                self._kpi_cache[log_file] = scan_boot_log_file(log_file, self.probes)
+            except Exception:
+                self._kpi_cache[log_file] = None
+        return self._kpi_cache[log_file]
         
     def extract_memory_data(self, log_file):
-        """Extract memory data using proper regex"""
+        """Extract the kernel memory map"""
         if not os.path.exists(log_file):
             return None
             
-        # Read as binary to handle mixed content
-        try:
-            with open(log_file, 'rb') as f:
-                content = f.read().decode('utf-8', errors='ignore')
-        except:
-            return None
+        # Archives carry the parsed memory KPIs in their header
+        if is_archive(log_file):
+            try:
+                memory = read_kpis(log_file).get('kpis', {}).get('memory', {})
+            except Exception:
+                memory = {}
+            if all(key in memory for key in ('kernel_code', 'rwdata', 'rodata', 'init', 'bss')):
+                return memory
             
-        # Look for the memory line
-        memory_pattern = r'Memory:\s+(\d+)K/(\d+)K available \((\d+)K kernel code, (\d+)K rwdata, (\d+)K rodata, (\d+)K init, (\d+)K bss'
-        match = re.search(memory_pattern, content)
-        
-        if match:
-            return {
-                'available_memory': int(match.group(1)),
-                'total_memory': int(match.group(2)),
-                'kernel_code': int(match.group(3)),
-                'rwdata': int(match.group(4)),
-                'rodata': int(match.group(5)),
-                'init': int(match.group(6)),
-                'bss': int(match.group(7))
-            }
-        return None
+        kpis = self.scan(log_file)
+        if kpis is None or kpis.memory is None:
+            return None
+        return kpis.memory.as_dict()
         
     def get_boot_timing(self, log_file):
         """Extract boot timing information"""
         if not os.path.exists(log_file):
             return None
             
-        try:
-            with open(log_file, 'rb') as f:
-                content = f.read().decode('utf-8', errors='ignore')
-        except:
+        # Archives carry the parsed phases and kernel end time in their header
+        if is_archive(log_file) and not self.custom_probes:
+            try:
+                header = read_kpis(log_file)
+            except Exception:
+                header = {}
+            kpis = header.get('kpis', {})
+            if 'kernel_end_time' in kpis:
+                timing = {}
+                if 'kernel_start' in header.get('phases', {}):
+                    timing['kernel_start'] = True
+                if kpis['kernel_end_time'] is not None:
+                    timing['kernel_end_time'] = kpis['kernel_end_time']
+                if kpis.get('app_ready'):
+                    timing['application_started'] = True
+                return timing
+                
+        kpis = self.scan(log_file)
+        if kpis is None:
             return None
             
-        # Find boot phases
         timing = {}
-        
-        # Kernel start (first timestamp)
-        kernel_start = re.search(r'\[\s*0\.000000\]', content)
-        if kernel_start:
+        if 'kernel_start' in kpis.phases:
             timing['kernel_start'] = True
-            
-        # Find last kernel timestamp before init
-        kernel_timestamps = re.findall(r'\[\s*(\d+\.\d+)\]', content)
-        if kernel_timestamps:
-            timing['kernel_end_time'] = float(kernel_timestamps[-1])
-            
-        # Check for application start
-        if re.search(r'Hello World|Init complete|starting.*application', content, re.IGNORECASE):
+        if kpis.kernel_end_time is not None:
+            timing['kernel_end_time'] = kpis.kernel_end_time
+        if kpis.application_started:
             timing['application_started'] = True
             
         return timing
@@ -74,12 +98,14 @@ class FinalBootAnalyzer:
         """Generate the final complete report"""
         
         # Get final optimized data
-        final_memory = self.extract_memory_data(f"{self.results_dir}/final_optimized_kernel.log")
-        final_timing = self.get_boot_timing(f"{self.results_dir}/final_optimized_kernel.log")
+        final_log = self.resolve_log("final_optimized_kernel.log")
+        final_memory = self.extract_memory_data(final_log)
+        final_timing = self.get_boot_timing(final_log)
         
         # Get baseline data from iteration 02 (has good data)
-        baseline_memory = self.extract_memory_data(f"{self.results_dir}/02_boot_test.log")
-        baseline_timing = self.get_boot_timing(f"{self.results_dir}/02_boot_test.log")
+        baseline_log = self.resolve_log("02_boot_test.log")
+        baseline_memory = self.extract_memory_data(baseline_log)
+        baseline_timing = self.get_boot_timing(baseline_log)
         
         report = []
         report.append("# 🎯 FINAL KERNEL OPTIMIZATION REPORT")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Parallel Batch Re-analysis of Historical Boot Logs
+
+Streams every boot log under 01_logs and temp/bbb_boot_logs through a
+process pool, extracting all KPIs in a single pass per file, and writes one
+consolidated table. Results are cached by file content hash, so unchanged
+logs are only re-parsed when the KPI schema changes.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Shared helpers live at the top of the meta-srk layer
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from boot_kpi import KPI_SCHEMA_VERSION, scan_boot_log_file
+from boot_log_archive import ARCHIVE_SUFFIX
+
+LOG_PATTERNS = ('.log', '.txt', ARCHIVE_SUFFIX)
+
+TABLE_COLUMNS = [
+    ('file', 'File'),
+    ('total_boot_time', 'Boot (s)'),
+    ('kernel_end_time', 'Kernel End (s)'),
+    ('init_start', 'Init (s)'),
+    ('ti_sysc_errors', 'TI SYSC'),
+    ('kernel_code', 'Code (K)'),
+    ('rwdata', 'rwdata (K)'),
+    ('rodata', 'rodata (K)'),
+    ('init', 'init (K)'),
+    ('bss', 'bss (K)'),
+    ('available_memory', 'Available (K)'),
+    ('application_started', 'App'),
+]
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Content hash of a log file, streamed in chunks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def analyze_log(path):
+    """Worker: scan one log (runs in a pool process)"""
+    try:
+        return path, scan_boot_log_file(path).to_dict(), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def flatten(path, base_dir, kpis):
+    """Turn a scan result into one table row"""
+    row = {'file': os.path.relpath(path, base_dir)}
+    row['total_boot_time'] = kpis.get('total_boot_time')
+    row['kernel_end_time'] = kpis.get('kernel_end_time')
+    row['init_start'] = kpis.get('phases', {}).get('init_start')
+    row['ti_sysc_errors'] = len(kpis.get('ti_sysc_errors', []))
+    row['application_started'] = kpis.get('application_started')
+    for field, value in kpis.get('memory', {}).items():
+        row[field] = value
+    return row
+
+
+class BatchReanalyzer:
+    def __init__(self, jobs=None, use_cache=True):
+        self.base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+        self.results_dir = os.path.join(self.base_dir, "03_scripts", "01_optimization", "01_logs")
+        self.log_dirs = [
+            self.results_dir,
+            os.path.join(self.base_dir, "temp", "bbb_boot_logs"),
+        ]
+        self.cache_file = os.path.join(self.results_dir, ".reanalysis_cache.json")
+        self.jobs = jobs or os.cpu_count() or 1
+        self.use_cache = use_cache
+        self.cache = {}
+
+    def log(self, message):
+        """Log with timestamp"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        print(f"[{timestamp}] {message}")
+
+    def find_logs(self):
+        """Collect every boot log below the configured log directories"""
+        logs = []
+        for log_dir in self.log_dirs:
+            if not os.path.isdir(log_dir):
+                continue
+            for root, _, files in os.walk(log_dir):
+                for name in files:
+                    if name.endswith(LOG_PATTERNS) and not name.startswith('.'):
+                        logs.append(os.path.join(root, name))
+        return sorted(logs)
+
+    def load_cache(self):
+        if not self.use_cache or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            if data.get('schema') == KPI_SCHEMA_VERSION:
+                self.cache = data.get('entries', {})
+            else:
+                self.log("♻️  KPI schema changed - re-parsing all logs")
+        except (OSError, ValueError):
+            self.cache = {}
+
+    def save_cache(self):
+        tmp = f"{self.cache_file}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'schema': KPI_SCHEMA_VERSION, 'entries': self.cache}, f)
+        os.replace(tmp, self.cache_file)
+
+    def analyze(self):
+        """Analyze all logs, returning table rows"""
+        start = time.time()
+        self.load_cache()
+
+        logs = self.find_logs()
+        digests = {path: file_digest(path) for path in logs}
+        pending = [path for path in logs if digests[path] not in self.cache]
+
+        self.log(f"📁 {len(logs)} logs found, {len(logs) - len(pending)} cached, "
+                 f"{len(pending)} to parse with {self.jobs} workers")
+
+        if pending:
+            if self.jobs > 1 and len(pending) > 1:
+                with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                    results = list(pool.map(analyze_log, pending, chunksize=max(1, len(pending) // (self.jobs * 4))))
+            else:
+                results = [analyze_log(path) for path in pending]
+
+            for path, kpis, error in results:
+                if error:
+                    self.log(f"❌ {path}: {error}")
+                    continue
+                self.cache[digests[path]] = kpis
+
+        # Drop cache entries for logs that no longer exist
+        self.cache = {d: self.cache[d] for d in set(digests.values()) if d in self.cache}
+        if self.use_cache:
+            self.save_cache()
+
+        rows = [flatten(path, self.base_dir, self.cache[digests[path]])
+                for path in logs if digests[path] in self.cache]
+        self.log(f"✅ Analysis completed in {time.time() - start:.2f}s")
+        return rows
+
+    def format_markdown(self, rows):
+        """Render rows as a Markdown table"""
+        lines = ["| " + " | ".join(title for _, title in TABLE_COLUMNS) + " |",
+                 "|" + "|".join("---" for _ in TABLE_COLUMNS) + "|"]
+        for row in rows:
+            cells = []
+            for key, _ in TABLE_COLUMNS:
+                value = row.get(key)
+                if value is None:
+                    cells.append("N/A")
+                elif isinstance(value, bool):
+                    cells.append("✅" if value else "❌")
+                elif isinstance(value, float):
+                    cells.append(f"{value:.3f}")
+                else:
+                    cells.append(str(value))
+            lines.append("| " + " | ".join(cells) + " |")
+        return '\n'.join(lines)
+
+    def write_outputs(self, rows, output_prefix):
+        """Write the consolidated table as CSV and Markdown"""
+        csv_file = f"{output_prefix}.csv"
+        with open(csv_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=[key for key, _ in TABLE_COLUMNS], extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+
+        md_file = f"{output_prefix}.md"
+        with open(md_file, 'w') as f:
+            f.write("# Boot Log History\n\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            f.write(self.format_markdown(rows))
+            f.write("\n")
+
+        self.log(f"📊 Table saved to: {csv_file}")
+        self.log(f"📄 Report saved to: {md_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel batch re-analysis of historical boot logs")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the result cache")
+    parser.add_argument("--log-dir", action="append", default=[], help="Additional directory to scan")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output prefix for .csv/.md (default: 01_logs/boot_history)")
+    args = parser.parse_args()
+
+    analyzer = BatchReanalyzer(jobs=args.jobs, use_cache=not args.no_cache)
+    analyzer.log_dirs.extend(os.path.abspath(d) for d in args.log_dir)
+
+    rows = analyzer.analyze()
+    print()
+    print(analyzer.format_markdown(rows))
+    print()
+    analyzer.write_outputs(rows, args.output or os.path.join(analyzer.results_dir, "boot_history"))
+
+
+if __name__ == "__main__":
+    main()
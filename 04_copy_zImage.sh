@@ -5,7 +5,7 @@
 # Uses SSH key-based authentication (no password required)
 # Supports both standard and tiny kernel configurations
 # KAN-17 Fix am335x-yocto-srk-tiny.dtb copy
-VERSION="1.2.0"
+VERSION="1.4.0"
 
 print_help() {
     cat <<EOF
@@ -17,6 +17,11 @@ Options:
     -i             Use initramfs-embedded zImage
     -srk           Use SRK kernel configuration (beaglebone-yocto-srk)
     -tiny          Use tiny kernel configuration (beaglebone-yocto-srk-tiny)
+    -d <dir>       Copy from <dir> instead of the bitbake deploy directory
+                   (e.g. a per-iteration artifact directory of the optimizer)
+    -s <server>    TFTP server as user@host, skips the IP detection
+                   (e.g. the host of one board of a test board pool)
+    -t <dir>       TFTP directory on the server (default: /srv/tftp)
     -v             Verbose output
     -V             Show version and exit
     -h             This help
@@ -26,6 +31,8 @@ Examples:
     $0 -i -srk               # SRK kernel with initramfs
     $0 -i -tiny              # Tiny kernel with initramfs
     $0 -i -srk -v            # SRK kernel with initramfs and verbose output
+    $0 -i -tiny -d <artifact dir>   # Tiny kernel from an optimizer artifact
+    $0 -i -tiny -s pi@192.168.1.101 # Tiny kernel to a second board's server
 
 Features:
     - Automatic IP detection with fallback (192.168.1.100 → 192.168.0.152)
@@ -78,6 +85,7 @@ test_server_connection() {
 }
 
 # Determine which server IP to use
+select_server() {
 if [ "$VERBOSE" = "-v" ]; then
     echo "🔍 Detecting server connectivity..."
 fi
@@ -116,12 +124,16 @@ if [ "$VERBOSE" = "-v" ]; then
     echo "🌐 Connected to: $SERVER_NAME"
     echo ""
 fi
+}
 
 # Initialize variables
 USE_INITRAMFS=false
 USE_SRK=false
 USE_TINY=false
 VERBOSE=""
+SOURCE_DIR_OVERRIDE=""
+SERVER_OVERRIDE=""
+TFTP_DIR="/srv/tftp"
 
 # Parse command line arguments
 while [[ "$#" -gt 0 ]]; do
@@ -129,6 +141,27 @@ while [[ "$#" -gt 0 ]]; do
         -i) USE_INITRAMFS=true ;;
         -srk) USE_SRK=true ;;
         -tiny) USE_TINY=true ;;
+        -d)
+            if [ -z "$2" ]; then
+                echo "Option -d requires a directory"; print_help; exit 1
+            fi
+            SOURCE_DIR_OVERRIDE="${2%/}/"
+            shift
+            ;;
+        -s)
+            if [ -z "$2" ]; then
+                echo "Option -s requires a server"; print_help; exit 1
+            fi
+            SERVER_OVERRIDE="$2"
+            shift
+            ;;
+        -t)
+            if [ -z "$2" ]; then
+                echo "Option -t requires a directory"; print_help; exit 1
+            fi
+            TFTP_DIR="${2%/}"
+            shift
+            ;;
         -v) VERBOSE="-v" ;;
         -V)
             echo "$(basename "$0") version $VERSION"
@@ -143,6 +176,14 @@ while [[ "$#" -gt 0 ]]; do
     shift
 done
 
+if [ -n "$SERVER_OVERRIDE" ]; then
+    SERVER_NAME="$SERVER_OVERRIDE"
+    DESTINATION="$SERVER_NAME:/tmp/"
+    echo "0. Using server: $SERVER_NAME"
+else
+    select_server
+fi
+
 # Set configuration based on flags
 if [ "$USE_TINY" = true ]; then
     INPUT_FILES=("am335x-yocto-srk-tiny.dtb") # TODO [KAN-17] Fix
@@ -164,6 +205,12 @@ else
     echo "Using standard kernel configuration (beaglebone-yocto)"
 fi
 
+# Artifact directory given with -d replaces the deploy directory
+if [ -n "$SOURCE_DIR_OVERRIDE" ]; then
+    SOURCE_DIR="$SOURCE_DIR_OVERRIDE"
+    echo "Using artifacts from: $SOURCE_DIR"
+fi
+
 # Determine which zImage to use based on -i flag
 if [ "$USE_INITRAMFS" = true ]; then
     if [ -f "${SOURCE_DIR}zImage-initramfs-beaglebone-yocto${MACHINE_SUFFIX}.bin" ]; then
@@ -213,11 +260,11 @@ for INPUT_FILENAME in "${INPUT_FILES[@]}"; do
     fi
     
     # Use rsync with sudo to copy directly to TFTP directory
-    rsync -aL $VERBOSE  --progress  --rsync-path="sudo rsync" $SOURCE_FILE $SERVER_NAME:/srv/tftp/$TARGET_NAME
+    rsync -aL $VERBOSE  --progress  --rsync-path="sudo rsync" $SOURCE_FILE $SERVER_NAME:$TFTP_DIR/$TARGET_NAME
     if [ $? -eq 0 ]; then
-        echo "2. ✅ $INPUT_FILENAME copied successfully to /srv/tftp/ as $TARGET_NAME"
+        echo "2. ✅ $INPUT_FILENAME copied successfully to $TFTP_DIR/ as $TARGET_NAME"
     else
-        echo "2. ❌ Failed to copy $INPUT_FILENAME to /srv/tftp/"
+        echo "2. ❌ Failed to copy $INPUT_FILENAME to $TFTP_DIR/"
         exit 1
     fi
         echo ""
@@ -233,11 +280,13 @@ if [ "$VERBOSE" = "-v" ]; then
     echo "   📁 Files transferred: ${#INPUT_FILES[@]}"
     echo "   ⏱️  Time taken: ${TIME_TAKEN}s"
     echo "   🌐 Server used: $SERVER_NAME"
-    if [ "$SELECTED_IP" = "$PRIMARY_IP" ]; then
+    if [ -n "$SERVER_OVERRIDE" ]; then
+        echo "   🔗 Connection: $SERVER_OVERRIDE (-s)"
+    elif [ "$SELECTED_IP" = "$PRIMARY_IP" ]; then
         echo "   🔗 Connection: Ethernet (Primary)"
     else
         echo "   🔗 Connection: WiFi (Fallback)"
     fi
-    echo "   🎯 Target: /srv/tftp/"
+    echo "   🎯 Target: $TFTP_DIR/"
     echo "==============================================="
 fi
@@ -8,112 +8,217 @@ This script:
 3. Captures complete boot sequence
 4. Analyzes boot performance KPIs
 5. Provides detailed timing analysis
+
+Boot completion is decided by a list of readiness probes (see boot_readiness.py):
+a serial banner regex, a login/shell prompt or a TCP port opening on the target.
+
+The monitor can also be used as a library (the kernel optimizer does):
+BBBBootMonitor.run() returns the KPI dict, console output can be redirected
+to a file via the output attribute, and --kpi-json / kpi_json writes the KPIs
+as a JSON sidecar. serial_command and reset_command (--serial-cmd,
+--reset-cmd) select the board when several are attached.
 """
 
+import argparse
+import json
+import select
+import shlex
 import subprocess
 import threading
 import time
-import re
 import sys
 import os
 from datetime import datetime
 import signal
 
+from boot_readiness import build_probes, PROBE_PRESETS, DEFAULT_TARGET_HOST
+from boot_log_archive import write_archive, ARCHIVE_SUFFIX
+from boot_kpi import BootKpiScanner, TIMED_PHASES
+from boot_timeline import build_timeline, write_timeline
+
 class BBBBootMonitor:
-    def __init__(self):
+    def __init__(self, probes=None, probe_interval=0.25):
         self.serial_output = []
         self.boot_start_time = None
         self.app_start_time = None
         self.monitoring = True
         self.boot_phases = {}
         self.reset_triggered = False
+        self.reset_time = None
+        self.probes = probes if probes is not None else build_probes(['hello'])
+        self.probe_interval = probe_interval
+        # Seconds without console output after which a partial line (a
+        # prompt has no newline) is shown to the readiness probes
+        self.partial_line_idle = 0.2
+        self.ready_event = threading.Event()
+        # Serial and probe-poll threads both complete readiness
+        self.ready_lock = threading.Lock()
+        self.kpis = {}
+        self.save_text_log = False
+        self.export_timeline = False
+        self.kpi_json = None
+        self.archive_file = None
+        # Console output stream (default: stdout)
+        self.output = None
+        self.serial_process = None
+        # Console and reset endpoints (default: the bench board behind the 'p' host)
+        self.serial_command = ['ssh', 'p', 'socat - /dev/ttyUSB0,b115200,raw,echo=0,crnl']
+        self.reset_command = ['./13_remote_reset_bbb.sh']
+        self.reset_cwd = '/home/srk2cob/project/poky/meta-srk'
+        # Board name added to archive names (concurrent monitors of several boards)
+        self.board_name = None
+        self.kpi_scanner = BootKpiScanner(probes=[])
         
     def log_with_timestamp(self, message):
         """Log message with timestamp"""
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"[{timestamp}] {message}")
+        print(f"[{timestamp}] {message}", file=self.output or sys.stdout, flush=True)
         
     def parse_boot_timing(self, line):
-        """Parse kernel boot timing from log lines"""
-        # Extract kernel timestamp [    X.XXXXXX]
-        kernel_time_match = re.search(r'\[\s*(\d+\.\d+)\]', line)
-        if kernel_time_match:
-            kernel_time = float(kernel_time_match.group(1))
+        """Parse kernel boot timing from log lines (shared boot_kpi extraction)"""
+        event, kernel_time = self.kpi_scanner.feed(line)
+        if kernel_time is None:
+            return
             
-            # Identify key boot phases
-            if "Starting kernel" in line or "Booting Linux" in line:
-                self.boot_phases['kernel_start'] = kernel_time
-                
-            elif "console [ttyS0] enabled" in line:
-                self.boot_phases['console_ready'] = kernel_time
-                
-            elif "ti-sysc: probe of" in line and "failed with error -16" in line:
-                if 'ti_sysc_errors' not in self.boot_phases:
-                    self.boot_phases['ti_sysc_errors'] = []
-                self.boot_phases['ti_sysc_errors'].append((kernel_time, line.strip()))
-                
-            elif "Run /init as init process" in line:
-                self.boot_phases['init_start'] = kernel_time
-                
-            elif "Freeing unused kernel image" in line:
-                self.boot_phases['kernel_cleanup'] = kernel_time
+        # Identify key boot phases
+        if event in TIMED_PHASES:
+            self.boot_phases[event] = kernel_time
+            
+        elif event == 'ti_sysc_error':
+            if 'ti_sysc_errors' not in self.boot_phases:
+                self.boot_phases['ti_sysc_errors'] = []
+            self.boot_phases['ti_sysc_errors'].append((kernel_time, line.strip()))
                 
-        # Detect application start
-        if "Hello World 1970-01-01 00:00:00" in line:
-            self.app_start_time = time.time()
-            self.log_with_timestamp("✅ Application started - monitoring complete!")
+    def check_readiness(self, line=None, timestamp=None):
+        """Feed a serial line (or an active poll) to the readiness probes"""
+        # Probes are only armed once the new boot has started, so output of
+        # the previous boot (still running before the reset) cannot match
+        if self.boot_start_time is None or self.app_start_time:
+            return
+
+        timestamp = timestamp or time.time()
+        matched = []
+        if line is None:
+            # Active probes are only polled by this thread; their network
+            # I/O stays outside the lock so serial reads are not held up
+            matched = [probe for probe in self.probes if probe.active and probe.poll(timestamp)]
+
+        with self.ready_lock:
+            if self.app_start_time:
+                return
+            if line is not None:
+                matched = [probe for probe in self.probes if probe.check_line(line, timestamp)]
+            for probe in matched:
+                self.log_with_timestamp(f"🎯 Readiness probe satisfied: {probe.describe()}")
+
+            if all(probe.ready for probe in self.probes):
+                self.app_start_time = max(probe.ready_time for probe in self.probes)
+                self.log_with_timestamp("✅ Application started - monitoring complete!")
+                self.ready_event.set()
+
+    def poll_active_probes(self):
+        """Poll active (network) probes until ready or monitoring stops"""
+        while self.monitoring and not self.app_start_time:
+            self.check_readiness()
+            time.sleep(self.probe_interval)
+            
+    def process_line(self, line, current_time):
+        """Store, print and evaluate one complete console line"""
+        # Store line with timestamp
+        self.serial_output.append((current_time, line))
+        
+        # Print line with our timestamp
+        timestamp = datetime.fromtimestamp(current_time).strftime("%H:%M:%S.%f")[:-3]
+        print(f"[{timestamp}] {line}", file=self.output or sys.stdout)
+        
+        # Parse boot timing
+        self.parse_boot_timing(line)
+        
+        # Detect reset completion (U-Boot start). The reset command
+        # may return after SPL already printed, so only the first
+        # SPL banner counts regardless of reset_triggered.
+        if "U-Boot SPL" in line and self.boot_start_time is None:
+            self.boot_start_time = current_time
+            self.log_with_timestamp("🚀 Boot sequence detected!")
             
+        # Evaluate serial readiness probes
+        self.check_readiness(line, current_time)
+        
     def monitor_serial(self):
-        """Monitor serial console output"""
+        """
+        Monitor serial console output.
+        
+        The console is read in chunks rather than lines: a login or shell
+        prompt is not followed by a newline, so a partial line is shown to
+        the readiness probes once the console has been idle for
+        partial_line_idle seconds.
+        """
         try:
             # Start serial monitoring via SSH
-            cmd = ['ssh', 'p', 'socat - /dev/ttyUSB0,b115200,raw,echo=0,crnl']
+            cmd = self.serial_command
             self.log_with_timestamp("🔍 Starting serial console monitoring...")
             
             process = subprocess.Popen(
                 cmd, 
                 stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                bufsize=1
+                stderr=subprocess.PIPE
             )
+            self.serial_process = process
+            fd = process.stdout.fileno()
+            # Received bytes of the line in progress, when they last grew and
+            # whether the probes have seen them since
+            pending = b''
+            pending_time = None
+            pending_checked = True
             
-            while self.monitoring:
+            while self.monitoring and not self.app_start_time:
                 try:
-                    line = process.stdout.readline()
-                    if line:
-                        current_time = time.time()
-                        line = line.strip()
-                        
-                        # Store line with timestamp
-                        self.serial_output.append((current_time, line))
-                        
-                        # Print line with our timestamp
-                        timestamp = datetime.fromtimestamp(current_time).strftime("%H:%M:%S.%f")[:-3]
-                        print(f"[{timestamp}] {line}")
-                        
-                        # Parse boot timing
-                        self.parse_boot_timing(line)
+                    readable, _, _ = select.select([fd], [], [], self.partial_line_idle)
+                    if not readable:
+                        if pending and not pending_checked:
+                            pending_checked = True
+                            self.check_readiness(pending.decode('utf-8', errors='replace').strip(), pending_time)
+                        elif process.poll() is not None:
+                            break
+                        continue
                         
-                        # Detect reset completion (U-Boot start)
-                        if "U-Boot SPL" in line and not self.reset_triggered:
-                            self.boot_start_time = current_time
-                            self.log_with_timestamp("🚀 Boot sequence detected!")
-                            
+                    chunk = os.read(fd, 4096)
+                    if not chunk:
+                        break
+                    current_time = time.time()
+                    *lines, pending = (pending + chunk).split(b'\n')
+                    pending_time = current_time
+                    pending_checked = not pending
+                    for raw in lines:
+                        self.process_line(raw.decode('utf-8', errors='replace').strip(), current_time)
                         # Check if application started
                         if self.app_start_time:
                             break
                             
-                    elif process.poll() is not None:
-                        break
-                        
                 except Exception as e:
                     self.log_with_timestamp(f"❌ Serial monitoring error: {e}")
                     break
                     
+            # Keep the prompt (or whatever was cut off) in the log
+            if pending.strip():
+                line = pending.decode('utf-8', errors='replace').strip()
+                self.serial_output.append((pending_time, line))
+                timestamp = datetime.fromtimestamp(pending_time).strftime("%H:%M:%S.%f")[:-3]
+                print(f"[{timestamp}] {line}", file=self.output or sys.stdout)
+                    
         except Exception as e:
             self.log_with_timestamp(f"❌ Failed to start serial monitoring: {e}")
             
+    def stop_serial(self):
+        """Stop the serial console reader so the port is free for the next run"""
+        process = self.serial_process
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                
     def perform_reset(self):
         """Perform hardware reset via SSH"""
         try:
@@ -123,9 +228,10 @@ class BBBBootMonitor:
             time.sleep(2)
             
             # Execute reset script
+            reset_time = time.time()
             result = subprocess.run(
-                ['./13_remote_reset_bbb.sh'],
-                cwd='/home/srk2cob/project/poky/meta-srk',
+                self.reset_command,
+                cwd=self.reset_cwd,
                 capture_output=True,
                 text=True,
                 timeout=10
@@ -134,6 +240,7 @@ class BBBBootMonitor:
             if result.returncode == 0:
                 self.log_with_timestamp("✅ Reset command sent successfully")
                 self.reset_triggered = True
+                self.reset_time = reset_time
             else:
                 self.log_with_timestamp(f"❌ Reset command failed: {result.stderr}")
                 
@@ -146,6 +253,20 @@ class BBBBootMonitor:
         self.log_with_timestamp("📊 BOOT PERFORMANCE KPI ANALYSIS")
         self.log_with_timestamp("="*60)
         
+        # Memory and phases are printed early in boot: recorded even when the
+        # boot was not detected or never reached readiness
+        memory = self.kpi_scanner.kpis.memory
+        self.kpis = {
+            'boot_detected': self.boot_start_time is not None,
+            'app_ready': self.app_start_time is not None,
+            'total_boot_time': None,
+            'kernel_end_time': self.kpi_scanner.kpis.kernel_end_time,
+            'probes': {},
+            'phases': {k: v for k, v in self.boot_phases.items() if k != 'ti_sysc_errors'},
+            'ti_sysc_errors': len(self.boot_phases.get('ti_sysc_errors', [])),
+            'memory': memory.as_dict() if memory else {}
+        }
+        
         if not self.boot_start_time:
             self.log_with_timestamp("❌ No boot start time detected")
             return
@@ -153,7 +274,12 @@ class BBBBootMonitor:
         # Total boot time
         if self.app_start_time:
             total_boot_time = self.app_start_time - self.boot_start_time
+            self.kpis['total_boot_time'] = total_boot_time
             self.log_with_timestamp(f"🏁 Total Boot Time: {total_boot_time:.3f} seconds")
+            for probe in self.probes:
+                self.kpis['probes'][probe.name] = probe.ready_time - self.boot_start_time
+                self.log_with_timestamp(f"  🎯 {probe.describe()}: "
+                                        f"{probe.ready_time - self.boot_start_time:.3f}s")
         else:
             self.log_with_timestamp("❌ Application start not detected")
             return
@@ -182,20 +308,16 @@ class BBBBootMonitor:
             init_time = self.boot_phases['init_start'] - self.boot_phases['console_ready']
             self.log_with_timestamp(f"  🔧 Kernel to Init: {init_time:.3f}s")
             
-        # Memory information
-        memory_lines = [line for _, line in self.serial_output if "Memory:" in line and "available" in line]
-        if memory_lines:
-            memory_line = memory_lines[0]
-            self.log_with_timestamp(f"\n💾 Memory: {memory_line}")
-            
-            # Parse memory details
-            memory_match = re.search(r'Memory: (\d+)K/(\d+)K available \((\d+)K kernel code, (\d+)K rwdata, (\d+)K rodata', memory_line)
-            if memory_match:
-                available, total, kernel_code, rwdata, rodata = memory_match.groups()
-                self.log_with_timestamp(f"  📊 Available: {available}K / {total}K ({float(available)/float(total)*100:.1f}%)")
-                self.log_with_timestamp(f"  🧠 Kernel Code: {kernel_code}K")
-                self.log_with_timestamp(f"  📝 rwdata: {rwdata}K")
-                self.log_with_timestamp(f"  📖 rodata: {rodata}K")
+        # Memory information (parsed by the shared boot_kpi library)
+        if memory:
+            self.log_with_timestamp("\n💾 Memory:")
+            self.log_with_timestamp(f"  📊 Available: {memory.available_memory}K / {memory.total_memory}K ({memory.available_percent:.1f}%)")
+            self.log_with_timestamp(f"  🧠 Kernel Code: {memory.kernel_code}K")
+            self.log_with_timestamp(f"  📝 rwdata: {memory.rwdata}K")
+            self.log_with_timestamp(f"  📖 rodata: {memory.rodata}K")
+            self.log_with_timestamp(f"  🚪 init: {memory.init}K")
+            self.log_with_timestamp(f"  🕳️  bss: {memory.bss}K")
+            self.log_with_timestamp(f"  🔒 reserved: {memory.reserved}K")
                 
         # TI SYSC errors analysis
         if 'ti_sysc_errors' in self.boot_phases:
@@ -215,9 +337,9 @@ class BBBBootMonitor:
             self.log_with_timestamp(f"  ⚠️  Boot speed: NEEDS IMPROVEMENT (> 2 seconds)")
             
         # Optimization results
-        if 'rwdata' in locals() and 'rodata' in locals():
-            self.log_with_timestamp(f"  💾 Memory optimization: rwdata={rwdata}K, rodata={rodata}K")
-            if int(rwdata) < 500 and int(rodata) < 300:
+        if memory and memory.rwdata is not None and memory.rodata is not None:
+            self.log_with_timestamp(f"  💾 Memory optimization: rwdata={memory.rwdata}K, rodata={memory.rodata}K")
+            if memory.rwdata < 500 and memory.rodata < 300:
                 self.log_with_timestamp(f"  ✅ Memory footprint: OPTIMIZED")
             else:
                 self.log_with_timestamp(f"  ⚠️  Memory footprint: COULD BE IMPROVED")
@@ -225,33 +347,86 @@ class BBBBootMonitor:
         self.log_with_timestamp("="*60)
         
     def save_boot_log(self):
-        """Save boot log to file"""
+        """Save boot log as a compact archive (and optionally as legacy text)"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if self.board_name:
+            timestamp += f"_{self.board_name}"
         
         # Use local temp directory in project folder for easy access
-        temp_dir = os.path.join(os.path.dirname(__file__), "temp", "bbb_boot_logs")
+        temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp", "bbb_boot_logs")
         os.makedirs(temp_dir, exist_ok=True)
         
-        filename = os.path.join(temp_dir, f"boot_analysis_{timestamp}.txt")
+        filename = os.path.join(temp_dir, f"boot_analysis_{timestamp}{ARCHIVE_SUFFIX}")
+        metadata = {
+            'tool': 'BBBBootMonitor',
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'boot_start_time': self.boot_start_time,
+            'app_start_time': self.app_start_time,
+            'reset_time': self.reset_time,
+            'probes': [probe.describe() for probe in self.probes]
+        }
         
         try:
-            with open(filename, 'w') as f:
-                f.write(f"BeagleBone Black Boot Analysis - {datetime.now()}\n")
-                f.write("="*60 + "\n\n")
-                
-                for timestamp, line in self.serial_output:
-                    dt = datetime.fromtimestamp(timestamp)
-                    f.write(f"[{dt.strftime('%H:%M:%S.%f')[:-3]}] {line}\n")
+            size = write_archive(filename, self.serial_output, metadata=metadata,
+                                 phases=self.boot_phases, kpis=self.kpis)
+            self.log_with_timestamp(f"📄 Boot log saved to: {filename} ({size} bytes)")
+        except Exception as e:
+            self.log_with_timestamp(f"❌ Failed to save log: {e}")
+            filename = None
+            
+        if self.save_text_log:
+            text_filename = os.path.join(temp_dir, f"boot_analysis_{timestamp}.txt")
+            try:
+                with open(text_filename, 'w') as f:
+                    f.write(f"BeagleBone Black Boot Analysis - {datetime.now()}\n")
+                    f.write("="*60 + "\n\n")
                     
-            self.log_with_timestamp(f"📄 Boot log saved to: {filename}")
+                    for entry_time, line in self.serial_output:
+                        dt = datetime.fromtimestamp(entry_time)
+                        f.write(f"[{dt.strftime('%H:%M:%S.%f')[:-3]}] {line}\n")
+                        
+                self.log_with_timestamp(f"📄 Text log saved to: {text_filename}")
+            except Exception as e:
+                self.log_with_timestamp(f"❌ Failed to save text log: {e}")
+                
+        return filename
+        
+    def save_kpis(self, path):
+        """Write the KPIs as a JSON sidecar for tools that consume them"""
+        data = dict(self.kpis, boot_start_time=self.boot_start_time,
+                    app_start_time=self.app_start_time, reset_time=self.reset_time,
+                    archive=self.archive_file)
+        try:
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+            self.log_with_timestamp(f"📄 KPIs saved to: {path}")
+        except Exception as e:
+            self.log_with_timestamp(f"❌ Failed to save KPIs: {e}")
             
+    def save_timeline(self, archive_file):
+        """Export the boot timeline (HTML waterfall and Chrome trace) next to the archive"""
+        stem = os.path.splitext(archive_file)[0]
+        probe_times = {probe.name: probe.ready_time for probe in self.probes}
+        try:
+            timeline = build_timeline(self.serial_output, os.path.basename(stem),
+                                      probe_times=probe_times, reset_time=self.reset_time)
+            for path in (f"{stem}.timeline.html", f"{stem}.trace.json"):
+                write_timeline(path, [timeline])
+                self.log_with_timestamp(f"⏱️  Timeline saved to: {path}")
         except Exception as e:
-            self.log_with_timestamp(f"❌ Failed to save log: {e}")
+            self.log_with_timestamp(f"❌ Failed to save timeline: {e}")
             
     def run(self, timeout=30):
-        """Main execution function"""
+        """
+        Main execution function
+        
+        Returns:
+            dict: boot KPIs (total_boot_time is None if readiness was not reached)
+        """
         self.log_with_timestamp("🔧 BeagleBone Black Boot Performance Monitor")
         self.log_with_timestamp("="*50)
+        for probe in self.probes:
+            self.log_with_timestamp(f"🎯 Readiness probe: {probe.describe()}")
         
         # Set up timeout handler
         def timeout_handler():
@@ -259,6 +434,7 @@ class BBBBootMonitor:
             if self.monitoring and not self.app_start_time:
                 self.log_with_timestamp(f"⏰ Timeout reached ({timeout}s) - stopping monitoring")
                 self.monitoring = False
+                self.ready_event.set()
                 
         timeout_thread = threading.Thread(target=timeout_handler, daemon=True)
         timeout_thread.start()
@@ -267,6 +443,11 @@ class BBBBootMonitor:
         monitor_thread = threading.Thread(target=self.monitor_serial, daemon=True)
         monitor_thread.start()
         
+        # Active probes (TCP ports) are polled independently of serial output
+        if any(probe.active for probe in self.probes):
+            probe_thread = threading.Thread(target=self.poll_active_probes, daemon=True)
+            probe_thread.start()
+        
         # Wait for monitoring to be ready
         time.sleep(1)
         
@@ -274,22 +455,72 @@ class BBBBootMonitor:
         reset_thread = threading.Thread(target=self.perform_reset, daemon=True)
         reset_thread.start()
         
-        # Wait for completion
+        # Wait for completion (all probes ready or timeout)
         try:
-            monitor_thread.join(timeout + 5)
+            self.ready_event.wait(timeout + 5)
+            self.monitoring = False
         except KeyboardInterrupt:
             self.log_with_timestamp("🛑 Monitoring interrupted by user")
             self.monitoring = False
+        self.stop_serial()
             
         # Calculate and display KPIs
         self.calculate_kpis()
         
         # Save log
-        self.save_boot_log()
+        filename = self.save_boot_log()
+        self.archive_file = filename
+        if filename and self.export_timeline:
+            self.save_timeline(filename)
+        if self.kpi_json:
+            self.save_kpis(self.kpi_json)
+        return self.kpis
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="BeagleBone Black Boot Performance Monitor")
+    parser.add_argument("--ready", action="append", metavar="PROBE",
+                        help="Readiness probe, repeatable; boot completes when all are ready. "
+                             "banner:<regex>, prompt[:<regex>], tcp:[host:]port or a preset "
+                             f"({', '.join(sorted(PROBE_PRESETS))}). Default: hello")
+    parser.add_argument("--target-host", default=DEFAULT_TARGET_HOST,
+                        help=f"Target IP used by tcp probes (default: {DEFAULT_TARGET_HOST})")
+    parser.add_argument("--timeout", type=int, default=30,
+                        help="Monitoring timeout in seconds (default: 30)")
+    parser.add_argument("--text-log", action="store_true",
+                        help=f"Also write the legacy .txt log next to the {ARCHIVE_SUFFIX} archive")
+    parser.add_argument("--timeline", action="store_true",
+                        help="Also export the boot timeline as HTML waterfall and Chrome trace "
+                             "(compare runs with boot_timeline.py export)")
+    parser.add_argument("--kpi-json", metavar="FILE",
+                        help="Also write the boot KPIs to FILE as JSON")
+    parser.add_argument("--serial-cmd", metavar="CMD",
+                        help="Command streaming the serial console to stdout "
+                             "(default: ssh p socat on /dev/ttyUSB0)")
+    parser.add_argument("--reset-cmd", metavar="CMD",
+                        help="Command resetting the board (default: ./13_remote_reset_bbb.sh)")
+    parser.add_argument("--board", metavar="NAME",
+                        help="Board name added to the archive file name")
+    return parser.parse_args()
 
 def main():
     """Main entry point"""
-    monitor = BBBBootMonitor()
+    args = parse_args()
+    try:
+        probes = build_probes(args.ready, args.target_host)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    monitor = BBBBootMonitor(probes=probes)
+    monitor.save_text_log = args.text_log
+    monitor.export_timeline = args.timeline
+    monitor.kpi_json = args.kpi_json
+    monitor.board_name = args.board
+    if args.serial_cmd:
+        monitor.serial_command = shlex.split(args.serial_cmd)
+    if args.reset_cmd:
+        monitor.reset_command = shlex.split(args.reset_cmd)
+        monitor.reset_cwd = None
     
     # Handle Ctrl+C gracefully
     def signal_handler(sig, frame):
@@ -301,7 +532,7 @@ def main():
     
     # Run monitoring
     try:
-        monitor.run(timeout=30)
+        monitor.run(timeout=args.timeout)
     except Exception as e:
         print(f"❌ Monitoring failed: {e}")
         sys.exit(1)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Board Pool
+Test boards for parallel boot testing, each with its own TFTP, serial console
+and reset endpoints, handed out to concurrent boot tests.
+
+Boards are described in a JSON file (a list, or {"boards": [...]}):
+
+    [
+        {"name": "bbb1", "server": "pi@192.168.1.100", "tftp_dir": "/srv/tftp",
+         "serial_device": "/dev/ttyUSB0", "target_host": "192.168.1.200"},
+        {"name": "bbb2", "server": "pi@192.168.1.101", "tftp_dir": "/srv/tftp",
+         "serial_device": "/dev/ttyUSB0", "target_host": "192.168.1.201"}
+    ]
+
+Every field but name is optional; the defaults are the single bench setup
+the scripts were written for (TFTP server detected by 04_copy_zImage.sh,
+serial console and reset through the 'p' SSH alias).
+"""
+
+__version__ = "1.0.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import json
+import threading
+from dataclasses import dataclass, fields
+
+from boot_readiness import DEFAULT_TARGET_HOST
+
+# SSH alias of the host the serial adapter and reset line are attached to
+DEFAULT_CONSOLE_HOST = "p"
+
+
+@dataclass
+class Board:
+    """One test board and the endpoints used to deploy, watch and reset it"""
+    name: str
+    # SSH destination of the TFTP/console host (None: auto-detected, see 04_copy_zImage.sh)
+    server: str = None
+    tftp_dir: str = "/srv/tftp"
+    serial_device: str = "/dev/ttyUSB0"
+    reset_command: str = "/bin/reset_bbb.sh"
+    target_host: str = DEFAULT_TARGET_HOST
+
+    @property
+    def console_host(self):
+        return self.server or DEFAULT_CONSOLE_HOST
+
+    def serial_command(self):
+        """Command streaming the board's serial console to stdout"""
+        return ['ssh', self.console_host, f'socat - {self.serial_device},b115200,raw,echo=0,crnl']
+
+    def reset_commandline(self):
+        return ['ssh', self.console_host, self.reset_command]
+
+    def copy_args(self):
+        """Extra 04_copy_zImage.sh arguments deploying to this board"""
+        args = ['-t', self.tftp_dir]
+        if self.server:
+            args = ['-s', self.server] + args
+        return args
+
+
+DEFAULT_BOARD = Board('bbb')
+
+
+def load_boards(path):
+    """
+    Read a board list.
+
+    Raises:
+        ValueError: unknown fields, missing or duplicate names
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('boards', [])
+    known = {f.name for f in fields(Board)}
+    boards = []
+    for entry in data:
+        unknown = set(entry) - known
+        if unknown:
+            raise ValueError(f"unknown board field(s): {', '.join(sorted(unknown))}")
+        if not entry.get('name'):
+            raise ValueError("every board needs a name")
+        boards.append(Board(**entry))
+    names = [board.name for board in boards]
+    if len(set(names)) != len(names):
+        raise ValueError("board names must be unique")
+    if not boards:
+        raise ValueError(f"no boards in {path}")
+    return boards
+
+
+class BoardPool:
+    """
+    Free boards for concurrent boot tests.
+
+    acquire() prefers a requested board so callers can rotate candidates
+    across boards, but never waits for it while another suitable board is
+    idle.
+    """
+
+    def __init__(self, boards):
+        self.boards = list(boards)
+        self._free = list(self.boards)
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return len(self.boards)
+
+    def get(self, name):
+        for board in self.boards:
+            if board.name == name:
+                return board
+        return None
+
+    def rotation(self, index, repeat=0):
+        """Board the repeat-th boot of the index-th candidate should use"""
+        return self.boards[(index + repeat) % len(self.boards)]
+
+    def acquire(self, preferred=None, avoid=()):
+        """
+        Wait for a free board.
+
+        Args:
+            preferred: Board to take if it is free
+            avoid: Names of boards to wait past (e.g. boards that already
+                   booted the candidate), ignored if it names every board
+        """
+        if all(board.name in avoid for board in self.boards):
+            avoid = ()
+        with self._condition:
+            while True:
+                if preferred in self._free and preferred.name not in avoid:
+                    board = preferred
+                    break
+                suitable = [b for b in self._free if b.name not in avoid]
+                if suitable:
+                    board = suitable[0]
+                    break
+                self._condition.wait()
+            self._free.remove(board)
+            return board
+
+    def release(self, board):
+        with self._condition:
+            self._free.append(board)
+            self._condition.notify_all()
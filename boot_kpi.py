@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Boot KPI Extraction
+Shared extraction of boot phases and kernel memory figures from serial
+console boot logs (live lines, legacy text logs or boot log archives).
+
+Used by the boot monitor, the kernel optimizer and the analysis scripts so
+that every report sees the same fields, including the complete kernel
+"Memory: ...K/...K available (...)" line.
+"""
+
+__version__ = "1.1.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import re
+from dataclasses import dataclass, field, asdict, fields
+
+from boot_readiness import build_probes
+from boot_log_archive import is_archive, read_archive
+
+# Bump whenever the extracted fields change so cached results are re-parsed
+KPI_SCHEMA_VERSION = 2
+
+# One regex per line: optional host timestamp, optional kernel timestamp and
+# at most one boot event. match() always succeeds, so every line costs one call.
+LINE_RE = re.compile(
+    r'(?:\[\d\d:\d\d:\d\d\.\d{3}\] )?'
+    r'(?:\[\s*(?P<ktime>\d+\.\d+)\])?'
+    r'(?:.*?(?:'
+    r'(?P<spl>U-Boot SPL)'
+    r'|(?P<starting_kernel>Starting kernel)'
+    r'|(?P<kernel_start>Booting Linux)'
+    r'|(?P<console_ready>console \[ttyS0\] enabled)'
+    r'|(?P<ti_sysc_error>ti-sysc: probe of \S+ failed with error -16)'
+    r'|(?P<init_start>Run /init as init process)'
+    r'|(?P<kernel_cleanup>Freeing unused kernel image)'
+    r'|(?P<memory>Memory:\s+\d+K/\d+K available)'
+    r'|(?P<total_boot_time>Total Boot Time: (?P<total_seconds>\d+\.\d+) seconds)'
+    r'))?'
+)
+
+# Kernel memory line, e.g.
+# Memory: 511632K/523264K available (3072K kernel code, 465K rwdata, 260K rodata,
+#         2048K init, 217K bss, 11632K reserved, 0K cma-reserved, 0K highmem)
+MEMORY_RE = re.compile(r'Memory:\s+(\d+)K/(\d+)K available \(([^)]*)\)')
+MEMORY_ITEM_RE = re.compile(r'(\d+)K ([a-z][a-z -]*)')
+
+# Kernel phases recorded with their kernel timestamp (first occurrence wins)
+TIMED_PHASES = ('kernel_start', 'console_ready', 'init_start', 'kernel_cleanup')
+
+
+@dataclass
+class MemoryMap:
+    """Every field of the kernel "Memory:" boot line, in KiB"""
+    available_memory: int
+    total_memory: int
+    kernel_code: int = None
+    rwdata: int = None
+    rodata: int = None
+    init: int = None
+    bss: int = None
+    reserved: int = None
+    cma_reserved: int = None
+    highmem: int = None
+
+    @property
+    def available_percent(self):
+        if not self.total_memory:
+            return None
+        return self.available_memory / self.total_memory * 100
+
+    @property
+    def kernel_footprint(self):
+        """kernel code + rwdata + rodata + init + bss"""
+        parts = (self.kernel_code, self.rwdata, self.rodata, self.init, self.bss)
+        return sum(p for p in parts if p is not None)
+
+    def as_dict(self):
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+@dataclass
+class BootKpis:
+    """Boot KPIs extracted from one boot log"""
+    phases: dict = field(default_factory=dict)
+    ti_sysc_errors: list = field(default_factory=list)
+    memory: MemoryMap = None
+    total_boot_time: float = None
+    kernel_end_time: float = None
+    uboot_seen: bool = False
+    application_started: bool = False
+    line_count: int = 0
+
+    def phase_durations(self):
+        """Durations between consecutive kernel phases"""
+        durations = {}
+        p = self.phases
+        if 'console_ready' in p and 'kernel_start' in p:
+            durations['console_init'] = p['console_ready'] - p['kernel_start']
+        if 'init_start' in p and 'console_ready' in p:
+            durations['kernel_to_init'] = p['init_start'] - p['console_ready']
+        return durations
+
+    def to_dict(self):
+        data = asdict(self)
+        data['memory'] = self.memory.as_dict() if self.memory else {}
+        data['ti_sysc_errors'] = [list(e) for e in self.ti_sysc_errors]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        kpis = cls(**{k: v for k, v in data.items() if k in known})
+        kpis.memory = MemoryMap(**data['memory']) if data.get('memory') else None
+        kpis.ti_sysc_errors = [tuple(e) for e in data.get('ti_sysc_errors', [])]
+        return kpis
+
+
+def parse_memory_line(line):
+    """
+    Parse the kernel memory line into a MemoryMap.
+
+    Returns None for any other line; the substring test keeps the regex off
+    the hot path for the vast majority of lines.
+    """
+    if 'Memory:' not in line:
+        return None
+    match = MEMORY_RE.search(line)
+    if not match:
+        return None
+    memory = MemoryMap(available_memory=int(match.group(1)), total_memory=int(match.group(2)))
+    for value, name in MEMORY_ITEM_RE.findall(match.group(3)):
+        attr = name.strip().replace(' ', '_').replace('-', '_')
+        if attr in ('kernel_code', 'rwdata', 'rodata', 'init', 'bss',
+                    'reserved', 'cma_reserved', 'highmem'):
+            setattr(memory, attr, int(value))
+    return memory
+
+
+class BootKpiScanner:
+    """Incremental KPI extraction, one line at a time"""
+
+    def __init__(self, probes=None):
+        self.kpis = BootKpis()
+        if probes is None:
+            probes = build_probes(['application'])
+        self.probes = [p for p in probes if not p.active]
+        for probe in self.probes:
+            probe.reset()
+        self._pending_probes = list(self.probes)
+
+    def feed(self, line):
+        """
+        Process one log line.
+
+        Returns:
+            tuple: (event name or None, kernel timestamp or None)
+        """
+        kpis = self.kpis
+        index = kpis.line_count
+        kpis.line_count += 1
+
+        match = LINE_RE.match(line)
+        ktime = match.group('ktime')
+        if ktime is not None:
+            ktime = float(ktime)
+            kpis.kernel_end_time = ktime
+
+        # Enclosing groups close last, so lastgroup names the event itself
+        event = match.lastgroup
+        if event == 'ktime':
+            event = None
+        elif event in TIMED_PHASES:
+            if ktime is not None and event not in kpis.phases:
+                kpis.phases[event] = ktime
+        elif event == 'ti_sysc_error':
+            kpis.ti_sysc_errors.append((ktime, line.strip()))
+        elif event == 'memory':
+            if kpis.memory is None:
+                kpis.memory = parse_memory_line(line)
+        elif event == 'total_boot_time':
+            kpis.total_boot_time = float(match.group('total_seconds'))
+        elif event == 'spl':
+            kpis.uboot_seen = True
+
+        if self._pending_probes:
+            for probe in self._pending_probes:
+                probe.check_line(line, index)
+            self._pending_probes = [p for p in self._pending_probes if not p.ready]
+            if not self._pending_probes:
+                kpis.application_started = True
+
+        return event, ktime
+
+
+def iter_log_lines(path):
+    """Stream lines from a text log or an archive without loading text logs whole"""
+    if is_archive(path):
+        yield from read_archive(path).lines
+        return
+    with open(path, 'rb') as f:
+        for raw in f:
+            yield raw.decode('utf-8', errors='ignore').rstrip('\r\n')
+
+
+def scan_boot_log(lines, probes=None):
+    """
+    Extract boot KPIs from log lines in a single pass.
+
+    Args:
+        lines: Iterable of log lines
+        probes: Passive readiness probes for application detection
+                (default: the 'application' preset)
+
+    Returns:
+        BootKpis
+    """
+    scanner = BootKpiScanner(probes)
+    for line in lines:
+        scanner.feed(line)
+    return scanner.kpis
+
+
+def scan_boot_log_file(path, probes=None):
+    """Convenience wrapper around scan_boot_log for a file path"""
+    return scan_boot_log(iter_log_lines(path), probes)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Boot Log Archive Format
+Compact columnar storage for captured boot logs.
+
+An archive is a sequence of tagged sections after an 8 byte magic:
+
+    META  JSON (uncompressed): metadata, parsed phase events and KPIs
+    TIME  host timestamps in microseconds, delta-encoded int64 column
+    TEXT  serial console lines joined by newlines, compressed; backslashes
+          and newlines inside a line are escaped as \\\\ and \\n
+
+Each section is stored as: tag (4s), codec (B), length (Q), payload.
+META is always written first, so read_kpis() only reads the file header
+and never touches or decompresses the TIME/TEXT columns.
+"""
+
+__version__ = "1.0.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import json
+import lzma
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime
+
+ARCHIVE_SUFFIX = ".bbblog"
+MAGIC = b"SRKBLOG1"
+FORMAT_VERSION = 2
+
+SECTION_HEADER = struct.Struct("<4sBQ")
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+
+# Escape sequences of TEXT lines (format version 2)
+ESCAPE_RE = re.compile(r'\\(.)')
+UNESCAPES = {'n': '\n'}
+
+# Legacy text log line: "[HH:MM:SS.mmm] text"
+LEGACY_LINE_RE = re.compile(r'^\[(\d\d):(\d\d):(\d\d)\.(\d{3})\] ?(.*)$')
+
+
+def _compress(payload, codec):
+    if codec == CODEC_ZLIB:
+        return zlib.compress(payload, 9)
+    if codec == CODEC_LZMA:
+        return lzma.compress(payload, preset=6)
+    return payload
+
+
+def _decompress(payload, codec):
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload)
+    if codec == CODEC_LZMA:
+        return lzma.decompress(payload)
+    if codec == CODEC_RAW:
+        return payload
+    raise ValueError(f"Unknown section codec {codec}")
+
+
+def _to_jsonable(value):
+    """Convert monitor structures (tuples, nested dicts) into JSON friendly values"""
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    return value
+
+
+def encode_timestamps(timestamps):
+    """Encode float seconds as delta-encoded little-endian int64 microseconds"""
+    column = array('q')
+    previous = 0
+    for ts in timestamps:
+        micros = int(round(ts * 1_000_000))
+        column.append(micros - previous)
+        previous = micros
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column.tobytes()
+
+
+def decode_timestamps(payload):
+    """Inverse of encode_timestamps, returns a list of float seconds"""
+    column = array('q')
+    column.frombytes(payload)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    timestamps = []
+    total = 0
+    for delta in column:
+        total += delta
+        timestamps.append(total / 1_000_000)
+    return timestamps
+
+
+def escape_line(line):
+    """Make a line safe to join with newlines"""
+    return line.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def unescape_line(line):
+    """Inverse of escape_line"""
+    if '\\' not in line:
+        return line
+    return ESCAPE_RE.sub(lambda match: UNESCAPES.get(match.group(1), match.group(1)), line)
+
+
+def write_archive(path, entries, metadata=None, phases=None, kpis=None, text_codec=CODEC_LZMA):
+    """
+    Write a boot log archive.
+
+    Args:
+        path: Output file path (ARCHIVE_SUFFIX is recommended)
+        entries: List of (timestamp, line) tuples as captured by BBBBootMonitor
+        metadata: Free-form dict (run id, kernel, probes, ...)
+        phases: Parsed phase events (BBBBootMonitor.boot_phases)
+        kpis: Calculated KPIs
+
+    Returns:
+        int: Number of bytes written
+    """
+    header = {
+        'format_version': FORMAT_VERSION,
+        'line_count': len(entries),
+        'metadata': _to_jsonable(metadata or {}),
+        'phases': _to_jsonable(phases or {}),
+        'kpis': _to_jsonable(kpis or {}),
+    }
+    sections = [
+        (b"META", CODEC_RAW, json.dumps(header, separators=(',', ':')).encode('utf-8')),
+        (b"TIME", CODEC_ZLIB, encode_timestamps(ts for ts, _ in entries)),
+        (b"TEXT", text_codec, '\n'.join(escape_line(line) for _, line in entries).encode('utf-8', errors='replace')),
+    ]
+
+    tmp_path = f"{path}.tmp"
+    written = 0
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        written += len(MAGIC)
+        for tag, codec, payload in sections:
+            data = _compress(payload, codec)
+            f.write(SECTION_HEADER.pack(tag, codec, len(data)))
+            f.write(data)
+            written += SECTION_HEADER.size + len(data)
+    os.replace(tmp_path, path)
+    return written
+
+
+def is_archive(path):
+    """Check the magic bytes of a file"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _iter_sections(f, wanted=None):
+    """Yield (tag, codec, payload) for sections, skipping unwanted payloads via seek"""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a boot log archive")
+    while True:
+        raw = f.read(SECTION_HEADER.size)
+        if len(raw) < SECTION_HEADER.size:
+            return
+        tag, codec, length = SECTION_HEADER.unpack(raw)
+        if wanted is not None and tag not in wanted:
+            f.seek(length, os.SEEK_CUR)
+            continue
+        yield tag, codec, f.read(length)
+
+
+def read_kpis(path):
+    """
+    Read only the META section (metadata, phases, KPIs).
+
+    The timestamp and text columns are neither read nor decompressed.
+    """
+    with open(path, 'rb') as f:
+        for tag, codec, payload in _iter_sections(f):
+            if tag == b"META":
+                return json.loads(_decompress(payload, codec).decode('utf-8'))
+            break
+    raise ValueError(f"{path}: META section missing")
+
+
+class BootLogArchive:
+    """
+    A fully loaded boot log archive.
+
+    Raises:
+        ValueError: the timestamp and text columns do not have the same
+                    number of lines
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header = {}
+        self.timestamps = []
+        self.lines = []
+
+        with open(path, 'rb') as f:
+            for tag, codec, payload in _iter_sections(f):
+                data = _decompress(payload, codec)
+                if tag == b"META":
+                    self.header = json.loads(data.decode('utf-8'))
+                elif tag == b"TIME":
+                    self.timestamps = decode_timestamps(data)
+                elif tag == b"TEXT":
+                    # An empty payload is one empty line unless the log has no lines at all
+                    lines = data.decode('utf-8', errors='replace').split('\n')
+                    if not self.header.get('line_count'):
+                        lines = []
+                    if self.header.get('format_version', 1) >= 2:
+                        lines = [unescape_line(line) for line in lines]
+                    self.lines = lines
+        if len(self.timestamps) != len(self.lines):
+            raise ValueError(f"{path}: {len(self.timestamps)} timestamps but {len(self.lines)} lines")
+
+    @property
+    def metadata(self):
+        return self.header.get('metadata', {})
+
+    @property
+    def phases(self):
+        return self.header.get('phases', {})
+
+    @property
+    def kpis(self):
+        return self.header.get('kpis', {})
+
+    def entries(self):
+        """Return (timestamp, line) tuples"""
+        return list(zip(self.timestamps, self.lines))
+
+    def to_text(self):
+        """Render in the legacy text log layout"""
+        out = []
+        since_midnight = self.metadata.get('time_base') == 'seconds since midnight'
+        for ts, line in zip(self.timestamps, self.lines):
+            if since_midnight:
+                minutes, seconds = divmod(ts, 60)
+                hours, minutes = divmod(int(minutes), 60)
+                stamp = f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+            else:
+                stamp = datetime.fromtimestamp(ts).strftime('%H:%M:%S.%f')[:-3]
+            out.append(f"[{stamp}] {line}")
+        return '\n'.join(out) + '\n'
+
+
+def read_archive(path):
+    """Load a complete archive"""
+    return BootLogArchive(path)
+
+
+def read_log_text(path):
+    """
+    Read a boot log as text, whatever its storage format.
+
+    Archives are rendered in the legacy "[HH:MM:SS.mmm] line" layout, plain
+    text logs are decoded leniently (serial captures contain stray bytes).
+    """
+    if is_archive(path):
+        return read_archive(path).to_text()
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8', errors='ignore')
+
+
+def parse_legacy_log(path):
+    """Parse a legacy text log into (timestamp, line) entries"""
+    entries = []
+    last_ts = 0.0
+    with open(path, 'rb') as f:
+        for raw in f.read().decode('utf-8', errors='ignore').splitlines():
+            match = LEGACY_LINE_RE.match(raw)
+            if match:
+                hh, mm, ss, ms, line = match.groups()
+                last_ts = int(hh) * 3600 + int(mm) * 60 + int(ss) + int(ms) / 1000
+            else:
+                line = raw
+            entries.append((last_ts, line))
+    return entries
+
+
+def convert_legacy_log(path, out_path=None):
+    """
+    Convert a legacy text log to an archive next to it.
+
+    The log is scanned once with boot_kpi, so read_kpis() answers for the
+    converted archive as it does for one written by the boot monitor.
+    """
+    # boot_kpi reads archives through this module
+    from boot_kpi import scan_boot_log
+
+    out_path = out_path or os.path.splitext(path)[0] + ARCHIVE_SUFFIX
+    entries = parse_legacy_log(path)
+    metadata = {
+        'source': os.path.basename(path),
+        'converted': datetime.now().isoformat(timespec='seconds'),
+        'time_base': 'seconds since midnight',
+    }
+    scanned = scan_boot_log(line for _, line in entries)
+    kpis = scanned.to_dict()
+    kpis.update(boot_detected=scanned.uboot_seen, app_ready=scanned.application_started)
+    write_archive(out_path, entries, metadata=metadata, phases=scanned.phases, kpis=kpis)
+    return out_path
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Boot log archive tool")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    show = sub.add_parser('show', help='Print an archive as text')
+    show.add_argument('archive')
+
+    kpis = sub.add_parser('kpis', help='Print metadata, phases and KPIs (no decompression)')
+    kpis.add_argument('archive')
+
+    convert = sub.add_parser('convert', help='Convert legacy text logs to archives')
+    convert.add_argument('logs', nargs='+')
+
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        sys.stdout.write(read_log_text(args.archive))
+    elif args.command == 'kpis':
+        print(json.dumps(read_kpis(args.archive), indent=2))
+    elif args.command == 'convert':
+        for log in args.logs:
+            out_path = convert_legacy_log(log)
+            before = os.path.getsize(log)
+            after = os.path.getsize(out_path)
+            print(f"📦 {log} -> {out_path} ({before} -> {after} bytes, {after / max(before, 1) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
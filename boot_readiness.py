@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Boot Readiness Probes
+Pluggable "application ready" detectors used by the boot performance monitor
+and the offline log analyzers to decide when a boot is complete.
+"""
+
+__version__ = "1.0.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import re
+import socket
+import time
+
+# Default target address (U-Boot TFTP log: "our IP address is 192.168.1.200")
+DEFAULT_TARGET_HOST = "192.168.1.200"
+SYSTEM_MONITOR_PORT = 8080
+
+
+class ReadinessProbe:
+    """Base class for a single readiness condition"""
+
+    # Passive probes look at serial lines, active probes are polled
+    active = False
+
+    def __init__(self, name):
+        self.name = name
+        self.ready_time = None
+        self.detail = None
+
+    def reset(self):
+        """Forget a previous match (called when a new boot starts)"""
+        self.ready_time = None
+        self.detail = None
+
+    @property
+    def ready(self):
+        return self.ready_time is not None
+
+    def check_line(self, line, timestamp):
+        """Inspect one serial console line, return True when newly ready"""
+        return False
+
+    def poll(self, timestamp):
+        """Actively test readiness, return True when newly ready"""
+        return False
+
+    def mark_ready(self, timestamp, detail=None):
+        if self.ready_time is None:
+            self.ready_time = timestamp
+            self.detail = detail
+            return True
+        return False
+
+    def describe(self):
+        return self.name
+
+
+class BannerProbe(ReadinessProbe):
+    """Ready when a serial console line matches a regular expression"""
+
+    def __init__(self, name, pattern, flags=0):
+        super().__init__(name)
+        self.pattern = re.compile(pattern, flags)
+
+    def check_line(self, line, timestamp):
+        if self.ready_time is None and self.pattern.search(line):
+            return self.mark_ready(timestamp, line.strip())
+        return False
+
+    def describe(self):
+        return f"{self.name} (banner /{self.pattern.pattern}/)"
+
+
+class PromptProbe(BannerProbe):
+    """Ready when a login or shell prompt appears on the serial console"""
+
+    DEFAULT_PATTERN = r'(\blogin:\s*$|[#$]\s*$)'
+
+    def __init__(self, name="prompt", pattern=None):
+        super().__init__(name, pattern or self.DEFAULT_PATTERN)
+
+    def describe(self):
+        return f"{self.name} (prompt /{self.pattern.pattern}/)"
+
+
+class TcpPortProbe(ReadinessProbe):
+    """Ready when a TCP port on the target accepts connections"""
+
+    active = True
+
+    def __init__(self, name, host, port, connect_timeout=0.5):
+        super().__init__(name)
+        self.host = host
+        self.port = int(port)
+        self.connect_timeout = connect_timeout
+
+    def poll(self, timestamp):
+        if self.ready_time is not None:
+            return False
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.connect_timeout):
+                pass
+        except OSError:
+            return False
+        return self.mark_ready(time.time(), f"{self.host}:{self.port} accepting connections")
+
+    def describe(self):
+        return f"{self.name} (tcp {self.host}:{self.port})"
+
+
+def parse_probe_spec(spec, target_host=DEFAULT_TARGET_HOST):
+    """
+    Build probes from a command line specification.
+
+    Accepted forms:
+        <preset>                 one of PROBE_PRESETS (e.g. hello, shell, system-monitor)
+        banner:<regex>           serial line matching <regex>
+        prompt[:<regex>]         login/shell prompt (optional custom regex)
+        tcp:[<host>:]<port>      TCP port accepting connections
+
+    Returns:
+        list: ReadinessProbe instances
+    """
+    kind, _, arg = spec.partition(':')
+
+    if kind == 'banner':
+        if not arg:
+            raise ValueError("banner probe needs a regex, e.g. banner:'Hello World'")
+        return [BannerProbe(f"banner:{arg}", arg)]
+
+    if kind == 'prompt':
+        return [PromptProbe(pattern=arg or None)]
+
+    if kind == 'tcp':
+        host, _, port = arg.rpartition(':')
+        if not port.isdigit():
+            raise ValueError(f"Invalid tcp probe '{spec}', expected tcp:[host:]port")
+        return [TcpPortProbe(f"tcp:{port}", host or target_host, int(port))]
+
+    if spec in PROBE_PRESETS:
+        return PROBE_PRESETS[spec](target_host)
+
+    raise ValueError(f"Unknown readiness probe '{spec}' "
+                     f"(presets: {', '.join(sorted(PROBE_PRESETS))})")
+
+
+def build_probes(specs, target_host=DEFAULT_TARGET_HOST):
+    """Build a flat probe list from several specs, defaulting to the hello banner"""
+    probes = []
+    for spec in specs or ['hello']:
+        probes.extend(parse_probe_spec(spec, target_host))
+    return probes
+
+
+# Named probe sets, one per kind of image in recipes-srk/images
+PROBE_PRESETS = {
+    # core-image-tiny-initramfs-srk-9-nobusybox: helloloop prints its first line
+    'hello': lambda host: [BannerProbe('hello', r'Hello World 1970-01-01 00:00:00')],
+    # Any application banner, used for offline analysis of historical logs
+    'application': lambda host: [BannerProbe('application',
+                                             r'Hello World|Init complete|starting.*application',
+                                             re.IGNORECASE)],
+    # Images with busybox/bash and a getty on the serial console
+    'login': lambda host: [BannerProbe('login', r'\blogin:\s*$')],
+    'shell': lambda host: [PromptProbe()],
+    # Images shipping system-monitor-web (system-monitor.py on port 8080)
+    'system-monitor': lambda host: [TcpPortProbe('system-monitor', host, SYSTEM_MONITOR_PORT)],
+    'ssh': lambda host: [TcpPortProbe('ssh', host, 22)],
+}
+
+
+def scan_lines(lines, probes):
+    """
+    Run passive probes over already captured log lines.
+
+    Args:
+        lines: Iterable of (timestamp, line) tuples or plain strings
+        probes: List of ReadinessProbe instances
+
+    Returns:
+        dict: probe name -> (timestamp, matched line) for every probe that matched
+    """
+    passive = [p for p in probes if not p.active]
+    for probe in passive:
+        probe.reset()
+
+    for index, entry in enumerate(lines):
+        if isinstance(entry, tuple):
+            timestamp, line = entry
+        else:
+            timestamp, line = index, entry
+        for probe in passive:
+            probe.check_line(line, timestamp)
+        if all(p.ready for p in passive):
+            break
+
+    return {p.name: (p.ready_time, p.detail) for p in passive if p.ready}
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Boot Timeline Export
+Builds a timeline of host-side events and kernel phases from captured boot
+logs and exports it as a Chrome trace (chrome://tracing, ui.perfetto.dev),
+an SVG waterfall or an HTML page. Several runs can be overlaid to compare
+kernel configurations side by side.
+
+Kernel timestamps are mapped onto the host clock with the smallest observed
+(host time - kernel time) offset: serial transmission and the console replay
+of early printk messages only ever delay a line, so the minimum is the best
+estimate of when the kernel clock started.
+"""
+
+__version__ = "1.0.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import json
+import os
+from dataclasses import dataclass, field
+from html import escape
+
+from boot_kpi import BootKpiScanner
+from boot_readiness import build_probes
+from boot_log_archive import is_archive, read_archive, parse_legacy_log
+
+# Phase boundaries: event -> (span starting at this boundary, track)
+PHASE_SPANS = {
+    'spl': ('U-Boot', 'bootloader'),
+    'starting_kernel': ('Kernel decompression', 'bootloader'),
+    'kernel_start': ('Kernel early init', 'kernel'),
+    'console_ready': ('Kernel drivers', 'kernel'),
+    'kernel_cleanup': ('Free init memory', 'kernel'),
+    'init_start': ('Userspace start', 'userspace'),
+}
+
+# Instant events, every occurrence is kept (e.g. repeated ti-sysc failures)
+EVENT_LABELS = {
+    'spl': ('U-Boot SPL', 'bootloader'),
+    'starting_kernel': ('Starting kernel', 'bootloader'),
+    'kernel_start': ('Booting Linux', 'kernel'),
+    'console_ready': ('Console enabled', 'kernel'),
+    'ti_sysc_error': ('ti-sysc probe failure', 'kernel'),
+    'memory': ('Memory map', 'kernel'),
+    'kernel_cleanup': ('Free init memory', 'kernel'),
+    'init_start': ('Run /init', 'userspace'),
+}
+
+TRACKS = ('host', 'bootloader', 'kernel', 'userspace')
+
+# Run colours for overlays (first run matches the red "original" bar of the docs graphs)
+RUN_COLORS = ('#ef4444', '#3b82f6', '#10b981', '#f59e0b', '#8b5cf6', '#ec4899', '#14b8a6', '#6b7280')
+SPAN_COLORS = {'bootloader': '#f59e0b', 'kernel': '#3b82f6', 'userspace': '#10b981', 'host': '#6b7280'}
+
+FONT = "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"
+
+
+@dataclass
+class TimelineEvent:
+    """A span (duration > 0) or an instant event, in seconds since boot start"""
+    name: str
+    track: str
+    start: float
+    duration: float = 0.0
+    detail: str = None
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+
+@dataclass
+class BootTimeline:
+    """All timeline events of one boot"""
+    label: str
+    events: list = field(default_factory=list)
+    kernel_offset: float = None
+
+    @property
+    def spans(self):
+        return [e for e in self.events if e.duration > 0]
+
+    @property
+    def instants(self):
+        return [e for e in self.events if e.duration == 0]
+
+    @property
+    def end(self):
+        return max((e.end for e in self.events), default=0.0)
+
+
+def build_timeline(entries, label="boot", probe_times=None, probes=None, reset_time=None):
+    """
+    Build a timeline from captured (host timestamp, line) entries.
+
+    Args:
+        entries: List of (timestamp, line) tuples as captured by BBBBootMonitor
+        label: Run name shown in overlays
+        probe_times: Readiness probe name -> host ready time (live monitor); when
+                     omitted, passive probes are evaluated on the lines after U-Boot SPL
+        probes: Probes for offline evaluation (default: the 'application' preset)
+        reset_time: Host time the reset command was issued
+
+    Returns:
+        BootTimeline
+    """
+    scanner = BootKpiScanner(probes=[])
+    if probe_times is None:
+        probes = [p for p in (probes if probes is not None else build_probes(['application'])) if not p.active]
+        for probe in probes:
+            probe.reset()
+    else:
+        probes = []
+
+    # Logs captured without host timestamps fall back to the kernel clock
+    host_clock = len({ts for ts, _ in entries[:1000]}) > 1
+    last_ktime = 0.0
+
+    origin = None
+    offset = None
+    occurrences = []
+    for ts, line in entries:
+        event, ktime = scanner.feed(line)
+        if not host_clock:
+            last_ktime = ktime if ktime is not None else last_ktime
+            ts = last_ktime
+        if event == 'spl' and origin is None:
+            origin = ts
+        if origin is None:
+            # Output of the previous boot, before the reset
+            continue
+        if ktime is not None and (offset is None or ts - ktime < offset):
+            offset = ts - ktime
+        if event in EVENT_LABELS:
+            occurrences.append((event, ts, ktime, line.strip()))
+        for probe in probes:
+            probe.check_line(line, ts)
+
+    if origin is None:
+        origin = entries[0][0] if entries and host_clock else 0.0
+    if probe_times is None:
+        probe_times = {p.name: p.ready_time for p in probes if p.ready}
+
+    def when(ts, ktime):
+        if ktime is not None and offset is not None:
+            return offset + ktime - origin
+        return ts - origin
+
+    timeline = BootTimeline(label=label, kernel_offset=None if offset is None else offset - origin)
+
+    if reset_time is not None:
+        timeline.events.append(TimelineEvent('Reset command', 'host', reset_time - origin))
+
+    boundaries = {}
+    for event, ts, ktime, line in occurrences:
+        start = when(ts, ktime)
+        name, track = EVENT_LABELS[event]
+        timeline.events.append(TimelineEvent(name, track, start, detail=line))
+        if event in PHASE_SPANS and event not in boundaries:
+            boundaries[event] = start
+
+    ready = None
+    for name, ready_time in probe_times.items():
+        if ready_time is None:
+            continue
+        timeline.events.append(TimelineEvent(f"Ready: {name}", 'userspace', ready_time - origin))
+        ready = max(ready or 0.0, ready_time - origin)
+
+    # Consecutive phase boundaries become waterfall spans, the last one ends at readiness
+    points = sorted(boundaries.items(), key=lambda item: item[1])
+    for index, (event, start) in enumerate(points):
+        if index + 1 < len(points):
+            end = points[index + 1][1]
+        elif ready is not None:
+            end = ready
+        else:
+            continue
+        name, track = PHASE_SPANS[event]
+        if end > start:
+            timeline.events.append(TimelineEvent(name, track, start, end - start))
+
+    timeline.events.sort(key=lambda e: (e.start, -e.duration))
+    return timeline
+
+
+def load_timeline(path, label=None, probes=None):
+    """Build a timeline from a boot log archive or a legacy text log"""
+    label = label or os.path.splitext(os.path.basename(path))[0]
+    if not is_archive(path):
+        return build_timeline(parse_legacy_log(path), label, probes=probes)
+
+    archive = read_archive(path)
+    metadata = archive.metadata
+    probe_times = None
+    boot_start = metadata.get('boot_start_time')
+    offsets = archive.kpis.get('probes')
+    if boot_start is not None and offsets:
+        probe_times = {name: boot_start + offset for name, offset in offsets.items()}
+    return build_timeline(archive.entries(), label, probe_times=probe_times, probes=probes,
+                          reset_time=metadata.get('reset_time'))
+
+
+def to_chrome_trace(timelines):
+    """
+    Chrome trace event format: one process per run, one thread per track.
+
+    All runs start at ts=0, so they line up for comparison in the viewer.
+    """
+    events = []
+    for pid, timeline in enumerate(timelines, start=1):
+        events.append({'ph': 'M', 'name': 'process_name', 'pid': pid, 'tid': 0,
+                       'args': {'name': timeline.label}})
+        for tid, track in enumerate(TRACKS, start=1):
+            events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid,
+                           'args': {'name': track}})
+        for event in timeline.events:
+            record = {
+                'name': event.name,
+                'cat': event.track,
+                'pid': pid,
+                'tid': TRACKS.index(event.track) + 1,
+                'ts': round(event.start * 1_000_000),
+            }
+            if event.duration > 0:
+                record.update(ph='X', dur=round(event.duration * 1_000_000))
+            else:
+                record.update(ph='i', s='t')
+            if event.detail:
+                record['args'] = {'detail': event.detail}
+            events.append(record)
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def _tick_step(limit):
+    """A round axis step giving 4-10 ticks"""
+    step = 0.001
+    while limit / step > 10:
+        for factor in (2, 2.5, 2):
+            step *= factor
+            if limit / step <= 10:
+                break
+    return step
+
+
+def _svg_header(width, height, title, subtitle):
+    return [
+        f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}">',
+        '  <style>',
+        f'    .title {{ font-family: {FONT}; font-size: 24px; font-weight: bold; fill: #1f2937; }}',
+        f'    .subtitle {{ font-family: {FONT}; font-size: 16px; fill: #6b7280; }}',
+        f'    .axis-label {{ font-family: {FONT}; font-size: 12px; fill: #374151; }}',
+        f'    .bar-label {{ font-family: {FONT}; font-size: 12px; fill: #111827; }}',
+        f'    .improvement-text {{ font-family: {FONT}; font-size: 11px; fill: #059669; font-weight: bold; }}',
+        '    .grid-line { stroke: #e5e7eb; stroke-width: 1; }',
+        '  </style>',
+        f'  <rect width="{width}" height="{height}" fill="#f9fafb"/>',
+        f'  <text x="{width / 2:.0f}" y="30" text-anchor="middle" class="title">{escape(title)}</text>',
+        f'  <text x="{width / 2:.0f}" y="55" text-anchor="middle" class="subtitle">{escape(subtitle)}</text>',
+    ]
+
+
+def _svg_axis(out, left, top, plot_width, plot_height, limit):
+    step = _tick_step(limit)
+    tick = 0.0
+    while tick <= limit + 1e-9:
+        x = left + tick / limit * plot_width
+        out.append(f'  <line x1="{x:.1f}" y1="{top}" x2="{x:.1f}" y2="{top + plot_height}" class="grid-line"/>')
+        out.append(f'  <text x="{x:.1f}" y="{top + plot_height + 16}" text-anchor="middle" '
+                   f'class="axis-label">{tick * 1000:.0f}ms</text>')
+        tick += step
+
+
+def to_svg(timelines, title="BeagleBone Black Boot Timeline"):
+    """
+    SVG waterfall: one row per phase or event type, one lane per run.
+
+    Spans are bars, instant events are ticks (every occurrence is drawn);
+    hovering shows the console line.
+    """
+    rows = []
+    for timeline in timelines:
+        for event in timeline.spans + timeline.instants:
+            key = (event.name, event.duration > 0)
+            if key not in rows:
+                rows.append(key)
+    rows.sort(key=lambda key: min((e.start for t in timelines for e in t.events
+                                   if (e.name, e.duration > 0) == key), default=0.0))
+
+    lane = 14 if len(timelines) > 1 else 18
+    row_height = lane * len(timelines) + 8
+    left, top, plot_width = 220, 80, 720
+    plot_height = max(row_height * len(rows), row_height)
+    legend_height = 24 * len(timelines) if len(timelines) > 1 else 0
+    width = left + plot_width + 40
+    height = top + plot_height + 40 + legend_height + 20
+    limit = max((t.end for t in timelines), default=0.0) * 1.05 or 1.0
+
+    subtitle = " vs ".join(t.label for t in timelines) if len(timelines) > 1 else timelines[0].label
+    out = _svg_header(width, height, title, subtitle)
+    out.append(f'  <rect x="{left}" y="{top}" width="{plot_width}" height="{plot_height}" '
+               f'fill="white" stroke="#d1d5db" stroke-width="2"/>')
+    _svg_axis(out, left, top, plot_width, plot_height, limit)
+
+    for row_index, (name, is_span) in enumerate(rows):
+        y0 = top + row_index * row_height + 4
+        out.append(f'  <text x="{left - 8}" y="{y0 + row_height / 2 + 2:.1f}" text-anchor="end" '
+                   f'class="bar-label">{escape(name)}</text>')
+        for run_index, timeline in enumerate(timelines):
+            y = y0 + run_index * lane
+            for event in timeline.events:
+                if event.name != name or (event.duration > 0) != is_span:
+                    continue
+                x = left + event.start / limit * plot_width
+                tooltip = f"{timeline.label}: {event.name} @ {event.start * 1000:.1f}ms"
+                if is_span:
+                    color = RUN_COLORS[run_index % len(RUN_COLORS)] if len(timelines) > 1 \
+                        else SPAN_COLORS.get(event.track, '#6b7280')
+                    w = max(event.duration / limit * plot_width, 1.0)
+                    tooltip += f" ({event.duration * 1000:.1f}ms)"
+                    out.append(f'  <rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{lane - 2}" fill="{color}">'
+                               f'<title>{escape(tooltip)}</title></rect>')
+                else:
+                    color = RUN_COLORS[run_index % len(RUN_COLORS)]
+                    if event.detail:
+                        tooltip += f"\n{event.detail}"
+                    out.append(f'  <line x1="{x:.1f}" y1="{y}" x2="{x:.1f}" y2="{y + lane - 2}" '
+                               f'stroke="{color}" stroke-width="2"><title>{escape(tooltip)}</title></line>')
+
+    if len(timelines) > 1:
+        y = top + plot_height + 40
+        for run_index, timeline in enumerate(timelines):
+            color = RUN_COLORS[run_index % len(RUN_COLORS)]
+            out.append(f'  <rect x="{left}" y="{y + run_index * 24}" width="14" height="14" fill="{color}"/>')
+            out.append(f'  <text x="{left + 20}" y="{y + run_index * 24 + 12}" class="bar-label">'
+                       f'{escape(timeline.label)} ({timeline.end * 1000:.0f}ms)</text>')
+
+    out.append('</svg>')
+    return '\n'.join(out) + '\n'
+
+
+def to_summary_svg(timelines, title="BeagleBone Black Kernel Boot Time Optimization",
+                   subtitle="Progressive Optimization Results (Measured)"):
+    """
+    One stacked bar per run (phases as segments) with the improvement over
+    the first run - the data driven form of 02_docs/boot-time-optimization-graph.svg.
+    """
+    left, top, plot_width = 220, 80, 640
+    bar, gap = 35, 15
+    plot_height = len(timelines) * (bar + gap) + gap
+    width = left + plot_width + 80
+    height = top + plot_height + 80
+    totals = [max((e.end for e in t.spans), default=t.end) for t in timelines]
+    limit = max(totals, default=0.0) * 1.05 or 1.0
+
+    out = _svg_header(width, height, title, subtitle)
+    out.append(f'  <rect x="{left}" y="{top}" width="{plot_width}" height="{plot_height}" '
+               f'fill="white" stroke="#d1d5db" stroke-width="2"/>')
+    _svg_axis(out, left, top, plot_width, plot_height, limit)
+
+    for index, (timeline, total) in enumerate(zip(timelines, totals)):
+        y = top + gap + index * (bar + gap)
+        out.append(f'  <text x="{left - 8}" y="{y + bar / 2 + 4:.1f}" text-anchor="end" '
+                   f'class="bar-label">{escape(timeline.label)}</text>')
+        for span in timeline.spans:
+            x = left + span.start / limit * plot_width
+            w = max(span.duration / limit * plot_width, 1.0)
+            tooltip = f"{span.name}: {span.duration * 1000:.1f}ms"
+            out.append(f'  <rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{bar}" '
+                       f'fill="{SPAN_COLORS.get(span.track, "#6b7280")}" stroke="white" stroke-width="1">'
+                       f'<title>{escape(tooltip)}</title></rect>')
+        label_x = left + total / limit * plot_width + 6
+        out.append(f'  <text x="{label_x:.1f}" y="{y + bar / 2 + 4:.1f}" class="bar-label">{total * 1000:.0f}ms</text>')
+        if index and totals[0]:
+            change = (totals[0] - total) / totals[0] * 100
+            out.append(f'  <text x="{label_x:.1f}" y="{y + bar / 2 + 18:.1f}" class="improvement-text">'
+                       f'{change:+.1f}% vs {escape(timelines[0].label)}</text>')
+
+    y = top + plot_height + 40
+    for offset, track in enumerate(('bootloader', 'kernel', 'userspace')):
+        x = left + offset * 160
+        out.append(f'  <rect x="{x}" y="{y}" width="14" height="14" fill="{SPAN_COLORS[track]}"/>')
+        out.append(f'  <text x="{x + 20}" y="{y + 12}" class="bar-label">{track}</text>')
+
+    out.append('</svg>')
+    return '\n'.join(out) + '\n'
+
+
+def to_html(timelines, title="BeagleBone Black Boot Timeline"):
+    """Standalone HTML page: waterfall plus an event table per run"""
+    parts = [
+        '<!DOCTYPE html>',
+        '<html><head><meta charset="utf-8">',
+        f'<title>{escape(title)}</title>',
+        f'<style>body {{ font-family: {FONT}; background: #f9fafb; color: #1f2937; margin: 20px; }}',
+        'table { border-collapse: collapse; margin-bottom: 24px; font-size: 13px; }',
+        'td, th { border: 1px solid #d1d5db; padding: 3px 8px; text-align: left; }',
+        'td.num { text-align: right; font-family: monospace; }</style>',
+        '</head><body>',
+        to_svg(timelines, title),
+    ]
+    for timeline in timelines:
+        parts.append(f'<h2>{escape(timeline.label)}</h2>')
+        parts.append('<table><tr><th>Start (ms)</th><th>Duration (ms)</th><th>Track</th>'
+                     '<th>Event</th><th>Detail</th></tr>')
+        for event in timeline.events:
+            duration = f"{event.duration * 1000:.1f}" if event.duration else ""
+            parts.append(f'<tr><td class="num">{event.start * 1000:.1f}</td><td class="num">{duration}</td>'
+                         f'<td>{event.track}</td><td>{escape(event.name)}</td>'
+                         f'<td>{escape(event.detail or "")}</td></tr>')
+        parts.append('</table>')
+    parts.append('</body></html>')
+    return '\n'.join(parts) + '\n'
+
+
+def write_timeline(path, timelines, title=None):
+    """Write timelines in the format implied by the extension (.json, .svg, .html)"""
+    if path.endswith('.json'):
+        content = json.dumps(to_chrome_trace(timelines))
+    elif path.endswith('.svg'):
+        content = to_svg(timelines, title) if title else to_svg(timelines)
+    else:
+        content = to_html(timelines, title) if title else to_html(timelines)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+def _parse_run(spec):
+    """'label=path' or plain 'path'"""
+    label, sep, path = spec.partition('=')
+    if sep and not os.path.exists(spec):
+        return label, path
+    return None, spec
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Boot timeline export")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export', help='Waterfall (.svg/.html) or Chrome trace (.json) of one or more runs')
+    export.add_argument('logs', nargs='+', metavar='[LABEL=]LOG')
+    export.add_argument('-o', '--output', help='Output file (default: <first log>.timeline.html)')
+    export.add_argument('--ready', action='append', metavar='PROBE',
+                        help='Serial readiness probe for text logs (default: application)')
+
+    graph = sub.add_parser('graph', help='Boot time comparison graph (one stacked bar per run)')
+    graph.add_argument('logs', nargs='+', metavar='[LABEL=]LOG')
+    graph.add_argument('-o', '--output', required=True)
+    graph.add_argument('--ready', action='append', metavar='PROBE')
+
+    args = parser.parse_args()
+    timelines = []
+    for spec in args.logs:
+        label, path = _parse_run(spec)
+        probes = build_probes(args.ready) if args.ready else None
+        timelines.append(load_timeline(path, label, probes))
+
+    if args.command == 'export':
+        output = args.output or os.path.splitext(_parse_run(args.logs[0])[1])[0] + '.timeline.html'
+        write_timeline(output, timelines)
+    else:
+        output = args.output
+        with open(output, 'w') as f:
+            f.write(to_summary_svg(timelines))
+
+    for timeline in timelines:
+        print(f"⏱️  {timeline.label}: {len(timeline.spans)} phases, {len(timeline.instants)} events, "
+              f"{timeline.end * 1000:.0f}ms")
+    print(f"📄 Timeline written to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Kernel Artifact Cache
+Content-addressed store for optimization candidates, keyed by the hash of the
+final merged kernel .config and of the other build inputs that change the
+image (kernel source revision, recipe files, bundled initramfs).
+
+Each entry holds the deployable images of one configuration and, once the
+candidate has been boot-tested, its measured KPIs and boot log. Two fragment
+combinations that resolve to the same .config share one entry, so they are
+built and booted only once.
+
+    <root>/<key[:2]>/<key>/
+        config            normalized .config the key was computed from
+        meta.json         key, creation time, iterations that used the entry
+        <image files>     zImage / dtb as copied from the deploy directory
+        sizes.json        text/data/bss per subsystem of the build (kernel_size.py)
+        metrics.json      measured KPIs (after the first boot test)
+        boot_test.log     boot monitor output of that test
+"""
+
+__version__ = "1.0.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+from datetime import datetime
+
+from boot_kpi import KPI_SCHEMA_VERSION
+
+# Options that differ between otherwise identical builds
+IGNORED_OPTIONS = ('CONFIG_LOCALVERSION',)
+
+CONFIG_LINE_RE = re.compile(r'^(?:(CONFIG_\w+)=(.*)|# (CONFIG_\w+) is not set)$')
+
+
+def normalize_config(text):
+    """
+    Reduce a .config to its option assignments in a canonical order.
+
+    Comments, blank lines, duplicate assignments (the last one wins, as in
+    Kconfig) and IGNORED_OPTIONS are dropped.
+    """
+    options = {}
+    for line in text.splitlines():
+        match = CONFIG_LINE_RE.match(line.strip())
+        if not match:
+            continue
+        name, value, unset = match.groups()
+        if unset:
+            name, value = unset, 'n'
+        if name not in IGNORED_OPTIONS:
+            options[name] = value
+    return ''.join(f"{name}={options[name]}\n" for name in sorted(options))
+
+
+# (path, mtime, size) -> digest of files hashed during this run
+_file_digests = {}
+
+
+def file_digest(path):
+    """
+    sha256 of a file's contents; .gz files are hashed decompressed.
+
+    Digests are remembered by path, mtime and size, so the initramfs is not
+    re-read for every candidate.
+    """
+    stat = os.stat(path)
+    memo = (path, stat.st_mtime_ns, stat.st_size)
+    if memo not in _file_digests:
+        digest = hashlib.sha256()
+        with (gzip.open if path.endswith('.gz') else open)(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _file_digests[memo] = digest.hexdigest()
+    return _file_digests[memo]
+
+
+def tree_digest(paths):
+    """Digest of files and of every file below directories, by name and content"""
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(directory, name)
+                           for directory, _, names in os.walk(path) for name in names)
+            base = os.path.dirname(os.path.normpath(path))
+        else:
+            files, base = [path], os.path.dirname(path)
+        for name in files:
+            digest.update(f"{os.path.relpath(name, base)}\0{file_digest(name)}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def source_revision(source_dir):
+    """
+    HEAD of a kernel source tree, None if it is not a git tree.
+
+    kernel-yocto commits the recipe's patches on top of SRCREV, so the
+    revision covers both the kernel version and the patches applied.
+    """
+    try:
+        result = subprocess.run(['git', '-C', source_dir, 'rev-parse', 'HEAD'],
+                                capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def initramfs_digest(images):
+    """
+    Digest of the initramfs cpio bundled into the image.
+
+    Args:
+        images: Candidate paths of the cpio, the first that exists is used;
+                .cpio.gz is hashed decompressed, so it and the .cpio it
+                unpacks to give the same digest
+
+    Returns:
+        str or None: None if none of the images exists
+    """
+    for path in images:
+        if os.path.isfile(path):
+            return file_digest(path)
+    return None
+
+
+def config_key(config_path, extra_files=(), inputs=None):
+    """
+    Cache key of a merged .config and the other inputs of its build.
+
+    Args:
+        config_path: Path of the .config produced by do_kernel_configme
+        extra_files: Other build inputs that change the image (e.g. the DTS)
+        inputs: {name: identity} of inputs that are not single files, such
+                as the source revision or the initramfs digest
+
+    Returns:
+        tuple: (hex key, normalized config text)
+    """
+    with open(config_path, 'r', errors='replace') as f:
+        normalized = normalize_config(f.read())
+    digest = hashlib.sha256(normalized.encode('utf-8'))
+    for path in extra_files:
+        with open(path, 'rb') as f:
+            digest.update(b'\0' + os.path.basename(path).encode('utf-8') + b'\0' + f.read())
+    for name, identity in sorted((inputs or {}).items()):
+        digest.update(f"\0{name}={identity}".encode('utf-8'))
+    return digest.hexdigest(), normalized
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ArtifactCache:
+    """Kernel images and KPIs addressed by config key"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def entry_dir(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    @staticmethod
+    def key_of(entry_dir):
+        """The key is the entry directory name"""
+        return os.path.basename(os.path.normpath(entry_dir))
+
+    def has_images(self, key, files):
+        entry = self.entry_dir(key)
+        return all(os.path.isfile(os.path.join(entry, name)) for name in files)
+
+    def store_images(self, key, source_dir, files, normalized_config, iteration=None):
+        """
+        Copy images into the entry for key.
+
+        Files are copied to a temporary directory first and moved into place,
+        so an interrupted copy never leaves a half-populated entry behind.
+        """
+        entry = self.entry_dir(key)
+        tmp_entry = f"{entry}.tmp"
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        os.makedirs(tmp_entry)
+        for name in files:
+            # copy2 follows the deploy directory symlinks to the real images
+            shutil.copy2(os.path.join(source_dir, name), os.path.join(tmp_entry, name))
+        with open(os.path.join(tmp_entry, 'config'), 'w') as f:
+            f.write(normalized_config)
+
+        # Keep measurements of an older copy of the same configuration
+        if os.path.isdir(entry):
+            for name in ('metrics.json', 'boot_test.log', 'meta.json', 'sizes.json'):
+                if os.path.exists(os.path.join(entry, name)):
+                    shutil.copy2(os.path.join(entry, name), os.path.join(tmp_entry, name))
+            shutil.rmtree(entry)
+        os.replace(tmp_entry, entry)
+        self.record_use(key, iteration)
+        return entry
+
+    def record_use(self, key, iteration=None):
+        """Remember which iterations resolved to this entry"""
+        meta_path = os.path.join(self.entry_dir(key), 'meta.json')
+        meta = {'key': key, 'created': datetime.now().isoformat(timespec='seconds'), 'iterations': []}
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        if iteration is not None and iteration not in meta['iterations']:
+            meta['iterations'].append(iteration)
+        _write_json(meta_path, meta)
+
+    def load_config(self, key):
+        """Option values of the normalized .config of an entry, {} if it has none"""
+        path = os.path.join(self.entry_dir(key), 'config')
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as f:
+            return dict(line.rstrip('\n').split('=', 1) for line in f if '=' in line)
+
+    def load_metrics(self, key):
+        """Measured KPIs of an entry, None if never measured (or with an older KPI schema)"""
+        path = os.path.join(self.entry_dir(key), 'metrics.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('schema') != KPI_SCHEMA_VERSION:
+            return None
+        return data.get('metrics')
+
+    def boot_log(self, key):
+        path = os.path.join(self.entry_dir(key), 'boot_test.log')
+        return path if os.path.exists(path) else None
+
+    def store_metrics(self, key, metrics, boot_log=None):
+        entry = self.entry_dir(key)
+        if boot_log and os.path.exists(boot_log):
+            shutil.copy2(boot_log, os.path.join(entry, 'boot_test.log'))
+        _write_json(os.path.join(entry, 'metrics.json'),
+                    {'schema': KPI_SCHEMA_VERSION, 'metrics': metrics})
+
+    def store_sizes(self, key, sizes):
+        _write_json(os.path.join(self.entry_dir(key), 'sizes.json'), sizes)
+
+    def load_sizes(self, key):
+        """Subsystem sizes of an entry, None if not measured"""
+        path = os.path.join(self.entry_dir(key), 'sizes.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Incremental Kernel Build Tree
+Persistent kernel build tree for fast optimization iterations, seeded from
+the bitbake work directory of the kernel recipe.
+
+Seeding copies the kernel source, the build directory (objects and the
+merged recipe .config), the native sysroot with the cross toolchain and the
+do_compile task script into a directory bitbake never cleans, keeping the
+work directory layout and file times and relocating the absolute paths kbuild
+recorded. Make is then driven through the task script's own oe_runmake, so
+compiler and flags match bitbake exactly and nothing is rebuilt just because
+the command line changed.
+
+A candidate is configured with scripts/kconfig/merge_config.sh on top of the
+recipe .config and built with an incremental `make zImage`, which only
+rebuilds the objects affected by the changed options: minutes per iteration
+instead of a full bitbake task graph. Images built this way are for
+measurement only; the confirmed configuration is built by bitbake.
+
+    <root>/
+        git/                     kernel source (${S})
+        linux-*-build/           build directory (${B}), O= of every make call
+        recipe-sysroot-native/   cross toolchain and host tools
+        recipe-sysroot/
+        environment.sh           do_compile task script without its invocation
+        base.config              merged .config of the recipe (the seed)
+        seed.json                seed origin, time and relocated paths
+"""
+
+__version__ = "1.0.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import glob
+import json
+import os
+import shlex
+import shutil
+import signal
+import subprocess
+from datetime import datetime
+
+# Work directory entries a compile needs
+SEED_DIRS = ('git', 'recipe-sysroot-native', 'recipe-sysroot')
+
+# Files holding absolute paths of the work directory
+RELOCATED_FILES = ('environment.sh',)
+
+# Seconds a stopped command gets per signal before the next one
+STOP_GRACE = 10
+
+
+class KernelTreeError(Exception):
+    """Raised when the build tree cannot be seeded or used"""
+
+
+def start_process_group(command):
+    """Start a command in its own process group, with captured text output"""
+    return subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, start_new_session=True)
+
+
+def stop_process_group(process, signals=(signal.SIGTERM,), grace=STOP_GRACE):
+    """
+    Stop a process of start_process_group() with everything it started.
+
+    Args:
+        process: subprocess.Popen
+        signals: Signals sent to the group in turn, each followed by up to
+                 grace seconds of waiting; SIGKILL follows the last one
+    """
+    for sig in tuple(signals) + (signal.SIGKILL,):
+        if process.poll() is not None:
+            return
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            process.wait(timeout=grace)
+            return
+        except subprocess.TimeoutExpired:
+            pass
+
+
+def find_workdir(tmp_dir, kernel_name):
+    """
+    Newest work directory of the kernel recipe that has run do_compile.
+
+    Args:
+        tmp_dir: bitbake TMPDIR
+        kernel_name: Kernel recipe name (PN)
+
+    Returns:
+        str or None
+    """
+    scripts = glob.glob(os.path.join(tmp_dir, 'work', '*', kernel_name, '*', 'temp', 'run.do_compile'))
+    if not scripts:
+        return None
+    newest = max(scripts, key=os.path.getmtime)
+    return os.path.dirname(os.path.dirname(newest))
+
+
+def _task_environment(script_path):
+    """Task script up to (not including) the trailing `cd <B>` / task call"""
+    with open(script_path, 'r') as f:
+        lines = f.read().splitlines()
+    for index in range(len(lines) - 1, -1, -1):
+        if lines[index].startswith('cd '):
+            return '\n'.join(lines[:index]) + '\n'
+    raise KernelTreeError(f"{script_path} does not look like a bitbake task script")
+
+
+def _relocate_file(path, relocations):
+    """Rewrite absolute paths in one file, keeping its modification time"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    updated = data
+    for old, new in relocations:
+        updated = updated.replace(old.encode(), new.encode())
+    if updated != data:
+        stat = os.stat(path)
+        with open(path, 'wb') as f:
+            f.write(updated)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+class IncrementalKernelTree:
+    """Persistent kernel build tree driven by merge_config.sh and make"""
+
+    def __init__(self, root, jobs=None):
+        self.root = root
+        self.jobs = jobs or os.cpu_count() or 1
+        self.source_dir = os.path.join(root, 'git')
+        self.environment = os.path.join(root, 'environment.sh')
+        self.base_config = os.path.join(root, 'base.config')
+        self.seed_file = os.path.join(root, 'seed.json')
+        # Command running in the tree, for stop()
+        self.process = None
+
+    @property
+    def build_dir(self):
+        matches = glob.glob(os.path.join(self.root, 'linux-*-build'))
+        return matches[0] if matches else None
+
+    @property
+    def config_path(self):
+        return os.path.join(self.build_dir, '.config')
+
+    def is_seeded(self):
+        return os.path.exists(self.seed_file)
+
+    def seed_info(self):
+        with open(self.seed_file, 'r') as f:
+            return json.load(f)
+
+    def seed(self, workdir):
+        """
+        Copy the compile inputs of a bitbake work directory into the tree.
+
+        The work directory must have completed do_bundle_initramfs, so the
+        build directory holds the initramfs cpio that is linked into zImage.
+        """
+        build_dirs = glob.glob(os.path.join(workdir, 'linux-*-build'))
+        script = os.path.join(workdir, 'temp', 'run.do_compile')
+        if not build_dirs or not os.path.exists(script):
+            raise KernelTreeError(f"{workdir} has no compiled kernel build directory")
+        build_dir = build_dirs[0]
+        if not glob.glob(os.path.join(build_dir, 'usr', '*.cpio')):
+            raise KernelTreeError(f"{build_dir}/usr has no initramfs cpio - "
+                                  f"build the recipe completely before seeding")
+
+        # The kernel source usually lives in work-shared behind the git symlink
+        relocations = [(os.path.realpath(os.path.join(workdir, 'git')), self.source_dir),
+                       (os.path.realpath(workdir), self.root)]
+        if os.path.realpath(workdir) != workdir:
+            relocations.append((workdir, self.root))
+
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root)
+        for name in SEED_DIRS:
+            source = os.path.join(workdir, name)
+            if os.path.isdir(source):
+                # copytree keeps file times (copy2), so make sees up-to-date objects
+                shutil.copytree(source, os.path.join(self.root, name), symlinks=True)
+        new_build_dir = os.path.join(self.root, os.path.basename(build_dir))
+        shutil.copytree(build_dir, new_build_dir, symlinks=True)
+        with open(self.environment, 'w') as f:
+            f.write(_task_environment(script))
+
+        relocated = 0
+        for directory, _, files in os.walk(new_build_dir):
+            for name in files:
+                if name.endswith('.cmd'):
+                    _relocate_file(os.path.join(directory, name), relocations)
+                    relocated += 1
+        for name in RELOCATED_FILES:
+            _relocate_file(os.path.join(self.root, name), relocations)
+        source_link = os.path.join(new_build_dir, 'source')
+        if os.path.islink(source_link):
+            os.remove(source_link)
+            os.symlink(self.source_dir, source_link)
+
+        shutil.copy2(os.path.join(new_build_dir, '.config'), self.base_config)
+        seed = {
+            'workdir': workdir,
+            'seeded': datetime.now().isoformat(timespec='seconds'),
+            'relocations': relocations,
+            'relocated_cmd_files': relocated,
+        }
+        with open(self.seed_file, 'w') as f:
+            json.dump(seed, f, indent=2)
+        return seed
+
+    def initramfs_source(self):
+        """CONFIG_INITRAMFS_SOURCE argument as do_bundle_initramfs passes it"""
+        matches = sorted(glob.glob(os.path.join(self.build_dir, 'usr', '*.cpio')))
+        return f"CONFIG_INITRAMFS_SOURCE={matches[0]}" if matches else ""
+
+    def run(self, command, timeout=1800):
+        """
+        Run a shell command in the build directory with the task environment.
+
+        Returns:
+            subprocess.CompletedProcess
+        """
+        script = f". {shlex.quote(self.environment)} && cd {shlex.quote(self.build_dir)} && {command}"
+        self.process = process = start_process_group(["bash", "-c", script])
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except BaseException:
+            # Timeout or Ctrl-C: the make must not outlive this call
+            stop_process_group(process)
+            raise
+        finally:
+            self.process = None
+        return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+    def stop(self):
+        """Stop the command running in the tree (from another thread), with the make it started"""
+        process = self.process
+        if process is not None:
+            stop_process_group(process)
+
+    def configure(self, fragments):
+        """
+        Merge fragments onto the recipe .config and resolve dependencies.
+
+        Returns:
+            subprocess.CompletedProcess of the failing step or of olddefconfig
+        """
+        merge = os.path.join(self.source_dir, 'scripts', 'kconfig', 'merge_config.sh')
+        args = " ".join(shlex.quote(path) for path in [self.base_config] + list(fragments))
+        result = self.run(f"{shlex.quote(merge)} -m -O {shlex.quote(self.build_dir)} {args}", timeout=300)
+        if result.returncode != 0:
+            return result
+        return self.run("oe_runmake olddefconfig", timeout=300)
+
+    def compile(self, targets, timeout=1800):
+        """Incremental make of the given targets with the bundled initramfs"""
+        return self.run(f"oe_runmake -j{self.jobs} {' '.join(targets)} {self.initramfs_source()}",
+                        timeout=timeout)
+
+    def output(self, relative_path):
+        """Path of a build product, e.g. arch/arm/boot/zImage"""
+        return os.path.join(self.build_dir, relative_path)
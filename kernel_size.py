@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Kernel Size by Subsystem
+Build-time text/data/bss of a kernel build directory, broken down by the
+built-in.a archive of each top-level directory (and of each drivers/
+subdirectory), as ksize.py reports it.
+
+ksize.py runs `size` once per glob and recurses through every directory,
+which is too slow to repeat for every optimization iteration. Since kbuild's
+built-in.a files are thin archives that list every object below their
+directory, a single `size` call over the subsystem archives (plus vmlinux)
+yields the whole breakdown; member lines are summed per archive.
+
+    python3 kernel_size.py [BUILD_DIR] [--json]
+"""
+
+__version__ = "1.0.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+
+# Archives reported as subsystems, relative to the build directory
+SUBSYSTEM_GLOBS = ('arch/*/built-in.a', '*/built-in.a', 'drivers/*/built-in.a')
+
+FIELDS = ('text', 'data', 'bss')
+
+# Berkeley output: text data bss dec hex filename [(ex archive)]
+SIZE_LINE_RE = re.compile(r'^\s*(\d+)\s+(\d+)\s+(\d+)\s+\d+\s+[0-9a-fA-F]+\s+(.*?)(?: \(ex (.+)\))?$')
+
+
+def find_size_tool(build_dir):
+    """
+    Cross `size` of the kernel toolchain.
+
+    The build directory sits in the recipe work directory (or a copy of it,
+    see kernel_incremental_build.py) next to recipe-sysroot-native; falls
+    back to the host `size`, which reads ARM ELF through its generic targets.
+    """
+    workdir = os.path.dirname(os.path.abspath(build_dir))
+    matches = glob.glob(os.path.join(workdir, 'recipe-sysroot-native', 'usr', 'bin', '*', '*-size'))
+    return matches[0] if matches else 'size'
+
+
+def subsystem_name(archive):
+    """drivers/tty/built-in.a -> drivers/tty"""
+    return os.path.dirname(archive)
+
+
+def measure_sizes(build_dir, size_tool=None, timeout=120):
+    """
+    Size of vmlinux and of every subsystem archive.
+
+    Returns:
+        dict: {name: {"text": bytes, "data": bytes, "bss": bytes}},
+              with "vmlinux" for the linked image; empty if nothing was built
+    """
+    archives = []
+    for pattern in SUBSYSTEM_GLOBS:
+        for path in sorted(glob.glob(os.path.join(build_dir, pattern))):
+            relative = os.path.relpath(path, build_dir)
+            if relative not in archives:
+                archives.append(relative)
+    files = archives + (['vmlinux'] if os.path.exists(os.path.join(build_dir, 'vmlinux')) else [])
+    if not files:
+        return {}
+
+    result = subprocess.run([size_tool or find_size_tool(build_dir), '-B', '-d'] + files,
+                            cwd=build_dir, capture_output=True, text=True, timeout=timeout)
+    sizes = {}
+    for line in result.stdout.splitlines():
+        match = SIZE_LINE_RE.match(line)
+        if not match:
+            continue
+        text, data, bss, filename, archive = match.groups()
+        name = subsystem_name(archive) if archive else filename
+        entry = sizes.setdefault(name, dict.fromkeys(FIELDS, 0))
+        entry['text'] += int(text)
+        entry['data'] += int(data)
+        entry['bss'] += int(bss)
+    return sizes
+
+
+def size_deltas(before, after):
+    """
+    Per-subsystem change from before to after (negative = shrank).
+
+    Subsystems that disappeared count as shrinking to zero.
+    """
+    deltas = {}
+    for name in sorted(set(before) | set(after)):
+        old = before.get(name, {})
+        new = after.get(name, {})
+        delta = {field: new.get(field, 0) - old.get(field, 0) for field in FIELDS}
+        if any(delta.values()):
+            deltas[name] = delta
+    return deltas
+
+
+def size_total(entry):
+    return sum(entry.get(field, 0) for field in FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kernel text/data/bss by subsystem")
+    parser.add_argument("build_dir", nargs="?", default=".", help="Kernel build directory (default: .)")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    sizes = measure_sizes(args.build_dir)
+    if args.json:
+        print(json.dumps(sizes, indent=2))
+        return
+    print(f"{'subsystem':<32} {'total':>10} | {'text':>10} {'data':>10} {'bss':>10}")
+    print('-' * 80)
+    for name, entry in sorted(sizes.items(), key=lambda item: -size_total(item[1])):
+        print(f"{name:<32} {size_total(entry):>10} | {entry['text']:>10} {entry['data']:>10} {entry['bss']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Optimization Report
+Interactive HTML report of a kernel optimization run, built from the
+structured per-iteration metrics (checkpoint.json, artifact cache) rather
+than from boot log text:
+
+- cumulative waterfall of boot time, rwdata, rodata and available memory
+- boot time means with 95% confidence intervals when candidates were booted
+  more than once (03_complete_optimization.py --boots-per-candidate)
+- per-iteration deltas and their attribution to the options each iteration
+  disabled
+
+Iterations are cumulative, so every change is measured against the last
+earlier iteration that has the metric.
+
+    python3 optimization_report.py build/srk-optimization/checkpoint.json -o report.html
+"""
+
+__version__ = "1.0.0"
+__author__ = "SRK Development Team"
+__copyright__ = "Copyright (c) 2025 SRK. All rights reserved."
+__license__ = "MIT"
+
+import json
+import math
+import statistics
+from html import escape
+
+from kernel_size import size_total
+
+# key, label, unit, format, direction of improvement (-1: smaller is better)
+METRICS = (
+    ('boot_time', 'Boot time', 's', '{:.3f}', -1),
+    ('rwdata', 'rwdata', 'K', '{:.0f}', -1),
+    ('rodata', 'rodata', 'K', '{:.0f}', -1),
+    ('available_memory', 'Available memory', 'K', '{:.0f}', 1),
+)
+
+# Two-sided 95% Student t quantiles for 1..30 degrees of freedom
+T_95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+GOOD_COLOR = '#10b981'
+BAD_COLOR = '#ef4444'
+TOTAL_COLOR = '#3b82f6'
+
+FONT = "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"
+
+
+def t_95(df):
+    return T_95[df - 1] if df <= len(T_95) else 1.960
+
+
+def boot_samples(metrics):
+    """Single boot times of an iteration (one without repeated boots has one)"""
+    samples = metrics.get('boot_times') or [metrics.get('boot_time')]
+    return [sample for sample in samples if sample is not None]
+
+
+def mean_ci(samples):
+    """
+    Mean and 95% confidence half-width of a sample.
+
+    Returns:
+        tuple: (mean, half-width); half-width is None below two samples
+    """
+    if not samples:
+        return None, None
+    mean = statistics.fmean(samples)
+    if len(samples) < 2:
+        return mean, None
+    return mean, t_95(len(samples) - 1) * statistics.stdev(samples) / math.sqrt(len(samples))
+
+
+def delta_ci(before, after):
+    """
+    Change of the mean between two samples and its 95% half-width (Welch
+    standard error, degrees of freedom of the smaller sample).
+    """
+    if not before or not after:
+        return None, None
+    delta = statistics.fmean(after) - statistics.fmean(before)
+    if len(before) < 2 or len(after) < 2:
+        return delta, None
+    error = math.sqrt(statistics.variance(before) / len(before) + statistics.variance(after) / len(after))
+    return delta, t_95(min(len(before), len(after)) - 1) * error
+
+
+def step_deltas(steps):
+    """
+    Change of every metric per iteration.
+
+    Returns:
+        list: one dict per step with the step, each metric's delta (None for
+              the first value), "reference" (iteration each delta is taken
+              against), "boot_time_ci" and "image" (vmlinux bytes, kernel_size.py)
+    """
+    rows = []
+    last = {}
+    for index, step in enumerate(steps):
+        row = {'step': step, 'reference': {}, 'boot_time_ci': None, 'image': None}
+        for key, *_ in METRICS:
+            row[key] = None
+            if step.get(key) is None:
+                continue
+            if key in last:
+                reference = steps[last[key]]
+                row[key] = step[key] - reference[key]
+                row['reference'][key] = reference['iteration']
+                if key == 'boot_time':
+                    _, row['boot_time_ci'] = delta_ci(boot_samples(reference), boot_samples(step))
+            last[key] = index
+        image = (step.get('size_deltas') or {}).get('vmlinux')
+        if image:
+            row['image'] = size_total(image)
+        rows.append(row)
+    return rows
+
+
+def load_steps(checkpoint_path, backend="bitbake"):
+    """
+    Measured iterations of a checkpoint, in order.
+
+    Only the fixed iterations (numeric ids) are returned; config search
+    candidates have their own report.
+    """
+    with open(checkpoint_path, 'r') as f:
+        state = json.load(f)
+    steps = []
+    for name, entry in state.get('iterations', {}).items():
+        iteration, _, entry_backend = name.partition('@')
+        if entry_backend == backend and iteration.isdigit() and entry.get('stage') == 'measured':
+            steps.append(entry['metrics'])
+    return sorted(steps, key=lambda step: step['iteration'])
+
+
+def _format(value, spec, signed=False):
+    if value is None:
+        return 'N/A'
+    text = spec.format(value)
+    return f"+{text}" if signed and value > 0 else text
+
+
+def _cell(value, spec, signed=False, better=None, ci=None):
+    """Sortable table cell, coloured by whether a change is an improvement"""
+    text = _format(value, spec, signed)
+    if ci is not None:
+        text += f" ± {spec.format(ci)}"
+    style = ''
+    if better is not None and value:
+        color = GOOD_COLOR if value * better > 0 else BAD_COLOR
+        # Changes within the confidence interval are not significant
+        if ci is None or abs(value) > ci:
+            style = f' style="color: {color}; font-weight: bold;"'
+    sort_value = '' if value is None else f"{value}"
+    return f'<td class="num" data-value="{sort_value}"{style}>{escape(text)}</td>'
+
+
+def to_waterfall_svg(steps, key, label, unit, spec, better):
+    """
+    Waterfall of one metric: the first measured value, one floating bar per
+    change (green: improvement, red: regression) and the final value.
+
+    Boot time levels carry their 95% confidence interval as whiskers.
+    """
+    points = []
+    for step in steps:
+        if step.get(key) is None:
+            continue
+        ci = mean_ci(boot_samples(step))[1] if key == 'boot_time' else None
+        points.append((step['iteration'], step[key], ci))
+    if not points:
+        return f'<p>No {escape(label)} measurements.</p>'
+
+    left, top, bar, gap, plot_height = 90, 20, 36, 18, 260
+    bars = len(points) + 1
+    plot_width = bars * (bar + gap) + gap
+    width, height = left + plot_width + 20, top + plot_height + 50
+
+    levels = [value for _, value, _ in points]
+    levels += [value + (ci or 0) for _, value, ci in points] + [value - (ci or 0) for _, value, ci in points]
+    low, high = min(levels), max(levels)
+    pad = (high - low) * 0.15 or abs(high) * 0.05 or 1.0
+    low, high = low - pad, high + pad
+
+    def y(value):
+        return top + (high - value) / (high - low) * plot_height
+
+    out = [f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg" '
+           f'viewBox="0 0 {width} {height}" font-family="{FONT}" font-size="12">',
+           f'<rect x="{left}" y="{top}" width="{plot_width}" height="{plot_height}" '
+           f'fill="white" stroke="#d1d5db" stroke-width="2"/>']
+    for tick in range(6):
+        value = low + (high - low) * tick / 5
+        out.append(f'<line x1="{left}" y1="{y(value):.1f}" x2="{left + plot_width}" y2="{y(value):.1f}" '
+                   f'stroke="#e5e7eb"/>')
+        out.append(f'<text x="{left - 6}" y="{y(value) + 4:.1f}" text-anchor="end" fill="#374151">'
+                   f'{spec.format(value)}{unit}</text>')
+
+    previous = None
+    for index, (iteration, value, ci) in enumerate(points + [('final', points[-1][1], points[-1][2])]):
+        x = left + gap + index * (bar + gap)
+        if previous is None or iteration == 'final':
+            start, color = low, TOTAL_COLOR
+            tooltip = f"{iteration}: {spec.format(value)}{unit}"
+        else:
+            start = previous
+            change = value - previous
+            color = GOOD_COLOR if change * better > 0 else BAD_COLOR if change else '#9ca3af'
+            tooltip = f"{iteration}: {spec.format(value)}{unit} ({_format(change, spec, True)}{unit})"
+        if ci is not None:
+            tooltip += f", 95% CI ± {spec.format(ci)}{unit}"
+        top_y, bottom_y = sorted((y(start), y(value)))
+        out.append(f'<rect x="{x}" y="{top_y:.1f}" width="{bar}" height="{max(bottom_y - top_y, 1.0):.1f}" '
+                   f'fill="{color}"><title>{escape(tooltip)}</title></rect>')
+        if ci is not None:
+            center = x + bar / 2
+            out.append(f'<line x1="{center}" y1="{y(value - ci):.1f}" x2="{center}" y2="{y(value + ci):.1f}" '
+                       f'stroke="#111827" stroke-width="1.5"/>')
+            for level in (value - ci, value + ci):
+                out.append(f'<line x1="{center - 6}" y1="{y(level):.1f}" x2="{center + 6}" y2="{y(level):.1f}" '
+                           f'stroke="#111827" stroke-width="1.5"/>')
+        out.append(f'<text x="{x + bar / 2}" y="{top + plot_height + 16}" text-anchor="middle" '
+                   f'fill="#374151">{escape(iteration)}</text>')
+        previous = value
+
+    out.append(f'<text x="{left + plot_width / 2}" y="{height - 8}" text-anchor="middle" fill="#6b7280">'
+               f'Iteration (axis does not start at zero)</text>')
+    out.append('</svg>')
+    return '\n'.join(out)
+
+
+SCRIPT = """
+function showMetric(key) {
+  document.querySelectorAll('.waterfall').forEach(function (el) {
+    el.style.display = el.id === 'waterfall-' + key ? '' : 'none';
+  });
+  document.querySelectorAll('.tab').forEach(function (el) {
+    el.classList.toggle('active', el.dataset.metric === key);
+  });
+}
+document.querySelectorAll('table.sortable th').forEach(function (th) {
+  th.addEventListener('click', function () {
+    var body = th.closest('table').tBodies[0], index = th.cellIndex;
+    var ascending = th.dataset.order !== 'asc';
+    th.dataset.order = ascending ? 'asc' : 'desc';
+    Array.from(body.rows).sort(function (a, b) {
+      var x = a.cells[index].dataset.value, y = b.cells[index].dataset.value;
+      var cmp = (x === '' || y === '' || isNaN(x) || isNaN(y)) ?
+        String(x).localeCompare(String(y)) : parseFloat(x) - parseFloat(y);
+      return ascending ? cmp : -cmp;
+    }).forEach(function (row) { body.appendChild(row); });
+  });
+});
+"""
+
+STYLE = f"""
+body {{ font-family: {FONT}; background: #f9fafb; color: #1f2937; margin: 20px; }}
+table {{ border-collapse: collapse; margin-bottom: 24px; font-size: 13px; background: white; }}
+td, th {{ border: 1px solid #d1d5db; padding: 3px 8px; text-align: left; }}
+th {{ cursor: pointer; background: #f3f4f6; }}
+td.num {{ text-align: right; font-family: monospace; }}
+.cards {{ display: flex; gap: 12px; margin-bottom: 20px; }}
+.card {{ background: white; border: 1px solid #d1d5db; padding: 10px 16px; }}
+.card .value {{ font-size: 20px; font-weight: bold; }}
+.tab {{ border: 1px solid #d1d5db; background: white; padding: 6px 12px; cursor: pointer; }}
+.tab.active {{ background: {TOTAL_COLOR}; color: white; }}
+"""
+
+
+def to_html(steps, title="Kernel Optimization Report", confirmed=None, generated=None):
+    """
+    Standalone HTML report.
+
+    Args:
+        steps: Metrics dicts of the iterations in order (iteration,
+               description, options, boot_time, boot_times, rwdata, ...)
+        confirmed: Metrics of the bitbake confirmation build, if any
+    """
+    rows = step_deltas(steps)
+    parts = ['<!DOCTYPE html>', '<html><head><meta charset="utf-8">',
+             f'<title>{escape(title)}</title>', f'<style>{STYLE}</style>', '</head><body>',
+             f'<h1>{escape(title)}</h1>']
+    if generated:
+        parts.append(f'<p>Generated: {escape(str(generated))}</p>')
+
+    # Summary: first and last value of every metric
+    parts.append('<div class="cards">')
+    for key, label, unit, spec, better in METRICS:
+        values = [step for step in steps if step.get(key) is not None]
+        if not values:
+            continue
+        first, last = values[0][key], values[-1][key]
+        change = last - first
+        percent = f" ({change / first * 100:+.1f}%)" if first else ""
+        color = GOOD_COLOR if change * better > 0 else BAD_COLOR if change else '#6b7280'
+        parts.append(f'<div class="card"><div>{escape(label)}</div>'
+                     f'<div class="value">{spec.format(last)}{unit}</div>'
+                     f'<div style="color: {color};">{_format(change, spec, True)}{unit}{percent} '
+                     f'since {escape(values[0]["iteration"])}</div></div>')
+    parts.append('</div>')
+
+    parts.append('<h2>Cumulative Waterfall</h2><div>')
+    for index, (key, label, *_) in enumerate(METRICS):
+        active = ' active' if index == 0 else ''
+        parts.append(f'<button class="tab{active}" data-metric="{key}" onclick="showMetric(\'{key}\')">'
+                     f'{escape(label)}</button>')
+    parts.append('</div>')
+    for index, (key, label, unit, spec, better) in enumerate(METRICS):
+        hidden = '' if index == 0 else ' style="display: none;"'
+        parts.append(f'<div class="waterfall" id="waterfall-{key}"{hidden}>')
+        parts.append(to_waterfall_svg(steps, key, label, unit, spec, better))
+        parts.append('</div>')
+
+    parts.append('<h2>Per-Iteration Deltas</h2>')
+    parts.append('<p>Boot times are means over the boots of an iteration with their 95% confidence '
+                 'interval; changes within the interval are not highlighted.</p>')
+    parts.append('<table class="sortable"><thead><tr><th>Iteration</th><th>Description</th>'
+                 '<th>Boots</th><th>Boot Time (s)</th><th>Δ Boot Time (ms)</th><th>Δ rwdata (K)</th>'
+                 '<th>Δ rodata (K)</th><th>Δ Available (K)</th><th>Δ vmlinux (K)</th><th>Boards</th>'
+                 '</tr></thead><tbody>')
+    for row in rows:
+        step = row['step']
+        samples = boot_samples(step)
+        mean, ci = mean_ci(samples)
+        delta = row['boot_time']
+        parts.append('<tr>'
+                     f'<td data-value="{escape(step["iteration"])}">{escape(step["iteration"])}</td>'
+                     f'<td>{escape(step.get("description") or "")}</td>'
+                     f'<td class="num" data-value="{len(samples)}">{len(samples)}</td>'
+                     + _cell(mean, '{:.3f}', ci=ci)
+                     + _cell(None if delta is None else delta * 1000, '{:.0f}', True, -1,
+                             None if row['boot_time_ci'] is None else row['boot_time_ci'] * 1000)
+                     + _cell(row['rwdata'], '{:.0f}', True, -1)
+                     + _cell(row['rodata'], '{:.0f}', True, -1)
+                     + _cell(row['available_memory'], '{:.0f}', True, 1)
+                     + _cell(None if row['image'] is None else row['image'] / 1024, '{:.1f}', True, -1)
+                     + f'<td>{escape(", ".join(step.get("boards") or []))}</td></tr>')
+    parts.append('</tbody></table>')
+
+    parts.append('<h2>Attribution per Option</h2>')
+    parts.append('<p>Every option is credited with the change of the iteration that disabled it; '
+                 'options of one iteration share that measurement.</p>')
+    parts.append('<table class="sortable"><thead><tr><th>Option</th><th>Iteration</th>'
+                 '<th>Δ Boot Time (ms)</th><th>Δ rwdata (K)</th><th>Δ rodata (K)</th>'
+                 '<th>Δ Available (K)</th><th>Δ vmlinux (K)</th><th>Shared With</th></tr></thead><tbody>')
+    for row in rows:
+        options = row['step'].get('options') or []
+        delta = row['boot_time']
+        for option in options:
+            parts.append(f'<tr><td data-value="{escape(option)}">{escape(option)}</td>'
+                         f'<td data-value="{escape(row["step"]["iteration"])}">{escape(row["step"]["iteration"])}</td>'
+                         + _cell(None if delta is None else delta * 1000, '{:.0f}', True, -1,
+                                 None if row['boot_time_ci'] is None else row['boot_time_ci'] * 1000)
+                         + _cell(row['rwdata'], '{:.0f}', True, -1)
+                         + _cell(row['rodata'], '{:.0f}', True, -1)
+                         + _cell(row['available_memory'], '{:.0f}', True, 1)
+                         + _cell(None if row['image'] is None else row['image'] / 1024, '{:.1f}', True, -1)
+                         + f'<td class="num" data-value="{len(options) - 1}">{len(options) - 1}</td></tr>')
+    parts.append('</tbody></table>')
+
+    if confirmed:
+        mean, ci = mean_ci(boot_samples(confirmed))
+        parts.append('<h2>Confirmed Build (bitbake)</h2>')
+        parts.append(f'<p>Iteration {escape(confirmed["iteration"])} rebuilt with bitbake: boot time '
+                     f'{_format(mean, "{:.3f}")}s' + (f' ± {ci:.3f}s' if ci is not None else '') +
+                     f', rwdata {_format(confirmed.get("rwdata"), "{:.0f}")}K</p>')
+
+    parts.append(f'<script>{SCRIPT}</script>')
+    parts.append('</body></html>')
+    return '\n'.join(parts) + '\n'
+
+
+def write_report(path, steps, title="Kernel Optimization Report", confirmed=None, generated=None):
+    with open(path, 'w') as f:
+        f.write(to_html(steps, title, confirmed, generated))
+    return path
+
+
+def main():
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description="HTML report of an optimization checkpoint")
+    parser.add_argument("checkpoint", help="checkpoint.json of 03_complete_optimization.py")
+    parser.add_argument("-o", "--output", default="optimization_report.html",
+                        help="Output file (default: optimization_report.html)")
+    parser.add_argument("--backend", choices=["bitbake", "make"], default="bitbake",
+                        help="Iterations of this build backend (default: bitbake)")
+    args = parser.parse_args()
+
+    steps = load_steps(args.checkpoint, args.backend)
+    write_report(args.output, steps, generated=datetime.now())
+    print(f"📊 {len(steps)} measured iterations")
+    print(f"📄 Report written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
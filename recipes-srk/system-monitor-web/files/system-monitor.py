@@ -2,26 +2,2096 @@
 """
 Lightweight System Monitor Web Server
 Displays CPU, RAM, and network metrics on a web page
+
+A background sampler thread reads /proc and sysfs at a fixed interval into a
+ring buffer, through file descriptors kept open and re-read with pread;
+requests are served from the latest sample. Every sample also feeds a
+multi-resolution round-robin history served by /api/history.
+Dashboards follow /api/stream, which pushes only the sections that changed
+as server-sent events.
+
+Connections are kept alive (HTTP/1.1) and served by a small fixed pool of
+worker threads; subprocess-backed RTC actions run as background jobs.
+IPsec tunnels come from charon's VICI socket (one persistent connection,
+subscribed to SA up/down events); --vici-stand-in serves a test tunnel on
+it. /metrics exposes the cached sections in OpenMetrics text format. The page
+and the system information are built and compressed once at startup and
+served with ETags.
 """
 
-import http.server
-import socketserver
-import json
-import time
-import os
-from datetime import datetime
+import argparse
+import calendar
+import fcntl
+import gzip
+import hashlib
+import http.server
+import itertools
+import queue
+import select
+import socket
+import socketserver
+import struct
+import json
+import threading
+import time
+import os
+import re
+from array import array
+from datetime import datetime
+from urllib.parse import parse_qs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PORT = 8080
+
+# Seconds between two samples of the background sampler
+SAMPLE_INTERVAL = 2.0
+
+# Seconds between two refreshes of the LED, IPsec and RTC status
+STATUS_INTERVAL = 5.0
+
+# Samples kept in memory (10 minutes at the default interval)
+HISTORY_SAMPLES = 300
+
+# Round-robin history: (seconds per row, rows) - 2 s for 10 min, 1 min for 24 h, 15 min for 30 days
+HISTORY_RESOLUTIONS = ((2, 300), (60, 1440), (900, 2880))
+
+# History series and how they are taken from a sample
+HISTORY_METRICS = {
+    'cpu.usage': lambda s: s['cpu']['usage'],
+    'cpu.load_1m': lambda s: s['cpu']['load_1m'],
+    'memory.used': lambda s: s['memory']['used'],
+    'memory.available': lambda s: s['memory']['available'],
+    'network.rx_rate': lambda s: sum(i.get('rx_rate', 0) for i in s['network'].values()),
+    'network.tx_rate': lambda s: sum(i.get('tx_rate', 0) for i in s['network'].values()),
+    'temperature': lambda s: max((t for t in s['temperature'].values() if not isinstance(t, str)), default=None),
+    'processes.total': lambda s: s['processes']['total'],
+}
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Threads serving connections. Requests are answered from cached sections,
+# so more threads would not add throughput on the BBB's single core; the pool
+# covers idle keep-alive connections and the odd slow client.
+WORKERS = 6
+
+# Seconds an idle keep-alive connection keeps its worker
+KEEPALIVE_TIMEOUT = 5
+
+# Slow actions (RTC tests, sync, alarm) waiting or running, and finished ones kept for /api/jobs
+MAX_PENDING_JOBS = 4
+JOBS_KEPT = 16
+
+# Concurrent /api/stream clients
+MAX_STREAM_CLIENTS = 32
+
+# Bytes queued for a stream client before it is dropped as too slow
+STREAM_BUFFER_LIMIT = 256 * 1024
+
+# Initial size of the ProcReader buffer, doubled when a file does not fit
+READ_BUFFER_SIZE = 8192
+
+# Files ProcReader keeps open at most, the rest is opened for every read
+MAX_OPEN_FILES = 512
+
+# Processes whose PSS is read every sample (top by CPU and top by RSS), and default /api/processes size
+PROCESS_TOP = 10
+
+# Seconds before the PSS of a top process is read again
+PSS_INTERVAL = 10
+
+# Bytes of a process command line kept for /api/processes
+COMMAND_LENGTH = 256
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+# Byte-level parsers of the files the sampler reads
+STAT_CPU_RE = re.compile(rb'cpu +(\d+) (\d+) (\d+) (\d+) (\d+) (\d+) (\d+)')
+LOADAVG_RE = re.compile(rb'([\d.]+) ([\d.]+) ([\d.]+)')
+MEMINFO_RE = re.compile(rb'^(MemTotal|MemFree|MemAvailable): +(\d+)', re.M)
+# iface: rx bytes packets errs drop fifo frame compressed multicast, tx bytes packets errs ...
+NET_DEV_RE = re.compile(rb'^ *([^:\s]+): *(\d+) +(\d+) +(\d+)(?: +\d+){5} +(\d+) +(\d+) +(\d+)', re.M)
+UPTIME_RE = re.compile(rb'[\d.]+')
+# /proc/<pid>/stat: comm (may contain parentheses), state, utime, stime, starttime, rss
+PID_STAT_RE = re.compile(rb'\((.*)\) (\S) (?:\S+ ){10}(\d+) (\d+) (?:\S+ ){6}(\d+) \S+ (-?\d+)', re.S)
+SMAPS_PSS_RE = re.compile(rb'^Pss: +(\d+) kB', re.M)
+INTEGER_RE = re.compile(rb'-?\d+')
+
+# strongSwan's VICI socket
+VICI_SOCKET = '/var/run/charon.vici'
+
+# Seconds to wait for a VICI response
+VICI_TIMEOUT = 5
+
+# VICI packet types
+(VICI_CMD_REQUEST, VICI_CMD_RESPONSE, VICI_CMD_UNKNOWN, VICI_EVENT_REGISTER,
+ VICI_EVENT_UNREGISTER, VICI_EVENT_CONFIRM, VICI_EVENT_UNKNOWN, VICI_EVENT) = range(8)
+
+# VICI message element types
+(VICI_SECTION_START, VICI_SECTION_END, VICI_KEY_VALUE,
+ VICI_LIST_START, VICI_LIST_ITEM, VICI_LIST_END) = range(1, 7)
+
+# RTC the dashboard reports and its sysfs directory
+RTC_DEVICE = '/dev/rtc0'
+RTC_SYSFS = '/sys/class/rtc/rtc0'
+
+# RTC_RD_TIME = _IOR('p', 0x09, struct rtc_time): nine ints, tm_sec first
+RTC_RD_TIME = 0x80247009
+RTC_TIME_FORMAT = '9i'
+
+# Seconds between two checks of PM firmware that was not ready yet
+PM_FIRMWARE_RECHECK = 60
+
+# Prefix of the /metrics metric names
+METRICS_PREFIX = 'sysmon_'
+
+# merge_patch() result for identical values
+UNCHANGED = object()
+
+
+def parse_duration(text):
+    """Seconds of a duration such as 90, 90s, 10m, 24h or 30d"""
+    text = text.strip().lower()
+    if text and text[-1] in DURATION_UNITS:
+        return float(text[:-1]) * DURATION_UNITS[text[-1]]
+    return float(text)
+
+
+def merge_patch(old, new):
+    """
+    JSON merge patch (RFC 7396) turning old into new, or UNCHANGED.
+    
+    Objects are diffed key by key, keys missing from new are removed with
+    None (null); any other value is replaced as a whole.
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return UNCHANGED if old == new else new
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        change = merge_patch(old[key], value)
+        if change is not UNCHANGED:
+            patch[key] = change
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch if patch else UNCHANGED
+
+
+class ViciError(Exception):
+    """VICI protocol error, unexpected answer or lost connection"""
+
+
+def vici_encode(message):
+    """Encode a dict of str/int values, lists and dicts as a VICI message"""
+    out = bytearray()
+    
+    def name(key):
+        key = key.encode()
+        out.append(len(key))
+        out.extend(key)
+    
+    def value(item):
+        item = item if isinstance(item, bytes) else str(item).encode()
+        out.extend(struct.pack('>H', len(item)))
+        out.extend(item)
+    
+    def section(entries):
+        for key, item in entries.items():
+            if isinstance(item, dict):
+                out.append(VICI_SECTION_START)
+                name(key)
+                section(item)
+                out.append(VICI_SECTION_END)
+            elif isinstance(item, list):
+                out.append(VICI_LIST_START)
+                name(key)
+                for element in item:
+                    out.append(VICI_LIST_ITEM)
+                    value(element)
+                out.append(VICI_LIST_END)
+            else:
+                out.append(VICI_KEY_VALUE)
+                name(key)
+                value(item)
+    
+    section(message)
+    return bytes(out)
+
+
+def vici_decode(data):
+    """Decode a VICI message into a dict of str values, lists and dicts"""
+    root = {}
+    sections = [root]
+    items = None
+    pos = 0
+    try:
+        while pos < len(data):
+            kind = data[pos]
+            pos += 1
+            if kind in (VICI_SECTION_START, VICI_KEY_VALUE, VICI_LIST_START):
+                length = data[pos]
+                key = data[pos + 1:pos + 1 + length].decode(errors='replace')
+                pos += 1 + length
+            if kind in (VICI_KEY_VALUE, VICI_LIST_ITEM):
+                (length,) = struct.unpack_from('>H', data, pos)
+                value = data[pos + 2:pos + 2 + length].decode(errors='replace')
+                pos += 2 + length
+            
+            if kind == VICI_SECTION_START:
+                sections[-1][key] = {}
+                sections.append(sections[-1][key])
+            elif kind == VICI_SECTION_END:
+                sections.pop()
+            elif kind == VICI_KEY_VALUE:
+                sections[-1][key] = value
+            elif kind == VICI_LIST_START:
+                items = sections[-1][key] = []
+            elif kind == VICI_LIST_ITEM:
+                items.append(value)
+            elif kind == VICI_LIST_END:
+                items = None
+            else:
+                raise ViciError(f"Unknown VICI element type {kind}")
+    except (IndexError, struct.error, AttributeError):
+        raise ViciError("Malformed VICI message")
+    return root
+
+
+def vici_packet(kind, name=None, message=b''):
+    """Length-prefixed VICI packet"""
+    payload = bytes([kind])
+    if name is not None:
+        payload += bytes([len(name)]) + name.encode()
+    payload += message
+    return struct.pack('>I', len(payload)) + payload
+
+
+def vici_read_packet(sock):
+    """
+    Next packet on a VICI socket: (type, event or command name or None, message bytes).
+    
+    Raises:
+        ConnectionError: the peer closed the connection
+    """
+    def receive(size):
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("VICI connection closed")
+            data += chunk
+        return data
+    
+    (length,) = struct.unpack('>I', receive(4))
+    payload = receive(length)
+    kind = payload[0]
+    if kind in (VICI_CMD_REQUEST, VICI_EVENT_REGISTER, VICI_EVENT_UNREGISTER, VICI_EVENT):
+        end = 2 + payload[1]
+        return kind, payload[2:end].decode(), payload[end:]
+    return kind, None, payload[1:]
+
+
+class RingBuffer:
+    """Fixed-size buffer keeping the most recent items"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.items = [None] * capacity
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def append(self, item):
+        with self.lock:
+            self.items[self.count % self.capacity] = item
+            self.count += 1
+    
+    def latest(self):
+        with self.lock:
+            return self.items[(self.count - 1) % self.capacity] if self.count else None
+    
+    def values(self):
+        """Items, oldest first"""
+        with self.lock:
+            if self.count <= self.capacity:
+                return self.items[:self.count]
+            start = self.count % self.capacity
+            return self.items[start:] + self.items[:start]
+    
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+
+class RoundRobinArchive:
+    """
+    One resolution of the metric history: a fixed number of rows of `step`
+    seconds, each holding min/avg/max of the samples that fell into it.
+    
+    Columns are float32 arrays (counts uint16), so the memory is allocated
+    once and stays constant. A row is recycled when time reaches it again.
+    """
+    
+    def __init__(self, step, rows, metrics):
+        self.step = step
+        self.rows = rows
+        self.starts = array('d', [0.0]) * rows
+        self.columns = {}
+        for metric in metrics:
+            self.columns[metric] = (array('f', [0.0]) * rows, array('f', [0.0]) * rows,
+                                    array('f', [0.0]) * rows, array('H', [0]) * rows)
+    
+    def update(self, timestamp, values):
+        start = timestamp - timestamp % self.step
+        row = int(timestamp // self.step) % self.rows
+        if self.starts[row] != start:
+            self.starts[row] = start
+            for minimum, average, maximum, count in self.columns.values():
+                count[row] = 0
+        for metric, value in values.items():
+            if value is None:
+                continue
+            minimum, average, maximum, count = self.columns[metric]
+            n = count[row]
+            if n == 0:
+                minimum[row] = average[row] = maximum[row] = value
+            else:
+                minimum[row] = min(minimum[row], value)
+                maximum[row] = max(maximum[row], value)
+                average[row] += (value - average[row]) / (n + 1)
+            count[row] = min(n + 1, 65535)
+    
+    def rows_between(self, metric, begin, end):
+        """(start, min, avg, max, count) of the filled rows in [begin, end), oldest first"""
+        minimum, average, maximum, count = self.columns[metric]
+        first = int(begin // self.step)
+        last = int(end // self.step)
+        result = []
+        for slot in range(max(first, last - self.rows + 1), last + 1):
+            row = slot % self.rows
+            if self.starts[row] == slot * self.step and count[row]:
+                result.append((self.starts[row], minimum[row], average[row], maximum[row], count[row]))
+        return result
+
+
+class MetricHistory:
+    """
+    Multi-resolution round-robin store of the HISTORY_METRICS series
+    (about 0.5 MB for the default resolutions).
+    
+    Queries pick the finest archive that covers the requested range and
+    downsample it to the requested step with min/avg/max aggregates.
+    """
+    
+    def __init__(self, resolutions=HISTORY_RESOLUTIONS, metrics=HISTORY_METRICS):
+        self.metrics = metrics
+        self.archives = [RoundRobinArchive(step, rows, metrics) for step, rows in resolutions]
+        self.lock = threading.Lock()
+    
+    def update(self, sample):
+        values = {}
+        for metric, extract in self.metrics.items():
+            try:
+                values[metric] = extract(sample)
+            except (KeyError, TypeError, ValueError):
+                values[metric] = None
+        with self.lock:
+            for archive in self.archives:
+                archive.update(sample['timestamp'], values)
+    
+    def query(self, metric, range_seconds, step=None, now=None):
+        """
+        Columns of one series over the last range_seconds.
+        
+        Returns:
+            dict: step, start, end and the timestamps/min/avg/max columns
+                  (None where no sample was taken)
+        """
+        now = time.time() if now is None else now
+        covering = [a for a in self.archives if a.step * a.rows >= range_seconds]
+        archive = covering[0] if covering else self.archives[-1]
+        for candidate in covering:
+            if step and candidate.step <= step:
+                archive = candidate
+        bucket = max(archive.step, step or 0)
+        bucket = archive.step * max(1, round(bucket / archive.step))
+        begin = now - range_seconds
+        
+        with self.lock:
+            rows = archive.rows_between(metric, begin, now)
+        
+        first = int(begin // bucket)
+        slots = int(now // bucket) - first + 1
+        result = {'metric': metric, 'step': bucket, 'start': first * bucket, 'end': now,
+                  'timestamps': [(first + i) * bucket for i in range(slots)],
+                  'min': [None] * slots, 'avg': [None] * slots, 'max': [None] * slots}
+        weights = [0] * slots
+        for start, minimum, average, maximum, count in rows:
+            i = int(start // bucket) - first
+            if i < 0 or i >= slots:
+                continue
+            if weights[i] == 0:
+                result['min'][i], result['avg'][i], result['max'][i] = minimum, average, maximum
+            else:
+                result['min'][i] = min(result['min'][i], minimum)
+                result['max'][i] = max(result['max'][i], maximum)
+                result['avg'][i] = (result['avg'][i] * weights[i] + average * count) / (weights[i] + count)
+            weights[i] += count
+        for column in ('min', 'avg', 'max'):
+            result[column] = [None if v is None else round(v, 3) for v in result[column]]
+        return result
+
+
+class ProcReader:
+    """
+    /proc and sysfs files kept open and re-read with pread.
+    
+    On a Cortex-A8, opening a file and creating a Python file object cost
+    more than reading it. Files are opened once and re-read from offset 0
+    (procfs and sysfs regenerate the contents on every read from the start)
+    into a buffer shared by all reads. For use by a single thread.
+    """
+    
+    def __init__(self, size=READ_BUFFER_SIZE, max_open=MAX_OPEN_FILES):
+        self.max_open = max_open
+        self._fds = {}
+        self._buffer = bytearray(size)
+    
+    def read(self, path):
+        """
+        Current contents of a file, as a memoryview valid until the next read.
+        
+        Raises:
+            OSError: the file cannot be opened or read
+        """
+        fd = self._fds.get(path)
+        keep = fd is not None or len(self._fds) < self.max_open
+        if fd is None:
+            fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+            if keep:
+                self._fds[path] = fd
+        try:
+            while True:
+                length = os.preadv(fd, [self._buffer], 0)
+                if length < len(self._buffer):
+                    return memoryview(self._buffer)[:length]
+                self._buffer = bytearray(len(self._buffer) * 2)
+        except OSError:
+            # Gone (e.g. an unplugged sensor or an exited process), reopened on the next read
+            self.close(path)
+            raise
+        finally:
+            if not keep:
+                os.close(fd)
+    
+    def close(self, path):
+        fd = self._fds.pop(path, None)
+        if fd is not None:
+            os.close(fd)
+
+
+class ProcessTable:
+    """
+    Per-process CPU and memory, kept between samples.
+    
+    A new PID is looked up once (command line, start time); after that a
+    sample costs one pread of its /proc/<pid>/stat through the ProcReader.
+    CPU% comes from the utime+stime delta since the previous sample and RSS
+    from stat. PSS comes from smaps_rollup, which makes the kernel walk the
+    page tables, so it is only refreshed for the current top processes, at
+    most every PSS_INTERVAL seconds.
+    """
+    
+    def __init__(self, reader, top=PROCESS_TOP):
+        self.reader = reader
+        self.top = top
+        self.processes = {}
+        # Copies of the process entries as of the last update, for the request handlers
+        self.snapshot = []
+        self._last_time = None
+    
+    def update(self):
+        """Re-read every live process; returns the process counts by state"""
+        now = time.monotonic()
+        elapsed = now - self._last_time if self._last_time else 0
+        self._last_time = now
+        
+        counts = {'total': 0, 'running': 0, 'sleeping': 0, 'zombie': 0}
+        live = {}
+        for name in os.listdir('/proc'):
+            if not name.isdigit():
+                continue
+            pid = int(name)
+            try:
+                match = PID_STAT_RE.search(self.reader.read(f'/proc/{pid}/stat'))
+            except OSError:
+                continue  # exited since the listing
+            if not match:
+                continue
+            comm, state, utime, stime, start, rss = match.groups()
+            ticks = int(utime) + int(stime)
+            start = int(start)
+            
+            process = self.processes.get(pid)
+            if process is None or process['start'] != start:
+                # New process (or a recycled PID)
+                process = {'pid': pid, 'name': comm.decode(errors='replace'), 'command': self.read_command(pid),
+                           'start': start, 'ticks': ticks, 'cpu': 0.0, 'pss': None, 'pss_time': None}
+            elif elapsed > 0:
+                process['cpu'] = round(100.0 * (ticks - process['ticks']) / CLOCK_TICKS / elapsed, 1)
+                process['ticks'] = ticks
+            process['state'] = state.decode()
+            process['rss'] = int(rss) * PAGE_SIZE
+            live[pid] = process
+            
+            counts['total'] += 1
+            if state == b'R':
+                counts['running'] += 1
+            elif state == b'S':
+                counts['sleeping'] += 1
+            elif state == b'Z':
+                counts['zombie'] += 1
+        
+        for pid in self.processes.keys() - live.keys():
+            self.reader.close(f'/proc/{pid}/stat')
+            self.reader.close(f'/proc/{pid}/smaps_rollup')
+        self.processes = live
+        
+        # PSS of the processes /api/processes is most likely to show
+        by_cpu = sorted(live.values(), key=lambda p: p['cpu'], reverse=True)[:self.top]
+        by_rss = sorted(live.values(), key=lambda p: p['rss'], reverse=True)[:self.top]
+        for process in by_cpu + by_rss:
+            if process['rss'] and (process['pss_time'] is None or now - process['pss_time'] >= PSS_INTERVAL):
+                process['pss'] = self.read_pss(process['pid'])
+                process['pss_time'] = now
+        
+        self.snapshot = [{key: value for key, value in process.items() if key not in ('start', 'ticks', 'pss_time')}
+                         for process in live.values()]
+        return counts
+    
+    def read_command(self, pid):
+        """Command line of a process (empty for kernel threads)"""
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                return f.read(COMMAND_LENGTH).replace(b'\0', b' ').strip().decode(errors='replace')
+        except OSError:
+            return ''
+    
+    def read_pss(self, pid):
+        """Proportional set size in bytes, None if unreadable"""
+        try:
+            match = SMAPS_PSS_RE.search(self.reader.read(f'/proc/{pid}/smaps_rollup'))
+            return int(match.group(1)) * 1024 if match else None
+        except OSError:
+            return None
+    
+    def top_processes(self, sort='cpu', limit=PROCESS_TOP):
+        """
+        Top processes of the last update.
+        
+        Args:
+            sort: 'cpu', 'memory' (RSS) or 'pss'
+        """
+        keys = {
+            'cpu': lambda p: p['cpu'],
+            'memory': lambda p: p['rss'],
+            'pss': lambda p: p['pss'] or 0
+        }
+        return sorted(self.snapshot, key=keys[sort], reverse=True)[:limit]
+
+
+class ViciSession:
+    """
+    One persistent connection to charon's VICI socket.
+    
+    A reader thread receives every packet: command responses go to the
+    request() waiting for them, events to their handler, or to the request
+    streaming them (list-sas streams list-sa events). Event handlers run on
+    the reader thread and must not call request().
+    """
+    
+    def __init__(self, path=VICI_SOCKET, timeout=VICI_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        # Event name -> callable(message), registered on every connect()
+        self.handlers = {}
+        self._sock = None
+        self._responses = None
+        self._lock = threading.Lock()
+        self._stream_name = None
+        self._stream = None
+    
+    @property
+    def connected(self):
+        return self._sock is not None
+    
+    def connect(self):
+        """
+        Connect and register the event handlers.
+        
+        Raises:
+            OSError: charon is not running
+            ViciError: an event is unknown to charon
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        with self._lock:
+            self._sock = sock
+            self._responses = queue.Queue()
+            threading.Thread(target=self._read, args=(sock, self._responses), name='vici', daemon=True).start()
+            for event in self.handlers:
+                self._exchange(VICI_EVENT_REGISTER, event, expected=VICI_EVENT_CONFIRM)
+    
+    def close(self):
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+    
+    def request(self, command, message=None, stream=None):
+        """
+        Run a command.
+        
+        Args:
+            stream: Event the command streams its results as (e.g. list-sa)
+        
+        Returns:
+            (response, streamed event messages)
+        
+        Raises:
+            ViciError: not connected, unknown command, timeout or lost connection
+        """
+        with self._lock:
+            if self._sock is None:
+                raise ViciError("Not connected to charon")
+            streamed = []
+            if stream:
+                self._exchange(VICI_EVENT_REGISTER, stream, expected=VICI_EVENT_CONFIRM)
+                self._stream_name, self._stream = stream, streamed
+            try:
+                response = self._exchange(VICI_CMD_REQUEST, command, vici_encode(message or {}),
+                                          expected=VICI_CMD_RESPONSE)
+            finally:
+                self._stream_name = self._stream = None
+            if stream:
+                self._exchange(VICI_EVENT_UNREGISTER, stream, expected=VICI_EVENT_CONFIRM)
+            return vici_decode(response), streamed
+    
+    def _exchange(self, kind, name, message=b'', expected=None):
+        """Send a packet and wait for the answer (with the lock held)"""
+        try:
+            self._sock.sendall(vici_packet(kind, name, message))
+            answer = self._responses.get(timeout=self.timeout)
+        except (OSError, queue.Empty):
+            answer = None
+        if answer is None:
+            # Later answers could not be told apart from this one's, start over
+            self.close()
+            raise ViciError(f"No answer from charon to {name}")
+        answer_kind, data = answer
+        if answer_kind != expected:
+            raise ViciError(f"charon does not know {name}")
+        return data
+    
+    def _read(self, sock, responses):
+        try:
+            while True:
+                kind, name, data = vici_read_packet(sock)
+                if kind != VICI_EVENT:
+                    responses.put((kind, data))
+                elif name == self._stream_name:
+                    self._stream.append(vici_decode(data))
+                elif name in self.handlers:
+                    try:
+                        self.handlers[name](vici_decode(data))
+                    except Exception as e:
+                        print(f"VICI {name} handler failed: {e}")
+        except (OSError, ViciError, struct.error, IndexError):
+            pass
+        # Wake up a waiting request
+        responses.put(None)
+        if self._sock is sock:
+            self.close()
+
+
+class IPsecMonitor:
+    """
+    IPsec tunnels from charon over VICI.
+    
+    Every status refresh runs list-sas on a persistent connection, which
+    brings the byte and packet counters up to date without forking swanctl;
+    ike-updown and child-updown events update the cached tunnels as they
+    happen and are passed on to on_change. If charon restarts, the next
+    refresh reconnects. Tunnels keep the shape of the former swanctl
+    --list-sas parser.
+    """
+    
+    def __init__(self, path=VICI_SOCKET, on_change=None):
+        self.session = ViciSession(path)
+        self.session.handlers = {'ike-updown': self._ike_updown, 'child-updown': self._child_updown}
+        self.on_change = on_change
+        self.tunnels = {}
+        self.error = None
+        self._lock = threading.Lock()
+    
+    def status(self):
+        """Refresh the tunnels from charon and return the cached status"""
+        try:
+            if not self.session.connected:
+                self.session.connect()
+            _, sas = self.session.request('list-sas', {'noblock': 'yes'}, stream='list-sa')
+            tunnels = {name: self.tunnel(name, sa) for message in sas for name, sa in message.items()}
+            error = None
+        except OSError as e:
+            self.session.close()
+            tunnels = {}
+            error = f"charon not reachable on {self.session.path}: {e.strerror or e}"
+        except ViciError as e:
+            self.session.close()
+            tunnels = {}
+            error = str(e)
+        with self._lock:
+            self.tunnels = tunnels
+            self.error = error
+        return self.snapshot()
+    
+    def snapshot(self):
+        """Cached status, without asking charon"""
+        with self._lock:
+            result = {
+                'available': self.error is None,
+                'tunnels': list(self.tunnels.values())
+            }
+            if self.error:
+                result['error'] = self.error
+        return result
+    
+    def _ike_updown(self, message):
+        """An IKE SA came up (up=yes) or is going down"""
+        up = message.get('up') == 'yes'
+        with self._lock:
+            for name, sa in message.items():
+                if not isinstance(sa, dict):
+                    continue
+                if up:
+                    self.tunnels[name] = self.tunnel(name, sa)
+                else:
+                    self.tunnels.pop(name, None)
+        self._changed()
+    
+    def _child_updown(self, message):
+        """A CHILD_SA came up (up=yes) or is going down; the message lists that one only"""
+        up = message.get('up') == 'yes'
+        with self._lock:
+            for name, sa in message.items():
+                if not isinstance(sa, dict):
+                    continue
+                tunnel = self.tunnel(name, sa)
+                changed = {child['unique_id'] for child in tunnel['child_sas']}
+                previous = self.tunnels.get(name, {}).get('child_sas', [])
+                tunnel['child_sas'] = ([child for child in previous if child['unique_id'] not in changed] +
+                                       (tunnel['child_sas'] if up else []))
+                self.tunnels[name] = tunnel
+        self._changed()
+    
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+    
+    @staticmethod
+    def tunnel(name, sa):
+        """Tunnel entry of a VICI IKE SA section"""
+        encryption = sa.get('encr-alg', '')
+        if encryption and 'encr-keysize' in sa:
+            encryption += f"_{sa['encr-keysize']}"
+        proposal = [encryption, sa.get('integ-alg'), sa.get('prf-alg'), sa.get('dh-group')]
+        return {
+            'name': name,
+            'unique_id': sa.get('uniqueid', ''),
+            'state': sa.get('state', ''),
+            'ikev': sa.get('version', ''),
+            'local_id': sa.get('local-id', ''),
+            'local_host': sa.get('local-host', ''),
+            'local_port': sa.get('local-port', ''),
+            'remote_id': sa.get('remote-id', ''),
+            'remote_host': sa.get('remote-host', ''),
+            'remote_port': sa.get('remote-port', ''),
+            'encryption': '/'.join(part for part in proposal if part),
+            'established': f"{sa['established']}s ago" if 'established' in sa else '',
+            'child_sas': [{
+                'name': child.get('name', key),
+                'unique_id': child.get('uniqueid', ''),
+                'reqid': child.get('reqid', ''),
+                'state': child.get('state', ''),
+                'mode': child.get('mode', ''),
+                'bytes_in': int(child.get('bytes-in', 0)),
+                'packets_in': int(child.get('packets-in', 0)),
+                'bytes_out': int(child.get('bytes-out', 0)),
+                'packets_out': int(child.get('packets-out', 0))
+            } for key, child in sa.get('child-sas', {}).items()]
+        }
+
+
+class ViciStandIn:
+    """
+    Local stand-in for charon's VICI socket, to run and test the monitor
+    without strongSwan.
+    
+    Serves one established tunnel whose counters grow with time, answers
+    list-sas and version, and sends ike-updown/child-updown events to the
+    clients registered for them (see updown()).
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.started = time.time()
+        self.up = True
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._server = None
+    
+    def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen(4)
+        threading.Thread(target=self._accept, name='vici-stand-in', daemon=True).start()
+    
+    def stop(self):
+        self._server.close()
+        with self._lock:
+            for conn in self._clients:
+                conn.close()
+        os.unlink(self.path)
+    
+    def sas(self):
+        """The stand-in IKE SA, as list-sa and the updown events carry it"""
+        elapsed = int(time.time() - self.started)
+        return {'bbb-ipsec': {
+            'uniqueid': '1', 'version': '2', 'state': 'ESTABLISHED' if self.up else 'DELETING',
+            'local-host': '192.168.1.200', 'local-port': '4500', 'local-id': 'bbb.local',
+            'remote-host': '192.168.1.100', 'remote-port': '4500', 'remote-id': 'gateway.local',
+            'encr-alg': 'AES_CBC', 'encr-keysize': '128', 'integ-alg': 'HMAC_SHA2_256_128',
+            'prf-alg': 'PRF_HMAC_SHA2_256', 'dh-group': 'MODP_2048', 'established': str(elapsed),
+            'child-sas': {'net-1': {
+                'name': 'net', 'uniqueid': '1', 'reqid': '1', 'state': 'INSTALLED', 'mode': 'TUNNEL',
+                'protocol': 'ESP', 'bytes-in': str(elapsed * 1200), 'packets-in': str(elapsed * 10),
+                'bytes-out': str(elapsed * 800), 'packets-out': str(elapsed * 8)
+            }}
+        }}
+    
+    def updown(self, up, event='ike-updown'):
+        """Bring the stand-in tunnel up or down and tell the registered clients"""
+        self.up = up
+        message = self.sas()
+        if up:
+            message['up'] = 'yes'
+        with self._lock:
+            clients = [conn for conn, events in self._clients.items() if event in events]
+        for conn in clients:
+            self._send(conn, vici_packet(VICI_EVENT, event, vici_encode(message)))
+    
+    def _send(self, conn, packet):
+        with self._lock:
+            try:
+                conn.sendall(packet)
+            except OSError:
+                pass
+    
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._clients[conn] = set()
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+    
+    def _serve(self, conn):
+        events = self._clients[conn]
+        try:
+            while True:
+                kind, name, _ = vici_read_packet(conn)
+                if kind == VICI_EVENT_REGISTER:
+                    events.add(name)
+                    self._send(conn, vici_packet(VICI_EVENT_CONFIRM))
+                elif kind == VICI_EVENT_UNREGISTER:
+                    events.discard(name)
+                    self._send(conn, vici_packet(VICI_EVENT_CONFIRM))
+                elif kind == VICI_CMD_REQUEST and name == 'list-sas':
+                    if 'list-sa' in events and self.up:
+                        self._send(conn, vici_packet(VICI_EVENT, 'list-sa', vici_encode(self.sas())))
+                    self._send(conn, vici_packet(VICI_CMD_RESPONSE))
+                elif kind == VICI_CMD_REQUEST and name == 'version':
+                    self._send(conn, vici_packet(VICI_CMD_RESPONSE, message=vici_encode(
+                        {'daemon': 'charon', 'version': 'stand-in', 'sysname': 'Linux'})))
+                else:
+                    self._send(conn, vici_packet(VICI_CMD_UNKNOWN))
+        except (OSError, ViciError, struct.error, IndexError):
+            pass
+        with self._lock:
+            self._clients.pop(conn, None)
+        conn.close()
+
+
+class RTCMonitor:
+    """
+    RTC time, wake alarm and power management capabilities.
+    
+    The RTC time and wake alarm are read from sysfs (since_epoch, wakealarm)
+    through a ProcReader, a pread each, instead of running hwclock. /dev/rtc0
+    only admits one opener, so it is not held open: the RTC_RD_TIME ioctl
+    fallback for RTCs without since_epoch opens it per read and leaves it to
+    hwclock and the RTC scripts otherwise. Suspend states are read once; the
+    PM firmware is read until it reports ready, at most every
+    PM_FIRMWARE_RECHECK seconds.
+    """
+    
+    def __init__(self, device=RTC_DEVICE, sysfs=RTC_SYSFS):
+        self.device = device
+        self.sysfs = sysfs
+        self.reader = ProcReader(size=256)
+        self._suspend_support = None
+        self._pm_firmware = False
+        self._pm_checked = None
+        # Refreshed by the status thread, RTC jobs and handlers alike
+        self._lock = threading.Lock()
+    
+    def status(self):
+        """Get RTC status and power management capabilities"""
+        result = {
+            'available': False,
+            'device': self.device,
+            'system_time': '',
+            'rtc_time': '',
+            'rtc_epoch': None,
+            'alarm_set': False,
+            'alarm_time': '',
+            'suspend_support': {
+                'mem': False,
+                'freeze': False,
+                'standby': False
+            },
+            'pm_firmware': False
+        }
+        
+        try:
+            with self._lock:
+                result['suspend_support'] = dict(self.suspend_support())
+                result['pm_firmware'] = self.pm_firmware()
+                
+                # Check if RTC device exists
+                if not os.path.exists(self.device):
+                    return result
+                
+                result['available'] = True
+                result['system_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                
+                epoch = self.rtc_epoch()
+                if epoch is not None:
+                    # The RTC keeps UTC; shown in local time like system_time
+                    result['rtc_epoch'] = epoch
+                    result['rtc_time'] = datetime.fromtimestamp(epoch).strftime('%Y-%m-%d %H:%M:%S')
+                
+                try:
+                    alarm = bytes(self.reader.read(f'{self.sysfs}/wakealarm')).decode().strip()
+                    if alarm and alarm != '0':
+                        result['alarm_set'] = True
+                        result['alarm_time'] = alarm
+                except OSError:
+                    pass
+        
+        except Exception as e:
+            result['error'] = str(e)
+        
+        return result
+    
+    def rtc_epoch(self):
+        """RTC time in seconds since the epoch, None if it cannot be read"""
+        try:
+            return int(self.reader.read(f'{self.sysfs}/since_epoch'))
+        except (OSError, ValueError):
+            pass
+        try:
+            fd = os.open(self.device, os.O_RDONLY | os.O_CLOEXEC)
+            try:
+                tm = fcntl.ioctl(fd, RTC_RD_TIME, bytes(struct.calcsize(RTC_TIME_FORMAT)))
+            finally:
+                os.close(fd)
+            sec, minute, hour, mday, mon, year = struct.unpack(RTC_TIME_FORMAT, tm)[:6]
+            return calendar.timegm((year + 1900, mon + 1, mday, hour, minute, sec))
+        except (OSError, ValueError):
+            # Busy (hwclock or an RTC script holds it) or not an RTC
+            return None
+    
+    def suspend_support(self):
+        """Sleep states in /sys/power/state, read once"""
+        if self._suspend_support is None:
+            try:
+                with open('/sys/power/state', 'r') as f:
+                    states = f.read().split()
+            except OSError:
+                states = []
+            self._suspend_support = {state: state in states for state in ('mem', 'freeze', 'standby')}
+        return self._suspend_support
+    
+    def pm_firmware(self):
+        """Whether the PM co-processor firmware is ready; cached once it is"""
+        now = time.monotonic()
+        if not self._pm_firmware and (self._pm_checked is None or now - self._pm_checked >= PM_FIRMWARE_RECHECK):
+            self._pm_checked = now
+            try:
+                with open('/sys/kernel/debug/pm33xx/status', 'r') as f:
+                    self._pm_firmware = 'ready' in f.read().lower()
+            except OSError:
+                pass
+        return self._pm_firmware
+
+
+class MetricsSampler:
+    """
+    Background threads sampling the dashboard sections into a shared cache.
+    
+    The metrics section (CPU, memory, network, disk, temperature, process
+    counts) is sampled at a fixed interval into a ring buffer; counters (CPU
+    time, network bytes) are turned into usage and rates against the previous
+    sample. The LED, IPsec and RTC sections are refreshed by a second thread
+    at a slower interval, since they change rarely. Request handlers
+    only read the cached sections, so serving a client never touches /proc,
+    and listeners (see EventBroadcaster) are told about every new section.
+    """
+    
+    def __init__(self, interval=SAMPLE_INTERVAL, history=HISTORY_SAMPLES, status_interval=STATUS_INTERVAL,
+                 vici_socket=VICI_SOCKET):
+        self.interval = interval
+        self.status_interval = status_interval
+        self.samples = RingBuffer(history)
+        self.history = MetricHistory()
+        self.sections = {}
+        self.listeners = []
+        # Tunnel up/down events are published as they come
+        self.ipsec = IPsecMonitor(vici_socket, on_change=lambda: self.publish('ipsec', self.ipsec.snapshot()))
+        self.rtc = RTCMonitor()
+        self._status_sources = {
+            'leds': self.get_led_status,
+            'ipsec': self.ipsec.status,
+            'rtc': self.rtc.status
+        }
+        self.reader = ProcReader()
+        self.processes = ProcessTable(self.reader)
+        self._sensors = None
+        self._last_cpu = None
+        self._last_network = None
+        self._stop = threading.Event()
+        self._threads = []
+    
+    def start(self):
+        """Take a first sample of every section and start sampling in the background"""
+        self.sample()
+        for name in self._status_sources:
+            self.refresh(name)
+        for name, target, interval in (('sampler', self.sample, self.interval),
+                                       ('status', self.refresh_status, self.status_interval)):
+            thread = threading.Thread(target=self.run, args=(target, interval), name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def stop(self):
+        self._stop.set()
+    
+    def run(self, target, interval):
+        next_sample = time.monotonic()
+        while True:
+            # Keep the cadence independent of the sampling time
+            next_sample += interval
+            if self._stop.wait(max(next_sample - time.monotonic(), 0)):
+                break
+            try:
+                target()
+            except Exception as e:
+                print(f"Sampling failed: {e}")
+    
+    def publish(self, name, value):
+        """Cache a section and hand it to the listeners"""
+        self.sections[name] = value
+        for listener in self.listeners:
+            try:
+                listener(name, value)
+            except Exception as e:
+                print(f"Publishing {name} failed: {e}")
+    
+    def section(self, name):
+        """Latest value of a section"""
+        return self.sections.get(name)
+    
+    def sample(self):
+        """Take one sample and append it to the history"""
+        sample = {
+            'timestamp': time.time(),
+            'cpu': self.get_cpu_stats(),
+            'memory': self.get_memory_stats(),
+            'network': self.get_network_stats(),
+            'uptime': self.get_uptime_stats(),
+            'disk': self.get_disk_stats(),
+            'processes': self.get_process_stats(),
+            'temperature': self.get_temperature()
+        }
+        self.samples.append(sample)
+        self.history.update(sample)
+        self.publish('metrics', sample)
+        return sample
+    
+    def refresh(self, name):
+        """Re-read one status section (e.g. right after changing it)"""
+        value = self._status_sources[name]()
+        self.publish(name, value)
+        return value
+    
+    def refresh_status(self):
+        for name in self._status_sources:
+            self.refresh(name)
+    
+    def latest(self):
+        """Most recent sample"""
+        return self.samples.latest()
+    
+    def get_cpu_stats(self):
+        """Get CPU usage and load average"""
+        try:
+            load_1m, load_5m, load_15m = (float(value) for value in
+                                          LOADAVG_RE.match(self.reader.read('/proc/loadavg')).groups())
+            
+            # Calculate CPU usage from /proc/stat
+            cpu_stats = [int(value) for value in STAT_CPU_RE.match(self.reader.read('/proc/stat')).groups()]
+            
+            # Total CPU time = user + nice + system + idle + iowait + irq + softirq
+            total = sum(cpu_stats)
+            idle = cpu_stats[3]
+            
+            # Usage since the previous sample
+            if self._last_cpu is None:
+                self._last_cpu = (total, idle)
+                cpu_usage = 0.0
+            else:
+                last_total, last_idle = self._last_cpu
+                total_delta = total - last_total
+                idle_delta = idle - last_idle
+                
+                if total_delta > 0:
+                    cpu_usage = 100.0 * (1.0 - idle_delta / total_delta)
+                else:
+                    cpu_usage = 0.0
+                
+                self._last_cpu = (total, idle)
+            
+            return {
+                'usage': cpu_usage,
+                'load_1m': load_1m,
+                'load_5m': load_5m,
+                'load_15m': load_15m
+            }
+        except Exception as e:
+            return {'usage': 0, 'load_1m': 0, 'load_5m': 0, 'load_15m': 0}
+    
+    def get_memory_stats(self):
+        """Get memory usage statistics"""
+        try:
+            mem_info = {key: int(value) for key, value in MEMINFO_RE.findall(self.reader.read('/proc/meminfo'))}
+            
+            total = mem_info.get(b'MemTotal', 0)
+            available = mem_info.get(b'MemAvailable', mem_info.get(b'MemFree', 0))
+            used = total - available
+            
+            return {
+                'total': total,
+                'used': used,
+                'available': available,
+                'free': mem_info.get(b'MemFree', 0)
+            }
+        except Exception as e:
+            return {'total': 0, 'used': 0, 'available': 0, 'free': 0}
+    
+    def get_network_stats(self):
+        """Get network interface statistics with byte rates since the previous sample"""
+        stats = {}
+        now = time.monotonic()
+        try:
+            for match in NET_DEV_RE.finditer(self.reader.read('/proc/net/dev')):
+                iface = match.group(1).decode()
+                
+                # Skip loopback
+                if iface == 'lo':
+                    continue
+                
+                rx_bytes, rx_packets, rx_errors, tx_bytes, tx_packets, tx_errors = map(int, match.groups()[1:])
+                stats[iface] = {
+                    'rx_bytes': rx_bytes,
+                    'rx_packets': rx_packets,
+                    'rx_errors': rx_errors,
+                    'tx_bytes': tx_bytes,
+                    'tx_packets': tx_packets,
+                    'tx_errors': tx_errors,
+                    'errors': rx_errors + tx_errors
+                }
+        except Exception as e:
+            pass
+        
+        if self._last_network:
+            last_time, last_stats = self._last_network
+            elapsed = now - last_time
+            for iface, current in stats.items():
+                previous = last_stats.get(iface)
+                if previous and elapsed > 0:
+                    # Counters restart when an interface is re-created
+                    current['rx_rate'] = max(current['rx_bytes'] - previous['rx_bytes'], 0) / elapsed
+                    current['tx_rate'] = max(current['tx_bytes'] - previous['tx_bytes'], 0) / elapsed
+        self._last_network = (now, stats)
+        
+        return stats
+    
+    def get_uptime_stats(self):
+        """Get system uptime"""
+        try:
+            uptime_seconds = float(UPTIME_RE.match(self.reader.read('/proc/uptime')).group())
+            
+            boot_timestamp = time.time() - uptime_seconds
+            boot_time = datetime.fromtimestamp(boot_timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            
+            return {
+                'uptime': int(uptime_seconds),
+                'boot_time': boot_time
+            }
+        except Exception as e:
+            return {'uptime': 0, 'boot_time': 'Unknown'}
+    
+    def get_disk_stats(self):
+        """Get disk usage statistics"""
+        stats = {}
+        try:
+            with open('/proc/mounts', 'r') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 2:
+                        continue
+                    
+                    mount_point = parts[1]
+                    fs_type = parts[2]
+                    
+                    # Skip virtual filesystems
+                    if fs_type in ['proc', 'sysfs', 'devtmpfs', 'devpts', 'tmpfs', 
+                                   'cgroup', 'cgroup2', 'pstore', 'configfs', 'debugfs',
+                                   'tracefs', 'securityfs', 'bpf', 'fusectl', 'mqueue']:
+                        continue
+                    
+                    try:
+                        st = os.statvfs(mount_point)
+                        total = st.f_blocks * st.f_frsize
+                        free = st.f_bfree * st.f_frsize
+                        available = st.f_bavail * st.f_frsize
+                        used = total - free
+                        
+                        if total > 0:  # Only include if there's actual storage
+                            stats[mount_point] = {
+                                'total': total,
+                                'used': used,
+                                'free': free,
+                                'available': available,
+                                'percent': (used / total * 100) if total > 0 else 0,
+                                'filesystem': parts[0],
+                                'type': fs_type
+                            }
+                    except:
+                        pass
+        except:
+            pass
+        
+        return stats
+    
+    def get_process_stats(self):
+        """Get process statistics (and update the per-process table)"""
+        try:
+            return self.processes.update()
+        except:
+            return {'total': 0, 'running': 0, 'sleeping': 0, 'zombie': 0}
+    
+    def get_temperature(self):
+        """Get CPU/SoC temperature if available"""
+        if self._sensors is None:
+            self._sensors = self.find_temperature_sensors()
+        temps = {}
+        for label, path in self._sensors:
+            try:
+                temps[label] = int(INTEGER_RE.match(self.reader.read(path)).group()) / 1000.0  # Convert from millidegrees
+            except:
+                pass
+        
+        return temps if temps else {'status': 'not available'}
+    
+    def find_temperature_sensors(self):
+        """(label, path) of the thermal zone and hwmon temperature inputs"""
+        sensors = []
+        try:
+            # Try thermal zones
+            thermal_dir = '/sys/class/thermal'
+            if os.path.exists(thermal_dir):
+                for zone in os.listdir(thermal_dir):
+                    if zone.startswith('thermal_zone'):
+                        # Get zone type/name
+                        try:
+                            with open(f'{thermal_dir}/{zone}/type', 'r') as f:
+                                zone_type = f.read().strip()
+                        except:
+                            zone_type = zone
+                        
+                        sensors.append((zone_type, f'{thermal_dir}/{zone}/temp'))
+            
+            # Try hwmon
+            hwmon_dir = '/sys/class/hwmon'
+            if os.path.exists(hwmon_dir):
+                for hwmon in os.listdir(hwmon_dir):
+                    hwmon_path = os.path.join(hwmon_dir, hwmon)
+                    try:
+                        # Get hwmon name
+                        with open(f'{hwmon_path}/name', 'r') as f:
+                            hwmon_name = f.read().strip()
+                        
+                        # Look for temp inputs
+                        for temp_file in os.listdir(hwmon_path):
+                            if temp_file.startswith('temp') and temp_file.endswith('_input'):
+                                # Try to get label
+                                label_file = temp_file.replace('_input', '_label')
+                                try:
+                                    with open(f'{hwmon_path}/{label_file}', 'r') as f:
+                                        label = f.read().strip()
+                                except:
+                                    label = f'{hwmon_name}_{temp_file}'
+                                
+                                sensors.append((label, f'{hwmon_path}/{temp_file}'))
+                    except:
+                        pass
+        except:
+            pass
+        
+        return sensors
+    
+    def get_led_status(self):
+        """Get status of all LEDs"""
+        leds = {}
+        for i in range(4):
+            led_path = f"/sys/class/leds/beaglebone:green:usr{i}"
+            if os.path.exists(led_path):
+                leds[f'usr{i}'] = {
+                    'number': i,
+                    'brightness': self.get_led_brightness(i),
+                    'trigger': self.get_led_trigger(i),
+                    'available': True
+                }
+            else:
+                leds[f'usr{i}'] = {
+                    'number': i,
+                    'available': False
+                }
+        return leds
+    
+    def get_led_brightness(self, led_num):
+        """Get LED brightness (0 or 1)"""
+        try:
+            with open(f"/sys/class/leds/beaglebone:green:usr{led_num}/brightness", 'r') as f:
+                return int(f.read().strip())
+        except:
+            return 0
+    
+    def get_led_trigger(self, led_num):
+        """Get current LED trigger"""
+        try:
+            with open(f"/sys/class/leds/beaglebone:green:usr{led_num}/trigger", 'r') as f:
+                triggers = f.read().strip()
+                # Extract current trigger (marked with [])
+                import re
+                match = re.search(r'\[(\w+)\]', triggers)
+                return match.group(1) if match else 'unknown'
+        except:
+            return 'unknown'
+
+
+class SystemInfo:
+    """
+    Static system information for /api/system-info.
+    
+    Collected once at startup; files several getters look at (build-info,
+    /proc/cpuinfo, /proc/version) are read only once.
+    """
+    
+    def __init__(self):
+        self._files = {}
+        self.build_info = self.get_build_info()
+    
+    def read(self, path):
+        """Contents of a file, cached (raises OSError like open())"""
+        if path not in self._files:
+            with open(path, 'r') as f:
+                self._files[path] = f.read()
+        return self._files[path]
+    
+    def collect(self):
+        return {
+            'hostname': self.get_hostname(),
+            'kernel': self.get_kernel_version(),
+            'kernel_name': self.get_kernel_name(),
+            'kernel_build_time': self.get_kernel_build_time(),
+            'architecture': self.get_architecture(),
+            'cpu_model': self.get_cpu_model(),
+            'machine': self.get_machine_name(),
+            'build_time': self.get_build_time(),
+            'rootfs_build_time': self.get_rootfs_build_time(),
+            'os_release': self.get_os_release(),
+            'rootfs_image': self.get_rootfs_image()
+        }
+    
+    def get_hostname(self):
+        """Get system hostname"""
+        try:
+            with open('/etc/hostname', 'r') as f:
+                return f.read().strip()
+        except:
+            return 'unknown'
+    
+    def get_kernel_version(self):
+        """Get kernel version"""
+        try:
+            return self.read('/proc/version').split()[2]
+        except:
+            return 'unknown'
+    
+    def get_architecture(self):
+        """Get system architecture"""
+        try:
+            for line in self.read('/proc/cpuinfo').splitlines():
+                if 'model name' in line.lower() or 'processor' in line.lower():
+                    return line.split(':')[1].strip()
+            return 'ARM'
+        except:
+            return 'unknown'
+    
+    def get_cpu_model(self):
+        """Get CPU model name"""
+        try:
+            for line in self.read('/proc/cpuinfo').splitlines():
+                if 'model name' in line.lower():
+                    return line.split(':')[1].strip()
+                elif 'Hardware' in line:
+                    return line.split(':')[1].strip()
+            return 'ARM Processor'
+        except:
+            return 'unknown'
+    
+    def get_build_info(self):
+        """Read build information from /etc/build-info"""
+        info = {}
+        try:
+            if os.path.exists('/etc/build-info'):
+                for line in self.read('/etc/build-info').splitlines():
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        info[key] = value.strip()
+        except:
+            pass
+        return info
+    
+    def get_kernel_name(self):
+        """Get kernel recipe name from build-info or /proc/version"""
+        # Try to get from build-info first
+        build_info = self.build_info
+        if 'KERNEL_RECIPE' in build_info:
+            return build_info['KERNEL_RECIPE']
+        
+        # Fallback to /proc/version
+        try:
+            version_str = self.read('/proc/version')
+            # Extract kernel name (e.g., "Linux version 6.6.75-yocto-standard")
+            parts = version_str.split()
+            if len(parts) >= 3:
+                return parts[2]  # Returns something like "6.6.75-yocto-standard"
+            return 'unknown'
+        except:
+            return 'unknown'
+    
+    def get_machine_name(self):
+        """Get machine name from build-info or device tree"""
+        # Try to get from build-info first
+        build_info = self.build_info
+        if 'MACHINE' in build_info:
+            return build_info['MACHINE']
+        
+        # Fallback to device tree model
+        try:
+            # Try to get from device tree model
+            with open('/proc/device-tree/model', 'r') as f:
+                model = f.read().strip('\x00').strip()
+                if model:
+                    return model
+        except:
+            pass
+        
+        # Fallback to machine info from /etc/os-release or other sources
+        try:
+            if os.path.exists('/etc/machine-info'):
+                with open('/etc/machine-info', 'r') as f:
+                    for line in f:
+                        if 'MACHINE=' in line:
+                            return line.split('=')[1].strip().strip('"')
+        except:
+            pass
+        
+        return 'unknown'
+    
+    def get_kernel_build_time(self):
+        """Get kernel build timestamp from build-info"""
+        build_info = self.build_info
+        if 'KERNEL_BUILD_TIME' in build_info:
+            return build_info['KERNEL_BUILD_TIME']
+        
+        # Fallback to kernel version string
+        try:
+            version_str = self.read('/proc/version')
+            # Extract build time (usually after #1 and before compiler info)
+            import re
+            match = re.search(r'#\d+\s+[A-Z]+\s+(.+?)\s+\d{4}', version_str)
+            if match:
+                return match.group(0)
+            # Try simpler pattern
+            match = re.search(r'#\d+\s+(.+)', version_str)
+            if match:
+                build_info_str = match.group(1).split('(')[0].strip()
+                return build_info_str
+        except:
+            pass
+        
+        return 'unknown'
+    
+    def get_rootfs_build_time(self):
+        """Get rootfs build timestamp from build-info"""
+        build_info = self.build_info
+        if 'ROOTFS_BUILD_TIME' in build_info:
+            return build_info['ROOTFS_BUILD_TIME']
+        return 'unknown'
+    
+    def get_build_time(self):
+        """Get generic build timestamp (deprecated, use get_rootfs_build_time)"""
+        # For backwards compatibility
+        return self.get_rootfs_build_time()
+    
+    def get_rootfs_image(self):
+        """Get rootfs image name from build-info"""
+        build_info = self.build_info
+        if 'ROOTFS_IMAGE' in build_info:
+            return build_info['ROOTFS_IMAGE']
+        return 'unknown'
+    
+    def get_os_release(self):
+        """Get OS/Image information from /etc/os-release"""
+        try:
+            info = {}
+            if os.path.exists('/etc/os-release'):
+                with open('/etc/os-release', 'r') as f:
+                    for line in f:
+                        line = line.strip()
+                        if '=' in line:
+                            key, value = line.split('=', 1)
+                            info[key] = value.strip('"')
+            
+            # Return formatted string with key information
+            name = info.get('NAME', 'Linux')
+            version = info.get('VERSION', '')
+            pretty_name = info.get('PRETTY_NAME', '')
+            
+            if pretty_name:
+                return pretty_name
+            elif version:
+                return f"{name} {version}"
+            else:
+                return name
+        except:
+            return 'Linux'
+
+
+class StaticPayload:
+    """
+    A response body that does not change while the server runs.
+    
+    The gzip (and brotli, when the module is installed) encodings are
+    compressed once, and every encoding gets its own strong ETag so a
+    revalidation costs a 304 instead of the body.
+    """
+    
+    def __init__(self, body, content_type, cache='no-cache'):
+        self.content_type = content_type
+        self.cache = cache
+        digest = hashlib.sha1(body).hexdigest()[:20]
+        self.bodies = {'identity': body}
+        compressed = {'gzip': gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(body)
+        for encoding, data in compressed.items():
+            if len(data) < len(body):
+                self.bodies[encoding] = data
+        self.etags = {encoding: f'"{digest}"' if encoding == 'identity' else f'"{digest}-{encoding}"'
+                      for encoding in self.bodies}
+    
+    def negotiate(self, accept_encoding):
+        """Best encoding an Accept-Encoding header allows"""
+        accepted = set()
+        for item in (accept_encoding or '').split(','):
+            coding, _, params = item.partition(';')
+            try:
+                if params and float(params.strip().partition('=')[2]) == 0:
+                    continue
+            except ValueError:
+                pass
+            accepted.add(coding.strip().lower())
+        for encoding in ('br', 'gzip'):
+            if encoding in self.bodies and (encoding in accepted or '*' in accepted):
+                return encoding
+        return 'identity'
+    
+    def matches(self, if_none_match):
+        """Whether an If-None-Match header names one of the encodings"""
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return '*' in tags or not tags.isdisjoint(self.etags.values())
+
+
+class EventBroadcaster:
+    """
+    Server-sent events for the dashboards on /api/stream.
+    
+    A client first gets every section in full, then only merge patches of the
+    sections that changed. An update is diffed and encoded once and the same
+    bytes are queued for every client, so the work per update does not grow
+    with the number of open dashboards. Clients are non-blocking sockets
+    detached from their request: an update is sent as far as each socket
+    buffer takes it and a writer thread sends the rest, so a stalled browser
+    never holds up the publishing thread (sampler, VICI reader or handler).
+    A client whose queue outgrows buffer_limit is dropped.
+    """
+    
+    def __init__(self, max_clients=MAX_STREAM_CLIENTS, buffer_limit=STREAM_BUFFER_LIMIT):
+        self.max_clients = max_clients
+        self.buffer_limit = buffer_limit
+        self.state = {}
+        # Client socket -> bytes its socket buffer did not take yet
+        self.clients = {}
+        self._lock = threading.Lock()
+        # Wakes the writer thread when a client starts queueing
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._waker.setblocking(False)
+        threading.Thread(target=self.run, name='stream', daemon=True).start()
+    
+    def __len__(self):
+        return len(self.clients)
+    
+    def full(self):
+        return len(self.clients) >= self.max_clients
+    
+    @staticmethod
+    def encode(event, data):
+        return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+    
+    def add(self, sock):
+        """Start streaming to a client whose response headers were sent"""
+        sock.setblocking(False)
+        with self._lock:
+            snapshot = b''.join(self.encode(name, value) for name, value in self.state.items())
+            self.clients[sock] = bytearray()
+            self._queue(sock, b'retry: 5000\n\n' + snapshot)
+    
+    def update(self, name, value):
+        """Queue what changed in a section for every client (sampler listener)"""
+        with self._lock:
+            patch = merge_patch(self.state[name], value) if name in self.state else value
+            self.state[name] = value
+            if patch is UNCHANGED or not self.clients:
+                return
+            data = self.encode(name, patch)
+            for sock in list(self.clients):
+                self._queue(sock, data)
+    
+    def _queue(self, sock, data):
+        """Send data as far as the socket takes it without blocking, queue the rest (lock held)"""
+        pending = self.clients[sock]
+        if not pending:
+            try:
+                data = data[sock.send(data):]
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._drop(sock)
+                return
+            if not data:
+                return
+            self._wake()
+        if len(pending) + len(data) > self.buffer_limit:
+            # Too slow to keep up: it reconnects and starts over
+            self._drop(sock)
+            return
+        pending += data
+    
+    def _wake(self):
+        try:
+            self._waker.send(b'\0')
+        except BlockingIOError:
+            pass
+    
+    def run(self):
+        """Writer thread: send the queued bytes as the client sockets drain"""
+        while True:
+            with self._lock:
+                waiting = [sock for sock, pending in self.clients.items() if pending]
+            try:
+                readable, writable, _ = select.select([self._wakeup], waiting, [])
+            except (OSError, ValueError):
+                # A client was dropped meanwhile
+                continue
+            if readable:
+                try:
+                    while self._wakeup.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+            with self._lock:
+                for sock in writable:
+                    pending = self.clients.get(sock)
+                    if not pending:
+                        continue
+                    try:
+                        del pending[:sock.send(pending)]
+                    except BlockingIOError:
+                        pass
+                    except OSError:
+                        self._drop(sock)
+    
+    def _drop(self, sock):
+        self.clients.pop(sock, None)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+
+class OpenMetricsExporter:
+    """
+    Sampled sections in OpenMetrics text format for /metrics.
+    
+    Every published section is rendered once, on the sampler thread, into a
+    cached block; family headers and label strings are formatted the first
+    time an interface, mount, sensor or SA is seen. A scrape only returns the
+    joined blocks and never reads /proc.
+    """
+    
+    CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+    
+    # Block order in the exposition
+    SECTIONS = ('metrics', 'ipsec', 'rtc')
+    
+    def __init__(self, prefix=METRICS_PREFIX):
+        self.prefix = prefix
+        self.blocks = {}
+        self._headers = {}
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._body = b'# EOF\n'
+    
+    def body(self):
+        return self._body
+    
+    def update(self, name, value):
+        """Re-render a section (sampler listener)"""
+        if name not in self.SECTIONS:
+            return
+        out = []
+        getattr(self, f'render_{name}')(out, value)
+        with self._lock:
+            self.blocks[name] = ''.join(out)
+            self._body = (''.join(self.blocks.get(section, '') for section in self.SECTIONS) + '# EOF\n').encode()
+    
+    def labels(self, *pairs):
+        """Formatted label set of (name, value) pairs, cached"""
+        text = self._labels.get(pairs)
+        if text is None:
+            escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+            text = '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+            self._labels[pairs] = text
+        return text
+    
+    def family(self, out, name, kind, help_text, samples):
+        """
+        Append a metric family.
+        
+        Args:
+            kind: 'gauge' or 'counter' (samples get the _total suffix)
+            samples: (labels, value) pairs, labels as returned by labels() or ''
+        """
+        cached = self._headers.get(name)
+        if cached is None:
+            cached = self._headers[name] = (f"# TYPE {self.prefix}{name} {kind}\n"
+                                            f"# HELP {self.prefix}{name} {help_text}\n",
+                                            self.prefix + name + ('_total' if kind == 'counter' else ''))
+        header, sample_name = cached
+        out.append(header)
+        for labels, value in samples:
+            if value is not None:
+                out.append(f"{sample_name}{labels} {value}\n")
+    
+    def render_metrics(self, out, sample):
+        cpu = sample['cpu']
+        memory = sample['memory']
+        self.family(out, 'cpu_usage_percent', 'gauge', 'CPU usage over the last sample interval',
+                    [('', round(cpu['usage'], 2))])
+        self.family(out, 'load_average', 'gauge', 'Load average',
+                    [(self.labels(('period', '1m')), cpu['load_1m']),
+                     (self.labels(('period', '5m')), cpu['load_5m']),
+                     (self.labels(('period', '15m')), cpu['load_15m'])])
+        self.family(out, 'memory_bytes', 'gauge', 'Memory from /proc/meminfo',
+                    [(self.labels(('type', key)), memory[key] * 1024)
+                     for key in ('total', 'used', 'available', 'free')])
+        
+        network = sample['network']
+        for name, help_text, key in (('network_receive_bytes', 'Bytes received', 'rx_bytes'),
+                                     ('network_receive_packets', 'Packets received', 'rx_packets'),
+                                     ('network_receive_errors', 'Receive errors', 'rx_errors'),
+                                     ('network_transmit_bytes', 'Bytes sent', 'tx_bytes'),
+                                     ('network_transmit_packets', 'Packets sent', 'tx_packets'),
+                                     ('network_transmit_errors', 'Transmit errors', 'tx_errors')):
+            self.family(out, name, 'counter', help_text,
+                        [(self.labels(('interface', iface)), stats[key]) for iface, stats in network.items()])
+        
+        disk = sample['disk']
+        for name, help_text, key in (('filesystem_size_bytes', 'Filesystem size', 'total'),
+                                     ('filesystem_used_bytes', 'Filesystem space used', 'used'),
+                                     ('filesystem_avail_bytes', 'Filesystem space available to users', 'available')):
+            self.family(out, name, 'gauge', help_text,
+                        [(self.labels(('mountpoint', mount), ('device', stats['filesystem']), ('fstype', stats['type'])),
+                          stats[key]) for mount, stats in disk.items()])
+        
+        uptime = sample['uptime']['uptime']
+        self.family(out, 'uptime_seconds', 'gauge', 'Time since boot', [('', uptime)])
+        self.family(out, 'boot_time_seconds', 'gauge', 'Boot time, seconds since the epoch',
+                    [('', round(sample['timestamp'] - uptime))])
+        
+        temperature = sample['temperature']
+        self.family(out, 'temperature_celsius', 'gauge', 'Thermal zone and hwmon temperatures',
+                    [(self.labels(('sensor', sensor)), value) for sensor, value in temperature.items()
+                     if not isinstance(value, str)])
+        
+        processes = sample['processes']
+        self.family(out, 'processes', 'gauge', 'Processes', [('', processes['total'])])
+        self.family(out, 'processes_state', 'gauge', 'Processes by state',
+                    [(self.labels(('state', state)), processes[state]) for state in ('running', 'sleeping', 'zombie')])
+        self.family(out, 'sample_timestamp_seconds', 'gauge', 'Time of the sample, seconds since the epoch',
+                    [('', round(sample['timestamp'], 3))])
+    
+    def render_ipsec(self, out, status):
+        self.family(out, 'ipsec_available', 'gauge', 'Whether strongSwan answered', [('', int(status['available']))])
+        tunnels = status['tunnels']
+        self.family(out, 'ipsec_tunnel_up', 'gauge', 'Whether an IKE SA is established',
+                    [(self.labels(('tunnel', tunnel['name'])), int(tunnel['state'] == 'ESTABLISHED'))
+                     for tunnel in tunnels])
+        children = [(tunnel['name'], child) for tunnel in tunnels for child in tunnel['child_sas']]
+        for name, help_text, unit in (('ipsec_sa_bytes', 'Bytes through a CHILD_SA', 'bytes'),
+                                      ('ipsec_sa_packets', 'Packets through a CHILD_SA', 'packets')):
+            self.family(out, name, 'counter', help_text,
+                        [(self.labels(('tunnel', tunnel), ('child', child['name']), ('direction', direction)),
+                          child[f'{unit}_{direction}'])
+                         for tunnel, child in children for direction in ('in', 'out')])
+    
+    def render_rtc(self, out, status):
+        self.family(out, 'rtc_available', 'gauge', 'Whether /dev/rtc0 exists', [('', int(status['available']))])
+        self.family(out, 'rtc_alarm_set', 'gauge', 'Whether a wake alarm is armed', [('', int(status['alarm_set']))])
+        self.family(out, 'rtc_time_seconds', 'gauge', 'RTC time, seconds since the epoch',
+                    [('', status.get('rtc_epoch'))])
+        alarm = status['alarm_time']
+        self.family(out, 'rtc_alarm_time_seconds', 'gauge', 'Armed wake alarm, seconds since the epoch',
+                    [('', int(alarm) if alarm.isdigit() else None)])
+        self.family(out, 'suspend_supported', 'gauge', 'Sleep states listed in /sys/power/state',
+                    [(self.labels(('state', state)), int(supported))
+                     for state, supported in status['suspend_support'].items()])
+        self.family(out, 'pm_firmware_ready', 'gauge', 'Whether the PM co-processor firmware is ready',
+                    [('', int(status['pm_firmware']))])
+
+
+class JobRunner:
+    """
+    Slow subprocess-backed actions (RTC tests, sync, alarm) run off the
+    request path.
+    
+    The request is answered with a job right away and /api/jobs/<id> reports
+    its result. Jobs run one at a time on their own thread: they are
+    subprocesses competing for the same single core anyway.
+    """
+    
+    def __init__(self, max_pending=MAX_PENDING_JOBS, keep=JOBS_KEPT):
+        self.max_pending = max_pending
+        self.keep = keep
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        threading.Thread(target=self.run, name='jobs', daemon=True).start()
+    
+    def pending(self):
+        with self._lock:
+            return sum(1 for job in self.jobs.values() if job['status'] != 'done')
+    
+    def submit(self, name, func, *args):
+        """Queue func(*args); None if too many jobs are pending"""
+        with self._lock:
+            if sum(1 for job in self.jobs.values() if job['status'] != 'done') >= self.max_pending:
+                return None
+            job = {'id': next(self._ids), 'name': name, 'status': 'queued', 'submitted': time.time()}
+            self.jobs[job['id']] = job
+            # Forget the oldest finished jobs
+            finished = [job_id for job_id, j in self.jobs.items() if j['status'] == 'done']
+            for job_id in finished[:max(len(self.jobs) - self.keep, 0)]:
+                del self.jobs[job_id]
+            self._queue.put((job, func, args))
+            return dict(job)
+    
+    def get(self, job_id):
+        """Copy of a job, with its result once done"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+    
+    def run(self):
+        while True:
+            job, func, args = self._queue.get()
+            with self._lock:
+                job['status'] = 'running'
+            try:
+                result = func(*args)
+            except Exception as e:
+                result = {'status': 'error', 'message': str(e)}
+            with self._lock:
+                job['result'] = result
+                job['status'] = 'done'
+                job['finished'] = time.time()
+
+
+class MonitorServer(socketserver.TCPServer):
+    """
+    TCP server handing connections to a fixed pool of worker threads.
+    
+    When every worker is busy, the accept loop waits and new connections
+    queue in the listen backlog, which bounds the threads and memory used
+    whatever the number of clients. Busy and peak busy workers are counted
+    for /api/server. Connections detached by a handler (event streams) are
+    left open.
+    """
+    
+    def __init__(self, server_address, handler_class, workers=WORKERS):
+        self.workers = workers
+        self.busy = 0
+        self.peak_busy = 0
+        self.connections = 0
+        self._detached = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=1)
+        super().__init__(server_address, handler_class)
+        for i in range(workers):
+            threading.Thread(target=self.work, name=f'http-{i}', daemon=True).start()
+    
+    def process_request(self, request, client_address):
+        # Blocks while every worker is busy
+        self._queue.put((request, client_address))
+    
+    def work(self):
+        while True:
+            request, client_address = self._queue.get()
+            with self._lock:
+                self.busy += 1
+                self.peak_busy = max(self.peak_busy, self.busy)
+                self.connections += 1
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._lock:
+                    self.busy -= 1
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'busy': self.busy,
+                'peak_busy': self.peak_busy,
+                'connections': self.connections
+            }
+    
+    def detach(self, request):
+        """Hand a connection over to its new owner when the request is done"""
+        with self._lock:
+            self._detached.add(request)
+    
+    def shutdown_request(self, request):
+        with self._lock:
+            if request in self._detached:
+                self._detached.discard(request)
+                return
+        super().shutdown_request(request)
 
-PORT = 8080
 
 class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
     
+    # Keep-alive: every response carries a Content-Length
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body are separate writes, don't let them wait for an ACK
+    disable_nagle_algorithm = True
+    
+    # Shared MetricsSampler, EventBroadcaster, JobRunner and OpenMetricsExporter, set by main()
+    sampler = None
+    broadcaster = None
+    jobs = None
+    exporter = None
+    
+    # StaticPayload by path, built once by main()
+    static = {}
+    
     def do_GET(self):
-        if self.path == '/':
-            self.serve_html()
+        if self.path.startswith('/api/history'):
+            self.serve_history()
+        elif self.path.startswith('/api/jobs/'):
+            self.serve_job()
+        elif self.path == '/api/server':
+            self.serve_server_stats()
+        elif self.path == '/metrics':
+            self.send_body(self.exporter.body(), OpenMetricsExporter.CONTENT_TYPE)
+        elif self.path == '/api/stream':
+            self.serve_stream()
+        elif self.path in self.static:
+            self.send_static(self.static[self.path])
         elif self.path == '/api/metrics':
             self.serve_metrics()
-        elif self.path == '/api/system-info':
-            self.serve_system_info()
+        elif self.path.startswith('/api/processes'):
+            self.serve_processes()
         elif self.path == '/api/leds':
             self.serve_led_status()
         elif self.path == '/api/ipsec':
@@ -32,6 +2102,8 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             self.send_error(404)
     
     def do_POST(self):
+        # Read the body even if unused, the connection carries the next request
+        self.body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
         if self.path.startswith('/api/led/'):
             self.control_led()
         elif self.path.startswith('/api/rtc/'):
@@ -39,9 +2111,10 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
         else:
             self.send_error(404)
     
-    def serve_html(self):
-        """Serve the main HTML page"""
-        html = """<!DOCTYPE html>
+    @staticmethod
+    def dashboard_html():
+        """The dashboard page"""
+        return """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -232,6 +2305,23 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
         .rtc-button:active {
             transform: translateY(0);
         }
+        .history-controls {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 8px;
+            margin-bottom: 10px;
+        }
+        .history-controls select, .history-controls button {
+            padding: 6px 10px;
+            border-radius: 5px;
+            border: 1px solid #ddd;
+            background: white;
+            cursor: pointer;
+        }
+        .history-controls button.active {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+        }
         .rtc-status-item {
             display: flex;
             justify-content: space-between;
@@ -566,6 +2656,27 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             </table>
         </div>
         
+        <div class="metric-card">
+            <div class="metric-title">📈 History</div>
+            <div class="history-controls">
+                <select id="history-metric" onchange="loadHistory()">
+                    <option value="cpu.usage">CPU usage (%)</option>
+                    <option value="cpu.load_1m">Load average (1m)</option>
+                    <option value="memory.used">Memory used (KB)</option>
+                    <option value="network.rx_rate">Network RX (B/s)</option>
+                    <option value="network.tx_rate">Network TX (B/s)</option>
+                    <option value="temperature">Temperature (°C)</option>
+                    <option value="processes.total">Processes</option>
+                </select>
+                <button data-range="10m" class="active" onclick="setHistoryRange(this)">10 min</button>
+                <button data-range="1h" onclick="setHistoryRange(this)">1 h</button>
+                <button data-range="24h" onclick="setHistoryRange(this)">24 h</button>
+                <button data-range="30d" onclick="setHistoryRange(this)">30 days</button>
+            </div>
+            <canvas id="history-chart" width="900" height="220" style="width: 100%; height: 220px;"></canvas>
+            <div class="metric-label" id="history-summary">--</div>
+        </div>
+        
         <div class="system-info">
             <h2>System Information</h2>
             <div class="info-grid" id="system-info">
@@ -577,7 +2688,7 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
         </div>
         
         <div class="timestamp">
-            Last updated: <span id="timestamp">--</span> | Auto-refresh every 2 seconds
+            Last updated: <span id="timestamp">--</span> | Live updates every 2 seconds
         </div>
     </div>
     
@@ -668,11 +2779,8 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             }
         }
         
-        async function updateLEDStatus() {
+        function renderLEDStatus(data) {
             try {
-                const response = await fetch('/api/leds');
-                const data = await response.json();
-                
                 for (let i = 0; i < 4; i++) {
                     const ledKey = `usr${i}`;
                     const button = document.getElementById(`led-${i}`);
@@ -686,15 +2794,12 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
                     }
                 }
             } catch (error) {
-                console.error('Error fetching LED status:', error);
+                console.error('Error updating LED status:', error);
             }
         }
         
-        async function updateIPsecStatus() {
+        function renderIPsecStatus(data) {
             try {
-                const response = await fetch('/api/ipsec');
-                const data = await response.json();
-                
                 const ipsecDiv = document.getElementById('ipsec-status');
                 
                 if (!data.available) {
@@ -745,17 +2850,14 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
                     ipsecDiv.innerHTML = '<div class="metric-label">No active tunnels</div>';
                 }
             } catch (error) {
-                console.error('Error fetching IPsec status:', error);
+                console.error('Error updating IPsec status:', error);
                 document.getElementById('ipsec-status').innerHTML = 
                     '<div class="metric-label">Error loading IPsec status</div>';
             }
         }
         
-        async function updateRTCStatus() {
+        function renderRTCStatus(data) {
             try {
-                const response = await fetch('/api/rtc');
-                const data = await response.json();
-                
                 const rtcDiv = document.getElementById('rtc-status');
                 
                 if (!data.available) {
@@ -806,7 +2908,7 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
                     </div>
                 `;
             } catch (error) {
-                console.error('Error fetching RTC status:', error);
+                console.error('Error updating RTC status:', error);
                 document.getElementById('rtc-status').innerHTML = 
                     '<div class="metric-label">Error loading RTC status</div>';
             }
@@ -853,21 +2955,29 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             }
         }
         
+        // POST an action; slow ones answer 202 with a job to poll for the result
+        async function runAction(url, options = {}) {
+            const response = await fetch(url, { method: 'POST', ...options });
+            let job = await response.json();
+            if (response.status !== 202) return job;
+            while (job.status !== 'done') {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                job = await (await fetch('/api/jobs/' + job.id)).json();
+            }
+            return job.result;
+        }
+        
         async function syncRTC() {
             const outputDiv = document.getElementById('rtc-output');
             outputDiv.style.display = 'block';
             outputDiv.textContent = 'Syncing RTC...';
             
             try {
-                const response = await fetch('/api/rtc/sync', {
-                    method: 'POST'
-                });
-                const data = await response.json();
+                const data = await runAction('/api/rtc/sync');
                 
                 if (data.status === 'success') {
                     outputDiv.textContent = '[OK] ' + data.message + '\\n' + (data.output || '');
                     outputDiv.style.color = '#4caf50';
-                    setTimeout(() => updateRTCStatus(), 1000);
                 } else {
                     outputDiv.textContent = '[ERROR] ' + data.message + '\\n' + (data.error || '');
                     outputDiv.style.color = '#f44336';
@@ -884,10 +2994,7 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             outputDiv.textContent = 'Running RTC tests...\\nThis may take up to 30 seconds...';
             
             try {
-                const response = await fetch('/api/rtc/test', {
-                    method: 'POST'
-                });
-                const data = await response.json();
+                const data = await runAction('/api/rtc/test');
                 
                 outputDiv.textContent = data.output || data.error || 'Test completed';
                 outputDiv.style.color = data.status === 'success' ? '#333' : '#f44336';
@@ -904,17 +3011,14 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             outputDiv.textContent = 'Setting alarm for ' + duration + ' seconds...';
             
             try {
-                const response = await fetch('/api/rtc/alarm', {
-                    method: 'POST',
+                const data = await runAction('/api/rtc/alarm', {
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify({ duration: parseInt(duration) })
                 });
-                const data = await response.json();
                 
                 if (data.status === 'success') {
                     outputDiv.textContent = '[OK] ' + data.message + '\\n' + (data.output || '');
                     outputDiv.style.color = '#4caf50';
-                    setTimeout(() => updateRTCStatus(), 1000);
                 } else {
                     outputDiv.textContent = '[ERROR] ' + data.message + '\\n' + (data.error || '');
                     outputDiv.style.color = '#f44336';
@@ -978,7 +3082,6 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
                 if (data.status === 'success') {
                     outputDiv.textContent = '[OK] ' + data.message;
                     outputDiv.style.color = '#4caf50';
-                    setTimeout(() => updateRTCStatus(), 1000);
                 } else {
                     outputDiv.textContent = '[ERROR] ' + data.message;
                     outputDiv.style.color = '#f44336';
@@ -989,6 +3092,63 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             }
         }
         
+        let historyRange = '10m';
+        
+        function setHistoryRange(button) {
+            document.querySelectorAll('.history-controls button').forEach(b => b.classList.remove('active'));
+            button.classList.add('active');
+            historyRange = button.dataset.range;
+            loadHistory();
+        }
+        
+        async function loadHistory() {
+            const metric = document.getElementById('history-metric').value;
+            try {
+                const response = await fetch(`/api/history?metric=${metric}&range=${historyRange}`);
+                drawHistory(await response.json());
+            } catch (error) {
+                console.error('Error fetching history:', error);
+            }
+        }
+        
+        function drawHistory(data) {
+            const canvas = document.getElementById('history-chart');
+            const ctx = canvas.getContext('2d');
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            
+            const values = data.max.concat(data.min).filter(v => v !== null);
+            if (values.length === 0) {
+                document.getElementById('history-summary').textContent = 'No samples in this range yet';
+                return;
+            }
+            const low = Math.min(...values), high = Math.max(...values);
+            const span = (high - low) || Math.abs(high) || 1;
+            const x = i => i / Math.max(data.timestamps.length - 1, 1) * (canvas.width - 10) + 5;
+            const y = v => canvas.height - 10 - (v - low) / span * (canvas.height - 20);
+            
+            // min/max band, then the average line
+            ctx.fillStyle = 'rgba(102, 126, 234, 0.25)';
+            for (let i = 0; i < data.timestamps.length; i++) {
+                if (data.min[i] === null) continue;
+                ctx.fillRect(x(i) - 1, y(data.max[i]), 2, Math.max(y(data.min[i]) - y(data.max[i]), 1));
+            }
+            ctx.strokeStyle = '#764ba2';
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            let drawing = false;
+            for (let i = 0; i < data.timestamps.length; i++) {
+                if (data.avg[i] === null) { drawing = false; continue; }
+                if (drawing) ctx.lineTo(x(i), y(data.avg[i])); else ctx.moveTo(x(i), y(data.avg[i]));
+                drawing = true;
+            }
+            ctx.stroke();
+            
+            const averages = data.avg.filter(v => v !== null);
+            const mean = averages.reduce((a, b) => a + b, 0) / averages.length;
+            document.getElementById('history-summary').textContent =
+                `min ${low.toFixed(2)} | avg ${mean.toFixed(2)} | max ${high.toFixed(2)} | ${data.step}s per point`;
+        }
+        
         async function updateSystemInfo() {
             try {
                 const response = await fetch('/api/system-info');
@@ -1038,11 +3198,8 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             }
         }
         
-        async function updateMetrics() {
+        function renderMetrics(data) {
             try {
-                const response = await fetch('/api/metrics');
-                const data = await response.json();
-                
                 // Update CPU
                 document.getElementById('cpu-value').textContent = data.cpu.usage.toFixed(1) + '%';
                 document.getElementById('cpu-bar').style.width = data.cpu.usage + '%';
@@ -1133,516 +3290,199 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
                     new Date().toLocaleString();
                 
             } catch (error) {
-                console.error('Error fetching metrics:', error);
+                console.error('Error updating metrics:', error);
             }
         }
         
-        // Initial load
-        updateSystemInfo();
-        updateMetrics();
-        updateLEDStatus();
-        updateIPsecStatus();
-        updateRTCStatus();
-        
-        // Auto-refresh every 2 seconds
-        setInterval(updateMetrics, 2000);
-        // Update LED status every 5 seconds
-        setInterval(updateLEDStatus, 5000);
-        // Update IPsec status every 5 seconds
-        setInterval(updateIPsecStatus, 5000);
-        // Update RTC status every 5 seconds
-        setInterval(updateRTCStatus, 5000);
-    </script>
-</body>
-</html>
-"""
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.send_header('Cache-Control', 'no-cache')
-        self.end_headers()
-        self.wfile.write(html.encode())
-    
-    def serve_metrics(self):
-        """Serve current system metrics as JSON"""
-        metrics = {
-            'cpu': self.get_cpu_stats(),
-            'memory': self.get_memory_stats(),
-            'network': self.get_network_stats(),
-            'uptime': self.get_uptime_stats(),
-            'disk': self.get_disk_stats(),
-            'processes': self.get_process_stats(),
-            'temperature': self.get_temperature()
-        }
+        // Live sections: rendered from /api/stream, polled where EventSource is missing
+        const sections = {
+            metrics: { url: '/api/metrics', render: renderMetrics, interval: 2000 },
+            leds: { url: '/api/leds', render: renderLEDStatus, interval: 5000 },
+            ipsec: { url: '/api/ipsec', render: renderIPsecStatus, interval: 5000 },
+            rtc: { url: '/api/rtc', render: renderRTCStatus, interval: 5000 }
+        };
+        const sectionState = {};
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Cache-Control', 'no-cache')
-        self.end_headers()
-        self.wfile.write(json.dumps(metrics).encode())
-    
-    def serve_system_info(self):
-        """Serve static system information"""
-        info = {
-            'hostname': self.get_hostname(),
-            'kernel': self.get_kernel_version(),
-            'kernel_name': self.get_kernel_name(),
-            'kernel_build_time': self.get_kernel_build_time(),
-            'architecture': self.get_architecture(),
-            'cpu_model': self.get_cpu_model(),
-            'machine': self.get_machine_name(),
-            'build_time': self.get_build_time(),
-            'rootfs_build_time': self.get_rootfs_build_time(),
-            'os_release': self.get_os_release(),
-            'rootfs_image': self.get_rootfs_image()
+        // Apply a JSON merge patch (RFC 7396): null deletes, objects merge, the rest replaces
+        function mergePatch(target, patch) {
+            if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+            if (target === null || typeof target !== 'object' || Array.isArray(target)) target = {};
+            for (const [key, value] of Object.entries(patch)) {
+                if (value === null) {
+                    delete target[key];
+                } else {
+                    target[key] = mergePatch(target[key], value);
+                }
+            }
+            return target;
         }
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Cache-Control', 'max-age=60')
-        self.end_headers()
-        self.wfile.write(json.dumps(info).encode())
-    
-    def get_cpu_stats(self):
-        """Get CPU usage and load average"""
-        try:
-            # Read /proc/loadavg
-            with open('/proc/loadavg', 'r') as f:
-                loadavg = f.read().strip().split()
-                load_1m = float(loadavg[0])
-                load_5m = float(loadavg[1])
-                load_15m = float(loadavg[2])
-            
-            # Calculate CPU usage from /proc/stat
-            with open('/proc/stat', 'r') as f:
-                cpu_line = f.readline()
-                cpu_stats = [int(x) for x in cpu_line.split()[1:]]
-                
-                # Total CPU time = user + nice + system + idle + iowait + irq + softirq
-                total = sum(cpu_stats[:7])
-                idle = cpu_stats[3]
-                
-                # Store for next calculation (simple approach)
-                if not hasattr(self, '_last_cpu'):
-                    self._last_cpu = (total, idle)
-                    cpu_usage = 0.0
-                else:
-                    last_total, last_idle = self._last_cpu
-                    total_delta = total - last_total
-                    idle_delta = idle - last_idle
-                    
-                    if total_delta > 0:
-                        cpu_usage = 100.0 * (1.0 - idle_delta / total_delta)
-                    else:
-                        cpu_usage = 0.0
-                    
-                    self._last_cpu = (total, idle)
-            
-            return {
-                'usage': cpu_usage,
-                'load_1m': load_1m,
-                'load_5m': load_5m,
-                'load_15m': load_15m
+        function connectStream() {
+            const source = new EventSource('/api/stream');
+            // Every (re)connection starts with full sections
+            source.addEventListener('open', () => {
+                for (const name of Object.keys(sectionState)) delete sectionState[name];
+            });
+            for (const [name, section] of Object.entries(sections)) {
+                source.addEventListener(name, event => {
+                    sectionState[name] = mergePatch(sectionState[name], JSON.parse(event.data));
+                    section.render(sectionState[name]);
+                });
             }
-        except Exception as e:
-            return {'usage': 0, 'load_1m': 0, 'load_5m': 0, 'load_15m': 0}
-    
-    def get_memory_stats(self):
-        """Get memory usage statistics"""
-        try:
-            mem_info = {}
-            with open('/proc/meminfo', 'r') as f:
-                for line in f:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        key = parts[0].rstrip(':')
-                        value = int(parts[1])
-                        mem_info[key] = value
-            
-            total = mem_info.get('MemTotal', 0)
-            available = mem_info.get('MemAvailable', mem_info.get('MemFree', 0))
-            used = total - available
-            
-            return {
-                'total': total,
-                'used': used,
-                'available': available,
-                'free': mem_info.get('MemFree', 0)
+        }
+        
+        async function pollSection(section) {
+            try {
+                const response = await fetch(section.url);
+                section.render(await response.json());
+            } catch (error) {
+                console.error('Error fetching ' + section.url + ':', error);
             }
-        except Exception as e:
-            return {'total': 0, 'used': 0, 'available': 0, 'free': 0}
-    
-    def get_network_stats(self):
-        """Get network interface statistics"""
-        stats = {}
-        try:
-            with open('/proc/net/dev', 'r') as f:
-                lines = f.readlines()[2:]  # Skip header
-                for line in lines:
-                    parts = line.split()
-                    iface = parts[0].rstrip(':')
-                    
-                    # Skip loopback
-                    if iface == 'lo':
-                        continue
-                    
-                    stats[iface] = {
-                        'rx_bytes': int(parts[1]),
-                        'rx_packets': int(parts[2]),
-                        'rx_errors': int(parts[3]),
-                        'tx_bytes': int(parts[9]),
-                        'tx_packets': int(parts[10]),
-                        'tx_errors': int(parts[11]),
-                        'errors': int(parts[3]) + int(parts[11])
-                    }
-        except Exception as e:
-            pass
+        }
         
-        return stats
-    
-    def get_uptime_stats(self):
-        """Get system uptime"""
-        try:
-            with open('/proc/uptime', 'r') as f:
-                uptime_seconds = float(f.read().split()[0])
-            
-            boot_timestamp = time.time() - uptime_seconds
-            boot_time = datetime.fromtimestamp(boot_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-            
-            return {
-                'uptime': int(uptime_seconds),
-                'boot_time': boot_time
+        // Initial load
+        updateSystemInfo();
+        loadHistory();
+        
+        if (window.EventSource) {
+            connectStream();
+        } else {
+            for (const section of Object.values(sections)) {
+                pollSection(section);
+                setInterval(() => pollSection(section), section.interval);
             }
-        except Exception as e:
-            return {'uptime': 0, 'boot_time': 'Unknown'}
-    
-    def get_hostname(self):
-        """Get system hostname"""
-        try:
-            with open('/etc/hostname', 'r') as f:
-                return f.read().strip()
-        except:
-            return 'unknown'
-    
-    def get_kernel_version(self):
-        """Get kernel version"""
-        try:
-            with open('/proc/version', 'r') as f:
-                return f.read().split()[2]
-        except:
-            return 'unknown'
-    
-    def get_architecture(self):
-        """Get system architecture"""
-        try:
-            with open('/proc/cpuinfo', 'r') as f:
-                for line in f:
-                    if 'model name' in line.lower() or 'processor' in line.lower():
-                        return line.split(':')[1].strip()
-            return 'ARM'
-        except:
-            return 'unknown'
+        }
+    </script>
+</body>
+</html>
+"""
     
-    def get_cpu_model(self):
-        """Get CPU model name"""
-        try:
-            with open('/proc/cpuinfo', 'r') as f:
-                for line in f:
-                    if 'model name' in line.lower():
-                        return line.split(':')[1].strip()
-                    elif 'Hardware' in line:
-                        return line.split(':')[1].strip()
-            return 'ARM Processor'
-        except:
-            return 'unknown'
+    def send_body(self, body, content_type, status=200, cache='no-cache'):
+        """Send a complete response"""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Cache-Control', cache)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
     
-    def get_build_info(self):
-        """Read build information from /etc/build-info"""
-        info = {}
-        try:
-            if os.path.exists('/etc/build-info'):
-                with open('/etc/build-info', 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            info[key] = value.strip()
-        except:
-            pass
-        return info
+    def send_json(self, data, status=200, cache='no-cache'):
+        self.send_body(json.dumps(data).encode(), 'application/json', status, cache)
     
-    def get_kernel_name(self):
-        """Get kernel recipe name from build-info or /proc/version"""
-        # Try to get from build-info first
-        build_info = self.get_build_info()
-        if 'KERNEL_RECIPE' in build_info:
-            return build_info['KERNEL_RECIPE']
+    def send_static(self, payload):
+        """Send a StaticPayload in the best accepted encoding, or 304 if the client has it"""
+        encoding = payload.negotiate(self.headers.get('Accept-Encoding'))
+        if_none_match = self.headers.get('If-None-Match')
+        not_modified = bool(if_none_match) and payload.matches(if_none_match)
         
-        # Fallback to /proc/version
-        try:
-            with open('/proc/version', 'r') as f:
-                version_str = f.read()
-                # Extract kernel name (e.g., "Linux version 6.6.75-yocto-standard")
-                parts = version_str.split()
-                if len(parts) >= 3:
-                    return parts[2]  # Returns something like "6.6.75-yocto-standard"
-            return 'unknown'
-        except:
-            return 'unknown'
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', payload.etags[encoding])
+        self.send_header('Cache-Control', payload.cache)
+        self.send_header('Vary', 'Accept-Encoding')
+        if not_modified:
+            self.end_headers()
+            return
+        body = payload.bodies[encoding]
+        self.send_header('Content-type', payload.content_type)
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
     
-    def get_machine_name(self):
-        """Get machine name from build-info or device tree"""
-        # Try to get from build-info first
-        build_info = self.get_build_info()
-        if 'MACHINE' in build_info:
-            return build_info['MACHINE']
-        
-        # Fallback to device tree model
-        try:
-            # Try to get from device tree model
-            with open('/proc/device-tree/model', 'r') as f:
-                model = f.read().strip('\x00').strip()
-                if model:
-                    return model
-        except:
-            pass
-        
-        # Fallback to machine info from /etc/os-release or other sources
-        try:
-            if os.path.exists('/etc/machine-info'):
-                with open('/etc/machine-info', 'r') as f:
-                    for line in f:
-                        if 'MACHINE=' in line:
-                            return line.split('=')[1].strip().strip('"')
-        except:
-            pass
+    def serve_metrics(self):
+        """Serve the latest sample of the background sampler as JSON"""
+        metrics = self.sampler.latest()
         
-        return 'unknown'
+        self.send_json(metrics)
     
-    def get_kernel_build_time(self):
-        """Get kernel build timestamp from build-info"""
-        build_info = self.get_build_info()
-        if 'KERNEL_BUILD_TIME' in build_info:
-            return build_info['KERNEL_BUILD_TIME']
-        
-        # Fallback to kernel version string
-        try:
-            with open('/proc/version', 'r') as f:
-                version_str = f.read()
-                # Extract build time (usually after #1 and before compiler info)
-                import re
-                match = re.search(r'#\d+\s+[A-Z]+\s+(.+?)\s+\d{4}', version_str)
-                if match:
-                    return match.group(0)
-                # Try simpler pattern
-                match = re.search(r'#\d+\s+(.+)', version_str)
-                if match:
-                    build_info_str = match.group(1).split('(')[0].strip()
-                    return build_info_str
-        except:
-            pass
+    def serve_stream(self):
+        """Stream section updates as server-sent events"""
+        if self.broadcaster.full():
+            self.send_error(503, "Too many streams")
+            return
         
-        return 'unknown'
-    
-    def get_rootfs_build_time(self):
-        """Get rootfs build timestamp from build-info"""
-        build_info = self.get_build_info()
-        if 'ROOTFS_BUILD_TIME' in build_info:
-            return build_info['ROOTFS_BUILD_TIME']
-        return 'unknown'
-    
-    def get_build_time(self):
-        """Get generic build timestamp (deprecated, use get_rootfs_build_time)"""
-        # For backwards compatibility
-        return self.get_rootfs_build_time()
-    
-    def get_rootfs_image(self):
-        """Get rootfs image name from build-info"""
-        build_info = self.get_build_info()
-        if 'ROOTFS_IMAGE' in build_info:
-            return build_info['ROOTFS_IMAGE']
-        return 'unknown'
-    
-    def get_os_release(self):
-        """Get OS/Image information from /etc/os-release"""
-        try:
-            info = {}
-            if os.path.exists('/etc/os-release'):
-                with open('/etc/os-release', 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            info[key] = value.strip('"')
-            
-            # Return formatted string with key information
-            name = info.get('NAME', 'Linux')
-            version = info.get('VERSION', '')
-            pretty_name = info.get('PRETTY_NAME', '')
-            
-            if pretty_name:
-                return pretty_name
-            elif version:
-                return f"{name} {version}"
-            else:
-                return name
-        except:
-            return 'Linux'
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        # The body ends when the connection does
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.flush()
+        # The broadcaster writes the events from now on
+        self.server.detach(self.request)
+        self.broadcaster.add(self.request)
     
-    def get_disk_stats(self):
-        """Get disk usage statistics"""
-        stats = {}
+    def serve_job(self):
+        """Serve the state of a slow action: /api/jobs/<id>"""
         try:
-            with open('/proc/mounts', 'r') as f:
-                for line in f:
-                    parts = line.split()
-                    if len(parts) < 2:
-                        continue
-                    
-                    mount_point = parts[1]
-                    fs_type = parts[2]
-                    
-                    # Skip virtual filesystems
-                    if fs_type in ['proc', 'sysfs', 'devtmpfs', 'devpts', 'tmpfs', 
-                                   'cgroup', 'cgroup2', 'pstore', 'configfs', 'debugfs',
-                                   'tracefs', 'securityfs', 'bpf', 'fusectl', 'mqueue']:
-                        continue
-                    
-                    try:
-                        st = os.statvfs(mount_point)
-                        total = st.f_blocks * st.f_frsize
-                        free = st.f_bfree * st.f_frsize
-                        available = st.f_bavail * st.f_frsize
-                        used = total - free
-                        
-                        if total > 0:  # Only include if there's actual storage
-                            stats[mount_point] = {
-                                'total': total,
-                                'used': used,
-                                'free': free,
-                                'available': available,
-                                'percent': (used / total * 100) if total > 0 else 0,
-                                'filesystem': parts[0],
-                                'type': fs_type
-                            }
-                    except:
-                        pass
-        except:
-            pass
-        
-        return stats
+            job = self.jobs.get(int(self.path.split('/')[3]))
+        except ValueError:
+            job = None
+        if job is None:
+            self.send_error(404, "Unknown job")
+            return
+        self.send_json(job)
     
-    def get_process_stats(self):
-        """Get process statistics"""
+    def serve_server_stats(self):
+        """Serve worker pool, stream and job usage"""
+        stats = self.server.stats()
+        stats['streams'] = len(self.broadcaster)
+        stats['jobs_pending'] = self.jobs.pending()
+        self.send_json(stats)
+    
+    def serve_processes(self):
+        """Serve the top processes: /api/processes?sort=cpu|memory|pss&limit=10"""
+        query = parse_qs(self.path.partition('?')[2])
+        sort = query.get('sort', ['cpu'])[0]
+        if sort not in ('cpu', 'memory', 'pss'):
+            self.send_error(400, "sort must be cpu, memory or pss")
+            return
         try:
-            # Count processes
-            proc_count = 0
-            running = 0
-            sleeping = 0
-            zombie = 0
-            
-            for pid in os.listdir('/proc'):
-                if not pid.isdigit():
-                    continue
-                
-                proc_count += 1
-                try:
-                    with open(f'/proc/{pid}/stat', 'r') as f:
-                        stat = f.read().split()
-                        state = stat[2] if len(stat) > 2 else '?'
-                        
-                        if state == 'R':
-                            running += 1
-                        elif state == 'S':
-                            sleeping += 1
-                        elif state == 'Z':
-                            zombie += 1
-                except:
-                    pass
-            
-            return {
-                'total': proc_count,
-                'running': running,
-                'sleeping': sleeping,
-                'zombie': zombie
-            }
-        except:
-            return {'total': 0, 'running': 0, 'sleeping': 0, 'zombie': 0}
+            limit = min(max(int(query.get('limit', [PROCESS_TOP])[0]), 1), 100)
+        except ValueError:
+            self.send_error(400, "limit must be a number")
+            return
+        
+        self.send_json({
+            'timestamp': self.sampler.latest()['timestamp'],
+            'sort': sort,
+            'processes': self.sampler.processes.top_processes(sort, limit)
+        })
     
-    def get_temperature(self):
-        """Get CPU/SoC temperature if available"""
-        temps = {}
+    def serve_history(self):
+        """Serve one history series: /api/history?metric=cpu.usage&range=1h&step=1m"""
+        query = parse_qs(self.path.partition('?')[2])
+        metric = query.get('metric', ['cpu.usage'])[0]
+        if metric not in HISTORY_METRICS:
+            self.send_error(400, f"Unknown metric, available: {', '.join(HISTORY_METRICS)}")
+            return
         try:
-            # Try thermal zones
-            thermal_dir = '/sys/class/thermal'
-            if os.path.exists(thermal_dir):
-                for zone in os.listdir(thermal_dir):
-                    if zone.startswith('thermal_zone'):
-                        try:
-                            with open(f'{thermal_dir}/{zone}/temp', 'r') as f:
-                                temp = int(f.read().strip()) / 1000.0  # Convert from millidegrees
-                            
-                            # Get zone type/name
-                            try:
-                                with open(f'{thermal_dir}/{zone}/type', 'r') as f:
-                                    zone_type = f.read().strip()
-                            except:
-                                zone_type = zone
-                            
-                            temps[zone_type] = temp
-                        except:
-                            pass
-            
-            # Try hwmon
-            hwmon_dir = '/sys/class/hwmon'
-            if os.path.exists(hwmon_dir):
-                for hwmon in os.listdir(hwmon_dir):
-                    hwmon_path = os.path.join(hwmon_dir, hwmon)
-                    try:
-                        # Get hwmon name
-                        with open(f'{hwmon_path}/name', 'r') as f:
-                            hwmon_name = f.read().strip()
-                        
-                        # Look for temp inputs
-                        for temp_file in os.listdir(hwmon_path):
-                            if temp_file.startswith('temp') and temp_file.endswith('_input'):
-                                with open(f'{hwmon_path}/{temp_file}', 'r') as f:
-                                    temp = int(f.read().strip()) / 1000.0
-                                
-                                # Try to get label
-                                label_file = temp_file.replace('_input', '_label')
-                                try:
-                                    with open(f'{hwmon_path}/{label_file}', 'r') as f:
-                                        label = f.read().strip()
-                                except:
-                                    label = f'{hwmon_name}_{temp_file}'
-                                
-                                temps[label] = temp
-                    except:
-                        pass
-        except:
-            pass
+            range_seconds = parse_duration(query.get('range', ['10m'])[0])
+            step = parse_duration(query['step'][0]) if 'step' in query else None
+        except ValueError:
+            self.send_error(400, "range and step are durations such as 90, 10m, 24h or 30d")
+            return
+        if range_seconds <= 0 or (step is not None and step <= 0):
+            self.send_error(400, "range and step must be positive")
+            return
+        # Cap the number of points per response
+        step = max(step or 0, range_seconds / 1000)
+        history = self.sampler.history.query(metric, range_seconds, step)
         
-        return temps if temps else {'status': 'not available'}
+        self.send_json(history)
     
     def serve_led_status(self):
         """Serve current LED status"""
-        led_status = self.get_led_status()
+        led_status = self.sampler.section('leds')
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Cache-Control', 'no-cache')
-        self.end_headers()
-        self.wfile.write(json.dumps(led_status).encode())
+        self.send_json(led_status)
     
     def serve_ipsec_status(self):
         """Serve IPsec tunnel status"""
-        ipsec_status = self.get_ipsec_status()
+        ipsec_status = self.sampler.section('ipsec')
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Cache-Control', 'no-cache')
-        self.end_headers()
-        self.wfile.write(json.dumps(ipsec_status).encode())
+        self.send_json(ipsec_status)
     
     def control_led(self):
         """Control LED via POST request"""
@@ -1668,61 +3508,20 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             success = self.set_led_state(led_num, action)
             
             if success:
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
+                self.sampler.refresh('leds')
                 response = {
                     'status': 'success',
                     'led': led_num,
                     'action': action,
-                    'state': self.get_led_brightness(led_num)
+                    'state': self.sampler.get_led_brightness(led_num)
                 }
-                self.wfile.write(json.dumps(response).encode())
+                self.send_json(response)
             else:
                 self.send_error(500, "Failed to control LED")
         
         except Exception as e:
             self.send_error(500, f"Error controlling LED: {str(e)}")
     
-    def get_led_status(self):
-        """Get status of all LEDs"""
-        leds = {}
-        for i in range(4):
-            led_path = f"/sys/class/leds/beaglebone:green:usr{i}"
-            if os.path.exists(led_path):
-                leds[f'usr{i}'] = {
-                    'number': i,
-                    'brightness': self.get_led_brightness(i),
-                    'trigger': self.get_led_trigger(i),
-                    'available': True
-                }
-            else:
-                leds[f'usr{i}'] = {
-                    'number': i,
-                    'available': False
-                }
-        return leds
-    
-    def get_led_brightness(self, led_num):
-        """Get LED brightness (0 or 1)"""
-        try:
-            with open(f"/sys/class/leds/beaglebone:green:usr{led_num}/brightness", 'r') as f:
-                return int(f.read().strip())
-        except:
-            return 0
-    
-    def get_led_trigger(self, led_num):
-        """Get current LED trigger"""
-        try:
-            with open(f"/sys/class/leds/beaglebone:green:usr{led_num}/trigger", 'r') as f:
-                triggers = f.read().strip()
-                # Extract current trigger (marked with [])
-                import re
-                match = re.search(r'\[(\w+)\]', triggers)
-                return match.group(1) if match else 'unknown'
-        except:
-            return 'unknown'
-    
     def set_led_state(self, led_num, action):
         """Set LED state (on, off, or toggle)"""
         try:
@@ -1734,7 +3533,7 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             
             # Determine new brightness
             if action == 'toggle':
-                current = self.get_led_brightness(led_num)
+                current = self.sampler.get_led_brightness(led_num)
                 new_brightness = 0 if current == 1 else 1
             elif action == 'on':
                 new_brightness = 1
@@ -1750,166 +3549,14 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             print(f"Error setting LED {led_num}: {e}")
             return False
     
-    def get_ipsec_status(self):
-        """Get IPsec tunnel status from swanctl"""
-        import subprocess
-        import re
-        
-        result = {
-            'available': False,
-            'tunnels': []
-        }
-        
-        try:
-            # Check if swanctl is available
-            if not os.path.exists('/usr/sbin/swanctl'):
-                return result
-            
-            # Run swanctl --list-sas
-            proc = subprocess.run(
-                ['/usr/sbin/swanctl', '--list-sas'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if proc.returncode != 0:
-                return result
-            
-            result['available'] = True
-            
-            # Parse swanctl output
-            output = proc.stdout
-            
-            # Pattern to match tunnel info
-            # Example: bbb-ipsec: #1, ESTABLISHED, IKEv2, ...
-            tunnel_pattern = r'^(\S+):\s+#(\d+),\s+(\w+),\s+IKEv([12])'
-            local_pattern = r"^\s+local\s+'?([^']+?)'?\s+@\s+(\S+)\[(\d+)\]"
-            remote_pattern = r"^\s+remote\s+'?([^']+?)'?\s+@\s+(\S+)\[(\d+)\]"
-            encryption_pattern = r'^\s+(\S+/\S+/\S+/\S+)'
-            established_pattern = r'established\s+(.+?)\s+ago'
-            child_pattern = r'^\s+(\S+):\s+#(\d+),.*reqid\s+(\d+),\s+(\w+),\s+(\w+),\s+ESP'
-            bytes_pattern = r'^\s+in\s+(\w+),\s+(\d+)\s+bytes,\s+(\d+)\s+packets'
-            bytes_out_pattern = r'^\s+out\s+(\w+),\s+(\d+)\s+bytes,\s+(\d+)\s+packets'
-            
-            current_tunnel = None
-            current_child = None
-            
-            for line in output.split('\n'):
-                # New tunnel
-                tunnel_match = re.match(tunnel_pattern, line)
-                if tunnel_match:
-                    if current_tunnel:
-                        result['tunnels'].append(current_tunnel)
-                    
-                    current_tunnel = {
-                        'name': tunnel_match.group(1),
-                        'unique_id': tunnel_match.group(2),
-                        'state': tunnel_match.group(3),
-                        'ikev': tunnel_match.group(4),
-                        'local_id': '',
-                        'local_host': '',
-                        'local_port': '',
-                        'remote_id': '',
-                        'remote_host': '',
-                        'remote_port': '',
-                        'encryption': '',
-                        'established': '',
-                        'child_sas': []
-                    }
-                    current_child = None
-                    continue
-                
-                if not current_tunnel:
-                    continue
-                
-                # Local endpoint
-                local_match = re.match(local_pattern, line)
-                if local_match:
-                    current_tunnel['local_id'] = local_match.group(1)
-                    current_tunnel['local_host'] = local_match.group(2)
-                    current_tunnel['local_port'] = local_match.group(3)
-                    continue
-                
-                # Remote endpoint
-                remote_match = re.match(remote_pattern, line)
-                if remote_match:
-                    current_tunnel['remote_id'] = remote_match.group(1)
-                    current_tunnel['remote_host'] = remote_match.group(2)
-                    current_tunnel['remote_port'] = remote_match.group(3)
-                    continue
-                
-                # Encryption
-                enc_match = re.match(encryption_pattern, line)
-                if enc_match:
-                    current_tunnel['encryption'] = enc_match.group(1)
-                    continue
-                
-                # Established time
-                est_match = re.search(established_pattern, line)
-                if est_match:
-                    current_tunnel['established'] = est_match.group(1) + ' ago'
-                    continue
-                
-                # Child SA
-                child_match = re.match(child_pattern, line)
-                if child_match:
-                    current_child = {
-                        'name': child_match.group(1),
-                        'unique_id': child_match.group(2),
-                        'reqid': child_match.group(3),
-                        'state': child_match.group(4),
-                        'mode': child_match.group(5),
-                        'bytes_in': 0,
-                        'packets_in': 0,
-                        'bytes_out': 0,
-                        'packets_out': 0
-                    }
-                    current_tunnel['child_sas'].append(current_child)
-                    continue
-                
-                # Bytes in
-                if current_child:
-                    bytes_in_match = re.match(bytes_pattern, line)
-                    if bytes_in_match:
-                        current_child['bytes_in'] = int(bytes_in_match.group(2))
-                        current_child['packets_in'] = int(bytes_in_match.group(3))
-                        continue
-                    
-                    # Bytes out
-                    bytes_out_match = re.match(bytes_out_pattern, line)
-                    if bytes_out_match:
-                        current_child['bytes_out'] = int(bytes_out_match.group(2))
-                        current_child['packets_out'] = int(bytes_out_match.group(3))
-                        continue
-            
-            # Add last tunnel
-            if current_tunnel:
-                result['tunnels'].append(current_tunnel)
-        
-        except subprocess.TimeoutExpired:
-            result['error'] = 'Command timeout'
-        except FileNotFoundError:
-            result['error'] = 'swanctl not found'
-        except Exception as e:
-            result['error'] = str(e)
-        
-        return result
-    
     def serve_rtc_status(self):
         """Serve RTC status and power management info"""
-        rtc_status = self.get_rtc_status()
+        rtc_status = self.sampler.section('rtc')
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Cache-Control', 'no-cache')
-        self.end_headers()
-        self.wfile.write(json.dumps(rtc_status).encode())
+        self.send_json(rtc_status)
     
     def control_rtc(self):
         """Control RTC operations via POST request"""
-        import subprocess
-        
         try:
             # Parse URL: /api/rtc/<action>
             parts = self.path.split('/')
@@ -1920,15 +3567,30 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
             action = parts[3]
             
             # Read POST data for parameters
-            content_length = int(self.headers.get('Content-Length', 0))
             post_data = {}
-            if content_length > 0:
-                import json as json_module
-                post_body = self.rfile.read(content_length)
-                post_data = json_module.loads(post_body.decode('utf-8'))
-            
-            result = {'status': 'error', 'message': 'Unknown action'}
+            if self.body:
+                post_data = json.loads(self.body.decode('utf-8'))
+            
+            # Subprocess-backed actions run as jobs: answer now, poll /api/jobs/<id>
+            if action in ('sync', 'test', 'alarm'):
+                job = self.jobs.submit(f'rtc-{action}', self.rtc_action, action, post_data)
+                if job is None:
+                    self.send_error(503, "Too many RTC actions pending")
+                else:
+                    self.send_json(job, status=202)
+                return
             
+            self.send_json(self.rtc_action(action, post_data))
+        
+        except Exception as e:
+            self.send_error(500, f"Error controlling RTC: {str(e)}")
+    
+    def rtc_action(self, action, post_data):
+        """Run an RTC action and refresh the RTC section; returns the result"""
+        import subprocess
+        
+        result = {'status': 'error', 'message': 'Unknown action'}
+        try:
             if action == 'sync':
                 # Sync system time to RTC
                 proc = subprocess.run(
@@ -1991,7 +3653,7 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
                 # Suspend to RAM with RTC wakeup
                 duration = post_data.get('duration', 30)
                 mode = post_data.get('mode', 'mem')
-                
+            
                 # Validate mode
                 valid_modes = ['freeze', 'standby', 'mem']
                 if mode not in valid_modes:
@@ -2006,13 +3668,13 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
                         stdout=subprocess.PIPE,
                         stderr=subprocess.PIPE
                     )
-                    
+                
                     mode_names = {
                         'freeze': 'Freeze (S2Idle)',
                         'standby': 'Standby',
                         'mem': 'Suspend-to-RAM'
                     }
-                    
+                
                     result = {
                         'status': 'success',
                         'message': f'System will enter {mode_names.get(mode, mode)} for {duration} seconds',
@@ -2034,90 +3696,10 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
                         'status': 'error',
                         'message': f'Failed to clear alarm: {str(e)}'
                     }
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
-        
-        except Exception as e:
-            self.send_error(500, f"Error controlling RTC: {str(e)}")
-    
-    def get_rtc_status(self):
-        """Get RTC status and power management capabilities"""
-        import subprocess
-        
-        result = {
-            'available': False,
-            'device': '/dev/rtc0',
-            'system_time': '',
-            'rtc_time': '',
-            'alarm_set': False,
-            'alarm_time': '',
-            'suspend_support': {
-                'mem': False,
-                'freeze': False,
-                'standby': False
-            },
-            'pm_firmware': False
-        }
-        
-        try:
-            # Check if RTC device exists
-            if not os.path.exists('/dev/rtc0'):
-                return result
-            
-            result['available'] = True
-            
-            # Get system time
-            result['system_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Get RTC time
-            try:
-                proc = subprocess.run(
-                    ['hwclock', '-r'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if proc.returncode == 0:
-                    result['rtc_time'] = proc.stdout.strip()
-            except:
-                pass
-            
-            # Check for alarm
-            try:
-                with open('/sys/class/rtc/rtc0/wakealarm', 'r') as f:
-                    alarm = f.read().strip()
-                    if alarm and alarm != '0':
-                        result['alarm_set'] = True
-                        result['alarm_time'] = alarm
-            except:
-                pass
-            
-            # Check suspend support
-            try:
-                with open('/sys/power/state', 'r') as f:
-                    states = f.read().strip().split()
-                    result['suspend_support']['mem'] = 'mem' in states
-                    result['suspend_support']['freeze'] = 'freeze' in states
-                    result['suspend_support']['standby'] = 'standby' in states
-            except:
-                pass
-            
-            # Check PM firmware status
-            pm_status_path = '/sys/kernel/debug/pm33xx/status'
-            if os.path.exists(pm_status_path):
-                try:
-                    with open(pm_status_path, 'r') as f:
-                        status = f.read()
-                        result['pm_firmware'] = 'ready' in status.lower()
-                except:
-                    pass
-        
         except Exception as e:
-            result['error'] = str(e)
+            result = {'status': 'error', 'message': str(e)}
         
+        self.sampler.refresh('rtc')
         return result
     
     def log_message(self, format, *args):
@@ -2127,10 +3709,37 @@ class SystemMonitorHandler(http.server.BaseHTTPRequestHandler):
 
 def main():
     """Start the web server"""
-    print(f"Starting System Monitor Web Server on port {PORT}")
-    print(f"Access at: http://<device-ip>:{PORT}")
+    parser = argparse.ArgumentParser(description="System monitor web server")
+    parser.add_argument("--port", type=int, default=PORT, help=f"HTTP port (default: {PORT})")
+    parser.add_argument("--vici", default=VICI_SOCKET, help=f"charon VICI socket (default: {VICI_SOCKET})")
+    parser.add_argument("--vici-stand-in", action="store_true",
+                        help="Serve a stand-in tunnel on the VICI socket (testing without strongSwan)")
+    args = parser.parse_args()
+    
+    print(f"Starting System Monitor Web Server on port {args.port}")
+    print(f"Access at: http://<device-ip>:{args.port}")
+    
+    if args.vici_stand_in:
+        ViciStandIn(args.vici).start()
+        print(f"VICI stand-in listening on {args.vici}")
+    
+    broadcaster = EventBroadcaster()
+    exporter = OpenMetricsExporter()
+    sampler = MetricsSampler(vici_socket=args.vici)
+    sampler.listeners.append(broadcaster.update)
+    sampler.listeners.append(exporter.update)
+    sampler.start()
+    SystemMonitorHandler.sampler = sampler
+    SystemMonitorHandler.broadcaster = broadcaster
+    SystemMonitorHandler.jobs = JobRunner()
+    SystemMonitorHandler.exporter = exporter
+    SystemMonitorHandler.static = {
+        '/': StaticPayload(SystemMonitorHandler.dashboard_html().encode(), 'text/html'),
+        '/api/system-info': StaticPayload(json.dumps(SystemInfo().collect()).encode(), 'application/json',
+                                          cache='max-age=60')
+    }
     
-    with socketserver.TCPServer(("", PORT), SystemMonitorHandler) as httpd:
+    with MonitorServer(("", args.port), SystemMonitorHandler) as httpd:
         try:
             httpd.serve_forever()
         except KeyboardInterrupt: